@@ -2,23 +2,87 @@
 AI Complaint Classifier using scikit-learn
 Simulates AI-powered complaint categorization and severity prediction
 """
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.naive_bayes import MultinomialNB
-from sklearn.pipeline import Pipeline
+import asyncio
+import hashlib
+import json
+import multiprocessing
 import pickle
 import os
-from typing import Tuple
+import sqlite3
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import List, Optional, Tuple
+import numpy as np
+from keyword_rules import KeywordMatcher
+from model_artifact import save_artifact, load_artifact, is_artifact
+import metrics
+
+# Inference service settings, overridable via environment
+INFERENCE_WORKERS = int(os.getenv("INFERENCE_WORKERS", "0"))  # 0 = run in a thread of this process
+INFERENCE_BATCH_WINDOW_MS = float(os.getenv("INFERENCE_BATCH_WINDOW_MS", "5"))
+INFERENCE_MAX_BATCH = int(os.getenv("INFERENCE_MAX_BATCH", "64"))
+
+# Trained model loaded on first use (or by warmup()); unset = rule-based
+CLASSIFIER_MODEL_PATH = os.getenv("CLASSIFIER_MODEL_PATH")
+# Where retrain.py writes when CLASSIFIER_MODEL_PATH is unset; loaded
+# instead of the rules when present, so a retrained model survives restarts
+RETRAINED_MODEL_PATH = "complaint_classifier.rslv"
+
+# Classification cache: in-memory LRU entries (0 = off) and an optional
+# SQLite file that keeps results across restarts and worker processes
+CLASSIFICATION_CACHE_SIZE = int(os.getenv("CLASSIFICATION_CACHE_SIZE", "10000"))
+CLASSIFICATION_CACHE_PATH = os.getenv("CLASSIFICATION_CACHE_PATH")
+CLASSIFICATION_CACHE_DISK_SIZE = int(os.getenv("CLASSIFICATION_CACHE_DISK_SIZE", "200000"))
+
+# Feature space of incrementally trained (hashing) models
+HASHING_FEATURES = int(os.getenv("CLASSIFIER_HASHING_FEATURES", str(2 ** 16)))
+
+# Serializes lazy model loads. sklearn takes most of a second to import, so
+# it is imported where first needed (training, loading) instead of at import
+_load_lock = threading.Lock()
+
+# Guards the (vectorizer, heads, version) set so predictions never mix the
+# parts of two models while a new one is swapped in
+_swap_lock = threading.Lock()
 
 class ComplaintClassifier:
     """
     AI classifier for complaint categorization and severity prediction
     Uses TF-IDF + Naive Bayes for text classification
+
+    Both heads (fault type and severity) share one TF-IDF vectorizer, so a
+    complaint is vectorized once no matter how many predictions are made.
+
+    partial_fit trains a variant with a stateless hashing vectorizer instead,
+    which can be updated chunk by chunk (see retrain.py).
+
+    A model_path given to the constructor is loaded lazily, on the first
+    prediction or ensure_loaded() call.
     """
     
-    def __init__(self):
-        self.fault_pipeline = None
-        self.severity_pipeline = None
+    def __init__(self, model_path: Optional[str] = None):
+        self.vectorizer = None
+        self.fault_model = None
+        self.severity_model = None
         self.is_trained = False
+        self.rules = KeywordMatcher.from_file()
+        self.model_version = self.rules.version  # rule-based until trained
+        self.source_path = None  # model file this classifier was loaded from
+        self.pending_path = model_path  # model file still to be loaded
+        self.trained_through_id = None  # highest complaint_id seen by partial_fit
+        self.trained_rows = 0  # complaints seen by partial_fit
+    
+    def ensure_loaded(self):
+        """Load the pending model file, if any (thread-safe, runs once)"""
+        if self.pending_path is None:
+            return
+        with _load_lock:
+            if self.pending_path is not None:
+                self.load_model(self.pending_path)
         
     def train(self, complaint_texts: list, fault_labels: list, severity_labels: list):
         """
@@ -29,109 +93,585 @@ class ComplaintClassifier:
             fault_labels: List of fault categories (labels)
             severity_labels: List of severity levels (low, medium, high, critical)
         """
+        from sklearn.feature_extraction.text import TfidfVectorizer
+        from sklearn.naive_bayes import MultinomialNB
+        
+        vectorizer = TfidfVectorizer(max_features=500, stop_words='english')
+        features = vectorizer.fit_transform([normalize_text(text) for text in complaint_texts])
+        
         # Fault type classifier
-        self.fault_pipeline = Pipeline([
-            ('tfidf', TfidfVectorizer(max_features=500, stop_words='english')),
-            ('nb', MultinomialNB(alpha=1.0))
-        ])
-        self.fault_pipeline.fit(complaint_texts, fault_labels)
+        fault_model = MultinomialNB(alpha=1.0).fit(features, fault_labels)
         
         # Severity classifier
-        self.severity_pipeline = Pipeline([
-            ('tfidf', TfidfVectorizer(max_features=500, stop_words='english')),
-            ('nb', MultinomialNB(alpha=1.0))
-        ])
-        self.severity_pipeline.fit(complaint_texts, severity_labels)
+        severity_model = MultinomialNB(alpha=1.0).fit(features, severity_labels)
+        
+        self._install(vectorizer, fault_model, severity_model)
+        self.trained_through_id = None
+        self.trained_rows = 0
+    
+    @property
+    def incremental(self) -> bool:
+        """True when the model uses the hashing vectorizer and can be updated by partial_fit"""
+        return self.vectorizer is not None and not hasattr(self.vectorizer, "vocabulary_")
+    
+    def partial_fit(self, complaint_texts: list, fault_labels: list, severity_labels: list,
+                    fault_classes: list, severity_classes: list, last_id: Optional[int] = None):
+        """
+        Update the hashing model with one chunk of labelled complaints
+
+        The first call on a classifier without a hashing model starts a new
+        one; fault_classes / severity_classes must list every label the model
+        will ever see and match the classes of a model being updated.
+        Memory does not grow with the number of chunks: the vectorizer keeps
+        no vocabulary and each head only accumulates per-class feature counts.
+
+        Train a separate instance, call finish_partial_fit, then hand it to the
+        live classifier with adopt() (or save_model + load_model).
+        """
+        from sklearn.naive_bayes import MultinomialNB
         
+        if not self.incremental:
+            self.vectorizer = _hashing_vectorizer()
+            self.fault_model = MultinomialNB(alpha=1.0)
+            self.severity_model = MultinomialNB(alpha=1.0)
+            self.trained_through_id = None
+            self.trained_rows = 0
+        features = self.vectorizer.transform([normalize_text(text) for text in complaint_texts])
+        for model, labels, classes in (
+            (self.fault_model, fault_labels, fault_classes),
+            (self.severity_model, severity_labels, severity_classes)
+        ):
+            _make_writable(model)
+            model.partial_fit(features, labels, classes=sorted(classes))
+        self.trained_rows += len(complaint_texts)
+        if last_id is not None:
+            self.trained_through_id = max(last_id, self.trained_through_id or 0)
+    
+    def finish_partial_fit(self):
+        """Mark the model updated by partial_fit as trained and give it a new version"""
         self.is_trained = True
+        self.model_version = self._fingerprint()
+        self.source_path = None
+    
+    def adopt(self, other: "ComplaintClassifier"):
+        """Take over another classifier's trained model in one step (hot swap)"""
+        self._install(other.vectorizer, other.fault_model, other.severity_model, other.model_version)
+        self.trained_through_id = other.trained_through_id
+        self.trained_rows = other.trained_rows
+        self.source_path = other.source_path
+    
+    def _install(self, vectorizer, fault_model, severity_model, model_version: Optional[str] = None):
+        with _swap_lock:
+            self.vectorizer = vectorizer
+            self.fault_model = fault_model
+            self.severity_model = severity_model
+            self.model_version = model_version or self._fingerprint()
+            self.is_trained = True
+            self.source_path = None
+    
+    def _components(self) -> tuple:
+        """(vectorizer, fault_model, severity_model, model_version) from one model"""
+        with _swap_lock:
+            return self.vectorizer, self.fault_model, self.severity_model, self.model_version
+    
+    def _fingerprint(self) -> str:
+        """Stable version id derived from the fitted vocabulary and model weights"""
+        digest = hashlib.sha256()
+        if self.incremental:
+            digest.update(json.dumps(_json_params(self.vectorizer), sort_keys=True).encode())
+        else:
+            for term, index in sorted(self.vectorizer.vocabulary_.items()):
+                digest.update(f"{term}:{index};".encode())
+            digest.update(self.vectorizer.idf_.tobytes())
+        for model in (self.fault_model, self.severity_model):
+            digest.update("|".join(map(str, model.classes_)).encode())
+            digest.update(model.feature_log_prob_.tobytes())
+            digest.update(model.class_log_prior_.tobytes())
+        return digest.hexdigest()[:16]
     
     def predict_fault_type(self, complaint_text: str) -> str:
         """Predict the fault category for a complaint"""
+        complaint_text = normalize_text(complaint_text)
+        self.ensure_loaded()
         if not self.is_trained:
             return self._rule_based_fault_prediction(complaint_text)
-        return self.fault_pipeline.predict([complaint_text])[0]
+        vectorizer, fault_model, _, _ = self._components()
+        return fault_model.predict(vectorizer.transform([complaint_text]))[0]
     
     def predict_severity(self, complaint_text: str) -> str:
         """Predict the severity level of a complaint"""
+        complaint_text = normalize_text(complaint_text)
+        self.ensure_loaded()
         if not self.is_trained:
             return self._rule_based_severity_prediction(complaint_text)
-        return self.severity_pipeline.predict([complaint_text])[0]
+        vectorizer, _, severity_model, _ = self._components()
+        return severity_model.predict(vectorizer.transform([complaint_text]))[0]
     
     def get_confidence(self, complaint_text: str) -> Tuple[float, float]:
         """Get confidence scores for predictions"""
+        complaint_text = normalize_text(complaint_text)
+        self.ensure_loaded()
         if not self.is_trained:
             return (0.75, 0.70)
         
-        fault_proba = self.fault_pipeline.predict_proba([complaint_text]).max()
-        severity_proba = self.severity_pipeline.predict_proba([complaint_text]).max()
+        vectorizer, fault_model, severity_model, _ = self._components()
+        features = vectorizer.transform([complaint_text])
+        fault_proba = fault_model.predict_proba(features).max()
+        severity_proba = severity_model.predict_proba(features).max()
         
         return (fault_proba, severity_proba)
     
+    def classify_many(self, complaint_texts: list) -> list:
+        """
+        Classify a batch of complaints in one pass
+
+        The batch is vectorized once into a single sparse matrix and each head
+        runs predict_proba once; labels are the argmax of those probabilities.
+
+        Returns a list of classify_complaint-style dicts, in input order
+        """
+        if not complaint_texts:
+            return []
+        complaint_texts = [normalize_text(text) for text in complaint_texts]
+        
+        self.ensure_loaded()
+        if not self.is_trained:
+            fault_conf, severity_conf = self.get_confidence("")
+            return [
+                {
+                    "fault_type": fault_type,
+                    "severity": severity,
+                    "fault_confidence": fault_conf,
+                    "severity_confidence": severity_conf,
+                    "model_version": self.model_version
+                }
+                for fault_type, severity in self.rules.classify_many(complaint_texts)
+            ]
+        
+        vectorizer, fault_model, severity_model, model_version = self._components()
+        features = vectorizer.transform(complaint_texts)
+        fault_proba = fault_model.predict_proba(features)
+        severity_proba = severity_model.predict_proba(features)
+        fault_index = fault_proba.argmax(axis=1)
+        severity_index = severity_proba.argmax(axis=1)
+        fault_labels = fault_model.classes_[fault_index]
+        severity_labels = severity_model.classes_[severity_index]
+        rows = range(len(complaint_texts))
+        fault_conf = fault_proba[rows, fault_index]
+        severity_conf = severity_proba[rows, severity_index]
+        
+        return [
+            {
+                "fault_type": str(fault_labels[i]),
+                "severity": str(severity_labels[i]),
+                "fault_confidence": round(float(fault_conf[i]), 3),
+                "severity_confidence": round(float(severity_conf[i]), 3),
+                "model_version": model_version
+            }
+            for i in rows
+        ]
+    
     def _rule_based_fault_prediction(self, text: str) -> str:
         """
         Simple rule-based fault prediction when model is not trained
         Used for initial predictions before training data is available
         """
-        text_lower = text.lower()
-        
-        if any(word in text_lower for word in ['battery', 'charge', 'drain', 'power']):
-            return "Battery Issue"
-        elif any(word in text_lower for word in ['sound', 'audio', 'distort', 'crackle']):
-            return "Audio Quality"
-        elif any(word in text_lower for word in ['bluetooth', 'connect', 'pair', 'disconn']):
-            return "Connectivity"
-        elif any(word in text_lower for word in ['water', 'damage', 'crack', 'broken']):
-            return "Physical Damage"
-        elif any(word in text_lower for word in ['crash', 'freeze', 'bug', 'app']):
-            return "Software Bug"
-        elif any(word in text_lower for word in ['firmware', 'update', 'upgrade']):
-            return "Firmware Update"
-        elif any(word in text_lower for word in ['warranty', 'return', 'refund']):
-            return "Warranty/Return"
-        else:
-            return "Performance"
+        return self.rules.fault_type(text)
     
     def _rule_based_severity_prediction(self, text: str) -> str:
         """
         Simple rule-based severity prediction
         Used for initial predictions before training data is available
         """
-        text_lower = text.lower()
+        return self.rules.severity(text)
+    
+    def save_model(self, filepath: str):
+        """
+        Save trained model to disk as a memory-mappable artifact
+
+        Vocabulary, IDF weights and the Naive Bayes log-probability matrices
+        are stored as raw NumPy arrays (see model_artifact.py)
+        """
+        if not self.is_trained:
+            return
+        if self.incremental:
+            self._save_hashing_model(filepath)
+            return
+        terms = np.empty(len(self.vectorizer.vocabulary_), dtype=object)
+        for term, index in self.vectorizer.vocabulary_.items():
+            terms[index] = term
         
-        critical_keywords = ['won\'t', 'doesn\'t work', 'completely broken', 'not working', 'dead']
-        high_keywords = ['completely', 'severe', 'major', 'extreme']
-        medium_keywords = ['issue', 'problem', 'bad', 'poor']
+        arrays = {
+            "vocabulary": terms.astype(str),
+            "idf": self.vectorizer.idf_
+        }
+        for head, model in (("fault", self.fault_model), ("severity", self.severity_model)):
+            arrays[f"{head}_classes"] = np.asarray(model.classes_).astype(str)
+            arrays[f"{head}_feature_log_prob"] = model.feature_log_prob_
+            arrays[f"{head}_class_log_prior"] = model.class_log_prior_
+        
+        save_artifact(filepath, arrays, {
+            "model_version": self.model_version,
+            "vectorizer_params": _json_params(self.vectorizer),
+            "nb_params": {
+                "fault": _json_params(self.fault_model),
+                "severity": _json_params(self.severity_model)
+            }
+        })
+    
+    def _save_hashing_model(self, filepath: str):
+        """
+        Hashing models have no vocabulary to store; the per-class feature and
+        class counts are kept next to the log probabilities so a loaded model
+        can be updated with partial_fit
+        """
+        arrays = {}
+        for head, model in (("fault", self.fault_model), ("severity", self.severity_model)):
+            arrays[f"{head}_classes"] = np.asarray(model.classes_).astype(str)
+            arrays[f"{head}_feature_log_prob"] = model.feature_log_prob_
+            arrays[f"{head}_class_log_prior"] = model.class_log_prior_
+            arrays[f"{head}_feature_count"] = model.feature_count_
+            arrays[f"{head}_class_count"] = model.class_count_
         
-        if any(word in text_lower for word in critical_keywords):
-            return "critical"
-        elif any(word in text_lower for word in high_keywords):
-            return "high"
-        elif any(word in text_lower for word in medium_keywords):
-            return "medium"
+        save_artifact(filepath, arrays, {
+            "model_version": self.model_version,
+            "vectorizer": "hashing",
+            "vectorizer_params": _json_params(self.vectorizer),
+            "nb_params": {
+                "fault": _json_params(self.fault_model),
+                "severity": _json_params(self.severity_model)
+            },
+            "trained_through_id": self.trained_through_id,
+            "trained_rows": self.trained_rows
+        })
+    
+    def load_model(self, filepath: str, verify: bool = True):
+        """
+        Load trained model from disk
+
+        Artifacts written by save_model are memory-mapped read-only, so
+        processes loading the same file share its pages. Pickled models
+        (including the older two-Pipeline format) are still accepted.
+        """
+        self.pending_path = None
+        if not os.path.exists(filepath):
+            return
+        if is_artifact(filepath):
+            self._load_artifact(filepath, verify)
         else:
-            return "low"
+            self._load_pickle(filepath)
+        self.source_path = filepath
+        self.is_trained = True
     
-    def save_model(self, filepath: str):
-        """Save trained model to disk"""
-        if self.is_trained:
-            with open(filepath, 'wb') as f:
-                pickle.dump({
-                    'fault_pipeline': self.fault_pipeline,
-                    'severity_pipeline': self.severity_pipeline
-                }, f)
-    
-    def load_model(self, filepath: str):
-        """Load trained model from disk"""
-        if os.path.exists(filepath):
-            with open(filepath, 'rb') as f:
-                data = pickle.load(f)
-                self.fault_pipeline = data['fault_pipeline']
-                self.severity_pipeline = data['severity_pipeline']
-                self.is_trained = True
+    def _load_artifact(self, filepath: str, verify: bool):
+        from sklearn.feature_extraction.text import HashingVectorizer, TfidfVectorizer
+        from sklearn.naive_bayes import MultinomialNB
+        
+        arrays, meta = load_artifact(filepath, verify=verify)
+        
+        if meta.get("vectorizer") == "hashing":
+            vectorizer = HashingVectorizer(**_from_json_params(meta["vectorizer_params"]))
+        else:
+            vectorizer = TfidfVectorizer(**_from_json_params(meta["vectorizer_params"]))
+            vectorizer.vocabulary_ = {str(term): index for index, term in enumerate(arrays["vocabulary"])}
+            vectorizer.idf_ = arrays["idf"]
+        
+        heads = {}
+        for head in ("fault", "severity"):
+            model = MultinomialNB(**_from_json_params(meta["nb_params"][head]))
+            model.classes_ = arrays[f"{head}_classes"]
+            model.feature_log_prob_ = arrays[f"{head}_feature_log_prob"]
+            model.class_log_prior_ = arrays[f"{head}_class_log_prior"]
+            model.n_features_in_ = model.feature_log_prob_.shape[1]
+            if f"{head}_feature_count" in arrays:
+                model.feature_count_ = arrays[f"{head}_feature_count"]
+                model.class_count_ = arrays[f"{head}_class_count"]
+            heads[head] = model
+        
+        self._install(vectorizer, heads["fault"], heads["severity"], meta["model_version"])
+        self.trained_through_id = meta.get("trained_through_id")
+        self.trained_rows = meta.get("trained_rows", 0)
+    
+    def _load_pickle(self, filepath: str):
+        """
+        Older pickled models. In the two-Pipeline format both TF-IDF steps
+        were fitted on the same texts with the same settings, so the fault
+        pipeline's vectorizer is reused for both heads.
+        """
+        with open(filepath, 'rb') as f:
+            data = pickle.load(f)
+        if 'fault_pipeline' in data:
+            data = {
+                'vectorizer': data['fault_pipeline'].named_steps['tfidf'],
+                'fault_model': data['fault_pipeline'].named_steps['nb'],
+                'severity_model': data['severity_pipeline'].named_steps['nb']
+            }
+        self._install(data['vectorizer'], data['fault_model'], data['severity_model'])
+
+
+def _json_params(estimator) -> dict:
+    """Constructor params that survive a JSON round trip (e.g. dtype is left at its default)"""
+    return {
+        name: list(value) if isinstance(value, tuple) else value
+        for name, value in estimator.get_params().items()
+        if isinstance(value, (str, int, float, bool, tuple, type(None)))
+    }
+
+
+def _from_json_params(params: dict) -> dict:
+    # sklearn expects tuples (e.g. ngram_range) where JSON gives lists
+    return {name: tuple(value) if isinstance(value, list) else value for name, value in params.items()}
+
+
+def _hashing_vectorizer():
+    """
+    Stateless featurizer for incremental training: unigrams and bigrams hashed
+    into HASHING_FEATURES columns, non-negative as MultinomialNB requires
+    """
+    from sklearn.feature_extraction.text import HashingVectorizer
+    return HashingVectorizer(
+        n_features=HASHING_FEATURES, alternate_sign=False, ngram_range=(1, 2),
+        stop_words='english', norm='l2'
+    )
+
+
+def _make_writable(model):
+    """Copy count arrays mapped read-only from an artifact before partial_fit updates them in place"""
+    for name in ("feature_count_", "class_count_"):
+        value = getattr(model, name, None)
+        if value is not None and not value.flags.writeable:
+            setattr(model, name, np.array(value))
+
+
+# ==================== Classification Cache ====================
+
+def normalize_text(text: str) -> str:
+    """
+    Canonical form of a complaint: NFKC, lowercased, whitespace collapsed
+    Every ComplaintClassifier entry point (training included) classifies this
+    form, and the classification cache is keyed on it, so a cached result is
+    exactly what the classifier would return for any text with the same key
+    """
+    return " ".join(unicodedata.normalize("NFKC", text).lower().split())
+
+
+def text_key(text: str) -> tuple:
+    """(normalized text, 16-byte digest used as the cache key)"""
+    normalized = normalize_text(text)
+    return normalized, hashlib.sha256(normalized.encode()).digest()[:16]
+
+
+class ClassificationCache:
+    """
+    Content-addressed LRU of classify_complaint results
+
+    Entries are keyed by the digest of the normalized text and belong to one
+    model version: the first lookup or store for a different model_version
+    (after load_model, train or a hot swap) drops every in-memory entry. With
+    a path, results are also written to a small SQLite table keyed by
+    (digest, model_version), trimmed to disk_entries least recently stored rows.
+    """
+
+    TABLE = "classification_cache"
+    PRUNE_EVERY = 1000  # disk stores between trims
+
+    def __init__(self, max_entries: int = CLASSIFICATION_CACHE_SIZE, path: Optional[str] = CLASSIFICATION_CACHE_PATH,
+                 disk_entries: int = CLASSIFICATION_CACHE_DISK_SIZE):
+        self.max_entries = max_entries
+        self.path = path
+        self.disk_entries = disk_entries
+        self.model_version = None
+        self._entries = OrderedDict()  # digest -> result dict
+        self._lock = threading.Lock()
+        self._disk = None
+        self._disk_lock = threading.Lock()
+        self._stores_since_prune = 0
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+    
+    @property
+    def enabled(self) -> bool:
+        return self.max_entries > 0
+    
+    def _use_version(self, model_version: str):
+        """Switch to model_version, dropping older entries; call with _lock held"""
+        if model_version == self.model_version:
+            return
+        if self.model_version is not None:
+            self.invalidations += 1
+        self._entries.clear()
+        self.model_version = model_version
+    
+    def get_many(self, keys: list, model_version: str) -> list:
+        """Cached results (or None) for digests, in order"""
+        if not self.enabled:
+            return [None] * len(keys)
+        results = []
+        with self._lock:
+            self._use_version(model_version)
+            for key in keys:
+                result = self._entries.get(key)
+                if result is not None:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                results.append(result)
+        missing = [key for key, result in zip(keys, results) if result is None]
+        if missing and self.path:
+            found = self._disk_get(missing, model_version)
+            if found:
+                with self._lock:
+                    if self.model_version == model_version:
+                        for key, result in found.items():
+                            self._remember(key, result)
+                    self.disk_hits += len(found)
+                results = [result if result is not None else found.get(key) for key, result in zip(keys, results)]
+        with self._lock:
+            self.misses += sum(result is None for result in results)
+        return [dict(result) if result is not None else None for result in results]
+    
+    def put_many(self, items: list):
+        """Store (digest, result) pairs; results from a model other than the current one are skipped"""
+        if not self.enabled or not items:
+            return
+        model_version = items[0][1]["model_version"]
+        with self._lock:
+            if self.model_version is None:
+                self._use_version(model_version)
+            if model_version != self.model_version:
+                return
+            for key, result in items:
+                self._remember(key, dict(result))
+        if self.path:
+            self._disk_put(items, model_version)
+    
+    def _remember(self, key: bytes, result: dict):
+        self._entries[key] = result
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+    
+    def classify_many(self, model: "ComplaintClassifier", complaint_texts: list) -> list:
+        """
+        model.classify_many through the cache: only texts whose normalized
+        form is neither cached nor repeated earlier in the batch are classified
+        (the model normalizes them too, so the results are the same)
+        """
+        if not self.enabled:
+            return model.classify_many(complaint_texts)
+        model.ensure_loaded()
+        keyed = [text_key(text) for text in complaint_texts]
+        results = self.get_many([key for _, key in keyed], model.model_version)
+        pending = {}  # digest -> first text with that digest
+        for text, (_, key), result in zip(complaint_texts, keyed, results):
+            if result is None:
+                pending.setdefault(key, text)
+        if pending:
+            classified = dict(zip(pending, model.classify_many(list(pending.values()))))
+            self.put_many(list(classified.items()))
+            results = [
+                result if result is not None else dict(classified[key])
+                for (_, key), result in zip(keyed, results)
+            ]
+        return results
+    
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+    
+    # -- on-disk table --
+    
+    def _connection(self) -> sqlite3.Connection:
+        if self._disk is None:
+            conn = sqlite3.connect(self.path, check_same_thread=False, timeout=5)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(
+                f"CREATE TABLE IF NOT EXISTS {self.TABLE} ("
+                "key BLOB NOT NULL, model_version TEXT NOT NULL, result TEXT NOT NULL, "
+                "stored_at REAL NOT NULL, PRIMARY KEY (key, model_version)) WITHOUT ROWID"
+            )
+            conn.execute(f"CREATE INDEX IF NOT EXISTS ix_{self.TABLE}_stored_at ON {self.TABLE} (stored_at)")
+            self._disk = conn
+        return self._disk
+    
+    def _disk_get(self, keys: list, model_version: str) -> dict:
+        placeholders = ",".join("?" * len(keys))
+        try:
+            with self._disk_lock:
+                rows = self._connection().execute(
+                    f"SELECT key, result FROM {self.TABLE} WHERE model_version = ? AND key IN ({placeholders})",
+                    (model_version, *keys)
+                ).fetchall()
+        except sqlite3.Error:
+            return {}
+        return {key: json.loads(result) for key, result in rows}
+    
+    def _disk_put(self, items: list, model_version: str):
+        now = time.time()
+        try:
+            with self._disk_lock:
+                conn = self._connection()
+                with conn:
+                    conn.executemany(
+                        f"INSERT OR REPLACE INTO {self.TABLE} (key, model_version, result, stored_at) VALUES (?, ?, ?, ?)",
+                        [(key, model_version, json.dumps(result), now) for key, result in items]
+                    )
+                self._stores_since_prune += len(items)
+                if self._stores_since_prune >= self.PRUNE_EVERY:
+                    self._stores_since_prune = 0
+                    with conn:
+                        conn.execute(
+                            f"DELETE FROM {self.TABLE} WHERE stored_at < ("
+                            f"SELECT stored_at FROM {self.TABLE} ORDER BY stored_at DESC LIMIT 1 OFFSET ?)",
+                            (self.disk_entries,)
+                        )
+        except sqlite3.Error:
+            # The disk layer is an optimization; a locked or unwritable file must not fail classification
+            pass
+    
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.disk_hits + self.misses
+            return {
+                "enabled": self.enabled,
+                "persistent": bool(self.path),
+                "model_version": self.model_version,
+                "size": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "hit_rate": round((self.hits + self.disk_hits) / lookups, 4) if lookups else 0.0,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations
+            }
+
+
+# Global classification cache, in front of the global classifier
+classification_cache = ClassificationCache()
 
 
 # Global classifier instance
-classifier = ComplaintClassifier()
+classifier = ComplaintClassifier(
+    model_path=CLASSIFIER_MODEL_PATH or (RETRAINED_MODEL_PATH if os.path.exists(RETRAINED_MODEL_PATH) else None)
+)
+
+
+def warmup() -> float:
+    """
+    Load the configured model and run one prediction so the first real
+    request doesn't pay for imports and lazy initialization
+
+    Returns the seconds spent
+    """
+    start = time.perf_counter()
+    classifier.ensure_loaded()
+    classifier.classify_many(["warmup"])
+    return time.perf_counter() - start
 
 
 def classify_complaint(complaint_text: str) -> dict:
@@ -143,16 +683,259 @@ def classify_complaint(complaint_text: str) -> dict:
             "fault_type": str,
             "severity": str,
             "fault_confidence": float,
-            "severity_confidence": float
+            "severity_confidence": float,
+            "model_version": str
         }
+
+    Repeated texts (after normalization) are served from classification_cache.
+    """
+    return classification_cache.classify_many(classifier, [complaint_text])[0]
+
+
+# ==================== Inference Service ====================
+
+# Classifier copy held by each worker process
+_worker_classifier = None
+
+
+def _init_worker(model_state: Optional[bytes], model_path: Optional[str]):
+    global _worker_classifier
+    if model_path is not None:
+        # Map the artifact instead of receiving a pickled copy of the weights
+        _worker_classifier = ComplaintClassifier()
+        _worker_classifier.load_model(model_path, verify=False)
+    else:
+        _worker_classifier = pickle.loads(model_state)
+
+
+def _classify_in_worker(complaint_texts: list) -> list:
+    return _worker_classifier.classify_many(complaint_texts)
+
+
+class InferenceService:
+    """
+    Async, micro-batching front end for ComplaintClassifier
+
+    Concurrent classify() calls are queued and grouped into batches (up to
+    max_batch texts, waiting at most window_ms for the batch to fill). Each
+    batch runs as one classify_many call in a process pool with `workers`
+    processes, or in a thread of this process when workers is 0. While all
+    workers are busy, requests keep queueing, so batches grow with load.
+
+    With a cache, texts already classified by the current model are answered
+    before they reach the queue, and batch results are stored in it.
+
+    If a worker process dies (OOM, a crash in native code), the pool is
+    replaced and the batch retried once, so one crash doesn't fail every
+    later request.
     """
-    fault_type = classifier.predict_fault_type(complaint_text)
-    severity = classifier.predict_severity(complaint_text)
-    fault_conf, severity_conf = classifier.get_confidence(complaint_text)
     
-    return {
-        "fault_type": fault_type,
-        "severity": severity,
-        "fault_confidence": round(fault_conf, 3),
-        "severity_confidence": round(severity_conf, 3)
-    }
+    BATCH_SIZE_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128, 256, float("inf"))
+    
+    def __init__(
+        self,
+        model: ComplaintClassifier,
+        workers: int = INFERENCE_WORKERS,
+        window_ms: float = INFERENCE_BATCH_WINDOW_MS,
+        max_batch: int = INFERENCE_MAX_BATCH,
+        cache: Optional[ClassificationCache] = None
+    ):
+        self.model = model
+        self.cache = cache
+        self.workers = workers
+        self.window = window_ms / 1000
+        self.max_batch = max_batch
+        self._queue = None
+        self._pool = None
+        self._batcher = None
+        self._slots = None
+        self._in_flight = set()
+        self._reset_stats()
+    
+    def _reset_stats(self):
+        self.requests = 0
+        self.batches = 0
+        self.batched_texts = 0
+        self.max_batch_seen = 0
+        self.inference_seconds = 0.0
+        self.pool_restarts = 0
+        self.batch_size_counts = {bucket: 0 for bucket in self.BATCH_SIZE_BUCKETS}
+    
+    @property
+    def running(self) -> bool:
+        return self._batcher is not None
+    
+    def _worker_init_args(self) -> tuple:
+        self.model.ensure_loaded()
+        path = self.model.source_path
+        if path is not None and is_artifact(path):
+            return (None, path)
+        return (pickle.dumps(self.model), None)
+    
+    def _start_pool(self):
+        if self.workers > 0:
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_worker,
+                initargs=self._worker_init_args()
+            )
+    
+    async def start(self):
+        """Start the batcher (and worker processes); call from the event loop"""
+        if self.running:
+            return
+        self._queue = asyncio.Queue()
+        self._slots = asyncio.Semaphore(max(self.workers, 1))
+        self._start_pool()
+        self._batcher = asyncio.create_task(self._batch_loop())
+    
+    async def stop(self):
+        """Finish queued work, then stop the batcher and worker processes"""
+        if not self.running:
+            return
+        await self._queue.join()
+        if self._in_flight:
+            await asyncio.gather(*self._in_flight)
+        self._batcher.cancel()
+        self._batcher = None
+        if self._pool is not None:
+            self._pool.shutdown(wait=True)
+            self._pool = None
+    
+    def reload(self, model: Optional[ComplaintClassifier] = None):
+        """Swap in a new model; worker processes are replaced with fresh copies"""
+        if model is not None:
+            self.model = model
+        if self._pool is not None:
+            self._replace_pool(self._pool)
+    
+    def _replace_pool(self, old_pool: ProcessPoolExecutor):
+        # Concurrent batches may all see the same broken pool; replace it once
+        if self._pool is old_pool:
+            self._start_pool()
+            old_pool.shutdown(wait=False)
+    
+    async def classify(self, complaint_text: str) -> dict:
+        """Classify one complaint (see classify_complaint for the result shape)"""
+        self.requests += 1
+        key = None
+        # A model still waiting for its lazy load has no version to look up yet
+        if self.cache is not None and self.cache.enabled and self.model.pending_path is None:
+            _, key = text_key(complaint_text)
+            cached = self.cache.get_many([key], self.model.model_version)[0]
+            if cached is not None:
+                return cached
+        if not self.running:
+            start = time.perf_counter()
+            result = self.model.classify_many([complaint_text])[0]
+            self._observe("inline", 1, time.perf_counter() - start)
+            if key is not None:
+                self.cache.put_many([(key, result)])
+            return result
+        future = asyncio.get_running_loop().create_future()
+        self._queue.put_nowait((complaint_text, key, future))
+        return await future
+    
+    async def classify_many(self, complaint_texts: List[str]) -> list:
+        return list(await asyncio.gather(*(self.classify(text) for text in complaint_texts)))
+    
+    async def _batch_loop(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            deadline = loop.time() + self.window
+            while len(batch) < self.max_batch:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), remaining))
+                except asyncio.TimeoutError:
+                    break
+            
+            await self._slots.acquire()
+            task = asyncio.create_task(self._run_batch(batch))
+            self._in_flight.add(task)
+            task.add_done_callback(self._in_flight.discard)
+    
+    async def _run_batch(self, batch: list):
+        loop = asyncio.get_running_loop()
+        texts = [text for text, _, _ in batch]
+        start = time.perf_counter()
+        try:
+            if self._pool is None:
+                results = await loop.run_in_executor(None, self.model.classify_many, texts)
+            else:
+                results = await self._run_in_pool(texts)
+        except Exception as e:
+            for _, _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+        else:
+            for (_, _, future), result in zip(batch, results):
+                if not future.done():
+                    future.set_result(result)
+            if self.cache is not None:
+                self.cache.put_many([(key, result) for (_, key, _), result in zip(batch, results) if key is not None])
+        finally:
+            self._record_batch(len(batch), time.perf_counter() - start)
+            for _ in batch:
+                self._queue.task_done()
+            self._slots.release()
+    
+    async def _run_in_pool(self, texts: List[str]) -> list:
+        loop = asyncio.get_running_loop()
+        pool = self._pool
+        try:
+            return await loop.run_in_executor(pool, _classify_in_worker, texts)
+        except BrokenProcessPool:
+            self.pool_restarts += 1
+            self._replace_pool(pool)
+        # A batch that kills its worker again fails (its callers get the error),
+        # but the pool is still replaced for the requests after it
+        pool = self._pool
+        try:
+            return await loop.run_in_executor(pool, _classify_in_worker, texts)
+        except BrokenProcessPool:
+            self.pool_restarts += 1
+            self._replace_pool(pool)
+            raise
+    
+    @staticmethod
+    def _observe(mode: str, size: int, seconds: float):
+        metrics.classifier_inference_duration.observe(seconds, mode)
+        metrics.classifier_batch_size.observe(size, mode)
+    
+    def _record_batch(self, size: int, seconds: float):
+        self._observe("process" if self._pool is not None else "thread", size, seconds)
+        self.batches += 1
+        self.batched_texts += size
+        self.max_batch_seen = max(self.max_batch_seen, size)
+        self.inference_seconds += seconds
+        for bucket in self.BATCH_SIZE_BUCKETS:
+            if size <= bucket:
+                self.batch_size_counts[bucket] += 1
+                break
+    
+    def stats(self) -> dict:
+        return {
+            "running": self.running,
+            "workers": self.workers,
+            "batch_window_ms": self.window * 1000,
+            "max_batch": self.max_batch,
+            "queue_depth": self._queue.qsize() if self._queue is not None else 0,
+            "batches_in_flight": len(self._in_flight),
+            "requests": self.requests,
+            "batches": self.batches,
+            "avg_batch_size": round(self.batched_texts / self.batches, 2) if self.batches else 0,
+            "max_batch_size": self.max_batch_seen,
+            "batch_size_histogram": {f"le_{bucket}": count for bucket, count in self.batch_size_counts.items()},
+            "inference_seconds_total": round(self.inference_seconds, 4),
+            "pool_restarts": self.pool_restarts,
+            "cache": self.cache.stats() if self.cache is not None else None
+        }
+
+
+# Global inference service (started by the API on startup)
+inference_service = InferenceService(classifier, cache=classification_cache)
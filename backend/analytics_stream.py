@@ -0,0 +1,240 @@
+"""
+Server-Sent Events push for dashboard analytics
+Complaint writes bump the result cache version; the broadcaster recomputes the
+dashboard state once per (debounced) change and pushes only the sections that
+changed to every connected client, instead of N dashboards polling in full.
+Writes handled by other worker processes are picked up by a periodic check of
+a cheap change token.
+"""
+import asyncio
+import json
+import os
+from typing import Optional, Set
+
+from fastapi.concurrency import run_in_threadpool
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy import func, select
+
+from database import Complaint, ComplaintRollup, ReadSessionLocal
+from predictive_insights import rollup_insights, get_dashboard_summary
+from columnar import analytics_insights
+from cache import result_cache
+
+# Defaults, overridable via environment
+DEBOUNCE_SECONDS = float(os.getenv("ANALYTICS_STREAM_DEBOUNCE", "0.5"))
+KEEPALIVE_SECONDS = float(os.getenv("ANALYTICS_STREAM_KEEPALIVE", "15"))
+REFRESH_SECONDS = float(os.getenv("ANALYTICS_STREAM_REFRESH", "5"))
+TREND_DAYS = 30
+QUEUE_SIZE = 16
+
+
+def compute_state(db) -> dict:
+    """Everything a dashboard shows, as JSON-ready data"""
+    return jsonable_encoder({
+        "dashboard": get_dashboard_summary(db),
+        "summary": analytics_insights.get_summary_stats(db),
+        "trends": rollup_insights.get_complaint_trend(db, TREND_DAYS),
+    })
+
+
+def change_token(db) -> tuple:
+    """
+    Cheap fingerprint of the complaint data: the newest complaint_id plus the
+    status and fault type rollup rows (a few dozen), which every insert,
+    status or resolution update and re-score changes, whichever process
+    made it
+    """
+    newest = db.execute(select(func.max(Complaint.complaint_id))).scalar()
+    rollup_rows = db.execute(
+        select(ComplaintRollup.__table__).where(
+            ComplaintRollup.dimension.in_(("status", "fault_type"))
+        ).order_by(ComplaintRollup.dimension, ComplaintRollup.bucket)
+    ).all()
+    return newest, tuple(tuple(row) for row in rollup_rows)
+
+
+def diff_state(old: dict, new: dict) -> dict:
+    """
+    Compact delta between two states: for each resource, only the top-level
+    keys whose values changed
+    """
+    delta = {}
+    for resource, values in new.items():
+        previous = old.get(resource, {})
+        changed = {key: value for key, value in values.items() if previous.get(key) != value}
+        if changed:
+            delta[resource] = changed
+    return delta
+
+
+def format_event(event: str, data: dict, event_id: Optional[int] = None) -> str:
+    lines = [f"event: {event}"]
+    if event_id is not None:
+        lines.append(f"id: {event_id}")
+    lines.append(f"data: {json.dumps(data, separators=(',', ':'))}")
+    return "\n".join(lines) + "\n\n"
+
+
+class AnalyticsBroadcaster:
+    """
+    Fan-out of analytics deltas to SSE subscribers
+
+    notify() may be called from any thread (writes run in the threadpool);
+    recomputation happens on one background task, so the database sees one
+    recompute per change no matter how many dashboards are open.
+
+    notify() only hears about writes made by this process. While clients are
+    connected, the change token is also checked every `refresh` seconds; when
+    another process has written, this process's cached analytics are
+    invalidated and the state recomputed.
+    """
+
+    def __init__(self, debounce: float = DEBOUNCE_SECONDS, refresh: float = REFRESH_SECONDS):
+        self.debounce = debounce
+        self.refresh = refresh
+        self.version = 0
+        self.recomputes = 0
+        self.external_changes = 0
+        self._state = None
+        self._token = None
+        self._invalidating = False  # inside our own bump_version (_changed_elsewhere)
+        self._subscribers: Set[asyncio.Queue] = set()
+        self._loop = None
+        self._dirty = None
+        self._state_lock = None
+        self._task = None
+
+    def _ensure_started(self):
+        if self._task is None or self._task.done():
+            self._dirty = asyncio.Event()
+            self._state_lock = asyncio.Lock()
+            self._loop = asyncio.get_running_loop()
+            self._task = self._loop.create_task(self._publish_loop())
+
+    def notify(self, cache_version: int = None):
+        """Mark the dashboard state stale (thread-safe; cache listener)"""
+        loop = self._loop
+        if loop is None or loop.is_closed() or self._invalidating:
+            # Our own invalidation: the publish loop recomputes right after it,
+            # after any write that notified meanwhile had committed
+            return
+        loop.call_soon_threadsafe(self._dirty.set)
+
+    async def _compute(self) -> dict:
+        def run():
+            db = ReadSessionLocal()
+            try:
+                # Token first: a write landing in between is seen again on the next check
+                return change_token(db), compute_state(db)
+            finally:
+                db.close()
+        self.recomputes += 1
+        self._token, state = await run_in_threadpool(run)
+        return state
+
+    async def _changed_elsewhere(self) -> bool:
+        """True (and the local caches invalidated) if the data changed since the last compute"""
+        def run():
+            db = ReadSessionLocal()
+            try:
+                return change_token(db)
+            finally:
+                db.close()
+        token = await run_in_threadpool(run)
+        if token == self._token:
+            return False
+        self.external_changes += 1
+        self._invalidating = True
+        try:
+            result_cache.bump_version()
+        finally:
+            self._invalidating = False
+        return True
+
+    async def snapshot(self) -> tuple:
+        """(version, full state), computing it if no current state is held"""
+        async with self._state_lock:
+            if self._state is None:
+                self._state = await self._compute()
+            return self.version, self._state
+
+    async def _publish_loop(self):
+        while True:
+            try:
+                await asyncio.wait_for(self._dirty.wait(), self.refresh)
+            except asyncio.TimeoutError:
+                # Writes by other worker processes never reach notify()
+                try:
+                    if not self._subscribers or not await self._changed_elsewhere():
+                        continue
+                except Exception:
+                    continue
+            else:
+                await asyncio.sleep(self.debounce)  # coalesce bursts of writes
+            self._dirty.clear()
+            async with self._state_lock:
+                if not self._subscribers:
+                    self._state = None  # next subscriber gets a fresh snapshot
+                    continue
+                try:
+                    state = await self._compute()
+                except Exception:
+                    self._state = None
+                    continue
+                delta = diff_state(self._state or {}, state)
+                self._state = state
+                if not delta:
+                    continue
+                self.version += 1
+                self._broadcast(format_event("delta", {"version": self.version, "changes": delta}, self.version))
+
+    def _broadcast(self, message: str):
+        for queue in list(self._subscribers):
+            try:
+                queue.put_nowait(message)
+            except asyncio.QueueFull:
+                # slow client: drop its backlog and have it resync from a snapshot
+                while not queue.empty():
+                    queue.get_nowait()
+                queue.put_nowait(None)
+
+    async def subscribe(self) -> asyncio.Queue:
+        self._ensure_started()
+        queue = asyncio.Queue(maxsize=QUEUE_SIZE)
+        self._subscribers.add(queue)
+        return queue
+
+    def unsubscribe(self, queue: asyncio.Queue):
+        self._subscribers.discard(queue)
+
+    async def events(self, request):
+        """SSE body for one client: a snapshot, then deltas and keepalives"""
+        queue = await self.subscribe()
+        try:
+            version, state = await self.snapshot()
+            yield format_event("snapshot", {"version": version, "state": state}, version)
+            while not await request.is_disconnected():
+                try:
+                    message = await asyncio.wait_for(queue.get(), KEEPALIVE_SECONDS)
+                except asyncio.TimeoutError:
+                    yield ": keepalive\n\n"
+                    continue
+                if message is None:
+                    version, state = await self.snapshot()
+                    message = format_event("snapshot", {"version": version, "state": state}, version)
+                yield message
+        finally:
+            self.unsubscribe(queue)
+
+    def stats(self) -> dict:
+        return {
+            "subscribers": len(self._subscribers),
+            "version": self.version,
+            "recomputes": self.recomputes,
+            "external_changes": self.external_changes
+        }
+
+
+# Global broadcaster, fed by result cache invalidations
+broadcaster = AnalyticsBroadcaster()
+result_cache.add_listener(broadcaster.notify)
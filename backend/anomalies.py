@@ -0,0 +1,170 @@
+"""
+Spike detection for (product, fault type) complaint volume
+Scores the latest day of each combination against an exponentially weighted
+baseline of the preceding days, read from the day_product_fault rollups, so
+an evaluation touches only the window's rollup rows and never rescans history
+"""
+import os
+import threading
+from datetime import date, datetime, timedelta
+from typing import Optional
+
+import numpy as np
+from sqlalchemy.orm import Session
+
+from database import ComplaintRollup, Product
+from rollups import split_bucket
+from cache import result_cache
+
+# Defaults, overridable via environment
+WINDOW_DAYS = int(os.getenv("ANOMALY_WINDOW_DAYS", "28"))  # baseline history before the scored day
+EWMA_SPAN = float(os.getenv("ANOMALY_EWMA_SPAN", "7"))
+Z_THRESHOLD = float(os.getenv("ANOMALY_Z_THRESHOLD", "3"))
+P_THRESHOLD = float(os.getenv("ANOMALY_P_THRESHOLD", "0.001"))
+MIN_COUNT = int(os.getenv("ANOMALY_MIN_COUNT", "3"))  # ignore spikes smaller than this
+BASELINE_FLOOR = 0.1  # expected daily rate for combinations with no history
+
+DIMENSION = "day_product_fault"
+
+
+def load_window(db: Session, end: date, window: int = WINDOW_DAYS) -> tuple:
+    """
+    Daily counts for end-window .. end as a (combinations x days) matrix
+    Returns ([(product_id, fault_type)], matrix); the last column is `end`
+    """
+    start = end - timedelta(days=window)
+    rows = db.query(ComplaintRollup.bucket, ComplaintRollup.complaint_count).filter(
+        ComplaintRollup.dimension == DIMENSION,
+        ComplaintRollup.bucket >= start.isoformat(),
+        ComplaintRollup.bucket < (end + timedelta(days=1)).isoformat(),
+        ComplaintRollup.complaint_count > 0
+    ).all()
+
+    keys, index, cells = [], {}, []
+    for bucket, count in rows:
+        day, product_id, fault_type = split_bucket(bucket, 3)
+        key = (product_id, fault_type)
+        if key not in index:
+            index[key] = len(keys)
+            keys.append(key)
+        cells.append((index[key], (date.fromisoformat(day) - start).days, count))
+
+    matrix = np.zeros((len(keys), window + 1))
+    if cells:
+        row, column, count = np.array(cells).T
+        matrix[row.astype(int), column.astype(int)] = count
+    return keys, matrix
+
+
+def ewma_baseline(history: np.ndarray, span: float = EWMA_SPAN) -> tuple:
+    """Exponentially weighted mean and variance of each row (newest column last)"""
+    alpha = 2 / (span + 1)
+    weights = (1 - alpha) ** np.arange(history.shape[1] - 1, -1, -1)
+    weights /= weights.sum()
+    mean = history @ weights
+    variance = ((history - mean[:, None]) ** 2) @ weights
+    return mean, variance
+
+
+def poisson_tail(observed: np.ndarray, expected: np.ndarray) -> np.ndarray:
+    """
+    Upper-tail probability P(X >= observed) for X ~ Poisson(expected)
+    Uses the bound pmf(x) * (x + 1) / (x + 1 - lambda), tight in the tail;
+    counts at or below the expected rate are not surprising and return 1
+    """
+    x = observed.astype(int)
+    log_factorial = np.concatenate(([0.0], np.cumsum(np.log(np.arange(1, x.max(initial=0) + 1)))))
+    above = x > expected
+    log_p = (
+        x * np.log(expected) - expected - log_factorial[x]
+        + np.log((x + 1) / np.maximum(x + 1 - expected, 1e-9))
+    )
+    return np.where(above, np.minimum(np.exp(log_p), 1.0), 1.0)
+
+
+def score_window(matrix: np.ndarray, span: float = EWMA_SPAN) -> dict:
+    """Spike scores for the last column of every row against the columns before it"""
+    observed = matrix[:, -1]
+    mean, variance = ewma_baseline(matrix[:, :-1], span)
+    expected = np.maximum(mean, BASELINE_FLOOR)
+    # Poisson noise is a floor on the spread of sparse, mostly-zero series
+    std = np.maximum(np.sqrt(variance), np.sqrt(expected))
+    return {
+        "observed": observed,
+        "expected": expected,
+        "z_score": (observed - expected) / std,
+        "p_value": poisson_tail(observed, expected),
+    }
+
+
+class AnomalyDetector:
+    """
+    Flags (product, fault type) combinations whose complaint count on the
+    scored day is far above their recent baseline
+
+    Results are cached until the next complaint write; the detector remembers
+    when each live anomaly was first flagged so new spikes stand out.
+    """
+
+    def __init__(self, window: int = WINDOW_DAYS, span: float = EWMA_SPAN):
+        self.window = window
+        self.span = span
+        self.evaluations = 0
+        self._flagged_since = {}  # (product_id, fault_type) -> first flagged (ISO time)
+        self._lock = threading.Lock()
+
+    def detect(self, db: Session, as_of: Optional[date] = None, limit: int = 20) -> dict:
+        """Anomalies on as_of (default: today), most significant first"""
+        result = result_cache.get_or_compute(("anomalies", as_of), lambda: self._evaluate(db, as_of))
+        return {**result, "anomalies": result["anomalies"][:limit]}
+
+    def _evaluate(self, db: Session, as_of: Optional[date]) -> dict:
+        live = as_of is None
+        day = as_of or datetime.utcnow().date()
+        keys, matrix = load_window(db, day, self.window)
+        scores = score_window(matrix, self.span)
+        flagged = np.flatnonzero(
+            (scores["observed"] >= MIN_COUNT)
+            & ((scores["z_score"] >= Z_THRESHOLD) | (scores["p_value"] <= P_THRESHOLD))
+        )
+        flagged = flagged[np.argsort(-scores["z_score"][flagged], kind="stable")]
+
+        now = datetime.utcnow().isoformat()
+        with self._lock:
+            self.evaluations += 1
+            flagged_since = dict(self._flagged_since)
+            current = {keys[i]: flagged_since.get(keys[i], now) for i in flagged}
+            if live:
+                self._flagged_since = current
+
+        names = dict(db.query(Product.product_id, Product.product_name).all())
+        anomalies = []
+        for i in flagged:
+            product_id, fault_type = keys[i]
+            anomalies.append({
+                "product_id": int(product_id) if product_id is not None else None,
+                "product": names.get(int(product_id)) if product_id is not None else None,
+                "fault_type": fault_type,
+                "observed": int(scores["observed"][i]),
+                "expected": round(float(scores["expected"][i]), 2),
+                "z_score": round(float(scores["z_score"][i]), 2),
+                "p_value": float(f"{scores['p_value'][i]:.3g}"),
+                "flagged_at": current[keys[i]] if live else None,
+                "new": live and keys[i] not in flagged_since,
+            })
+
+        return {
+            "date": day.isoformat(),
+            "window_days": self.window,
+            "combinations": len(keys),
+            "anomaly_count": int(len(flagged)),
+            "anomalies": anomalies,
+        }
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"evaluations": self.evaluations, "flagged": len(self._flagged_since)}
+
+
+# Global detector, shared by the dashboard and the anomalies endpoint
+anomaly_detector = AnomalyDetector()
@@ -0,0 +1,4 @@
+"""
+Performance benchmarks for the Resolve backend
+Run from the backend directory, e.g. `python -m benchmarks.product_health`
+"""
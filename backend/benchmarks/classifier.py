@@ -0,0 +1,92 @@
+"""
+Microbenchmark: classification latency, two Pipelines (4 vectorizations per
+complaint) vs the shared-vectorizer classify_many path, and the
+classification cache on a stream where templated texts repeat
+
+Usage: python -m benchmarks.classifier [--batch 10000]
+"""
+import argparse
+import time
+
+from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.naive_bayes import MultinomialNB
+from sklearn.pipeline import Pipeline
+
+from ai_classifier import ClassificationCache
+from benchmarks.common import make_corpus, make_trained_classifier
+
+
+def build_legacy_pipelines(texts, fault_labels, severity_labels):
+    """The original model layout: two independent TF-IDF + NB pipelines"""
+    fault = Pipeline([
+        ('tfidf', TfidfVectorizer(max_features=500, stop_words='english')),
+        ('nb', MultinomialNB(alpha=1.0))
+    ]).fit(texts, fault_labels)
+    severity = Pipeline([
+        ('tfidf', TfidfVectorizer(max_features=500, stop_words='english')),
+        ('nb', MultinomialNB(alpha=1.0))
+    ]).fit(texts, severity_labels)
+    return fault, severity
+
+
+def legacy_classify(fault, severity, text: str) -> dict:
+    """The original classify_complaint: predict + predict + 2x predict_proba"""
+    return {
+        "fault_type": fault.predict([text])[0],
+        "severity": severity.predict([text])[0],
+        "fault_confidence": round(fault.predict_proba([text]).max(), 3),
+        "severity_confidence": round(severity.predict_proba([text]).max(), 3)
+    }
+
+
+def per_call_us(fn, items) -> float:
+    start = time.perf_counter()
+    for item in items:
+        fn(item)
+    return (time.perf_counter() - start) / len(items) * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--singles", type=int, default=500)
+    parser.add_argument("--batch", type=int, default=10_000)
+    parser.add_argument("--distinct", type=int, default=200, help="distinct texts in the cached stream")
+    args = parser.parse_args()
+
+    model, texts, fault_labels, severity_labels = make_trained_classifier()
+    fault, severity = build_legacy_pipelines(texts, fault_labels, severity_labels)
+    samples = make_corpus(args.singles, seed=99)
+
+    # Same predictions either way
+    for text in samples[:100]:
+        expected = legacy_classify(fault, severity, text)
+        actual = model.classify_many([text])[0]
+        assert expected["fault_type"] == actual["fault_type"]
+        assert expected["severity"] == actual["severity"]
+
+    legacy_us = per_call_us(lambda t: legacy_classify(fault, severity, t), samples)
+    shared_us = per_call_us(lambda t: model.classify_many([t]), samples)
+    print(f"single complaint:  legacy {legacy_us:8.0f} us   shared {shared_us:8.0f} us   "
+          f"speedup {legacy_us / shared_us:.1f}x")
+
+    batch = make_corpus(args.batch, seed=123)
+    start = time.perf_counter()
+    model.classify_many(batch)
+    batch_s = time.perf_counter() - start
+    print(f"batch of {args.batch}: {batch_s * 1000:.0f} ms "
+          f"({args.batch / batch_s:,.0f} complaints/s, "
+          f"{batch_s / args.batch * 1e6:.1f} us each)")
+
+    # Single-complaint calls over a stream drawn from a few distinct texts
+    cache = ClassificationCache(max_entries=10_000, path=None)
+    distinct = make_corpus(args.distinct, seed=7)
+    stream = [distinct[i % len(distinct)] for i in range(args.singles * 4)]
+    uncached_us = per_call_us(lambda t: model.classify_many([t]), stream)
+    cached_us = per_call_us(lambda t: cache.classify_many(model, [t]), stream)
+    stats = cache.stats()
+    print(f"repeated texts:    uncached {uncached_us:6.0f} us   cached {cached_us:6.1f} us   "
+          f"hit rate {stats['hit_rate']:.0%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""
+Shared helpers for benchmarks: throwaway databases and timing
+"""
+import os
+import random
+import tempfile
+import time
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from database import Base
+from seed_data import seed_complaints
+
+
+def make_database(
+    n_complaints: int,
+    n_products: int = 8,
+    seed: int = 42,
+    chunk_size: int = 50_000,
+    days: int = 365,
+    product_skew: float = 1.0,
+    text_variety: float = 0.5
+):
+    """
+    Create a temporary SQLite database of synthetic complaints (see seed_data)
+    ending today, so date-windowed analytics see recent data
+
+    Returns (session_factory, path); the caller removes the file when done.
+    """
+    fd, path = tempfile.mkstemp(suffix=".db", prefix="resolve_bench_")
+    os.close(fd)
+    engine = create_engine(f"sqlite:///{path}", connect_args={"check_same_thread": False})
+    Base.metadata.create_all(bind=engine)
+    Session = sessionmaker(bind=engine)
+
+    with Session() as db:
+        seed_complaints(
+            db, n_complaints,
+            n_products=n_products,
+            days=days,
+            product_skew=product_skew,
+            text_variety=text_variety,
+            seed=seed,
+            chunk_size=chunk_size
+        )
+
+    return Session, path
+
+
+def timed(fn, *args, repeat: int = 3) -> float:
+    """Best wall-clock time of `repeat` calls, in milliseconds"""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(*args)
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+COMPLAINT_PHRASES = [
+    "Battery dies after 2 hours of use", "won't charge even when plugged in",
+    "Left earbud stopped working completely", "no sound at all from the right side",
+    "Bluetooth keeps disconnecting every few minutes", "cannot pair with my phone",
+    "Audio is extremely distorted and crackles at high volume", "bass sounds muffled",
+    "App crashes whenever I try to adjust settings", "the screen freezes randomly",
+    "Water damage after accidental splash", "the casing cracked after a small drop",
+    "After the latest firmware update the device won't turn on", "upgrade failed halfway",
+    "I want a refund under warranty", "requesting a return for a replacement",
+    "Device randomly restarts without warning", "it is slow and laggy",
+    "This is a major problem", "poor quality for the price", "minor annoyance",
+]
+
+
+def make_corpus(n: int, seed: int = 7) -> list:
+    """Random complaint texts built from 1-3 template phrases"""
+    rng = random.Random(seed)
+    return [
+        ". ".join(rng.sample(COMPLAINT_PHRASES, rng.randint(1, 3))) + "."
+        for _ in range(n)
+    ]
+
+
+def make_trained_classifier(n: int = 2000, seed: int = 7):
+    """A ComplaintClassifier trained on a synthetic corpus labelled by the rule-based fallback"""
+    from ai_classifier import ComplaintClassifier
+
+    texts = make_corpus(n, seed)
+    labeller = ComplaintClassifier()
+    fault_labels = [labeller.predict_fault_type(t) for t in texts]
+    severity_labels = [labeller.predict_severity(t) for t in texts]
+
+    model = ComplaintClassifier()
+    model.train(texts, fault_labels, severity_labels)
+    return model, texts, fault_labels, severity_labels
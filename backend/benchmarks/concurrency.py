@@ -0,0 +1,102 @@
+"""
+Load test: concurrent complaint writes and analytics reads against SQLite,
+legacy engine vs the production storage profile
+
+Usage: python -m benchmarks.concurrency [--rows 50000] [--writers 4] [--readers 8] [--seconds 10]
+"""
+import argparse
+import os
+import threading
+import time
+from datetime import datetime
+
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import sessionmaker
+
+import rollups
+from database import Complaint, Product, create_sqlite_engine
+from predictive_insights import InsightsEngine
+from benchmarks.common import make_database
+
+
+def write_once(Session, i: int):
+    with Session() as db:
+        product = db.query(Product).filter(Product.product_id == 1 + i % 8).first()
+        complaint = Complaint(
+            product_id=product.product_id,
+            department="support",
+            complaint_text=f"Load test complaint {i}",
+            created_date=datetime.utcnow().date(),
+            status="open",
+            predicted_fault_type="Battery Issue",
+            severity="medium"
+        )
+        db.add(complaint)
+        db.flush()
+        rollups.apply_complaints(db, [complaint])
+        db.commit()
+
+
+def read_once(Session, i: int):
+    with Session() as db:
+        InsightsEngine.get_fault_distribution.__wrapped__(db)
+        InsightsEngine.get_summary_stats.__wrapped__(db)
+
+
+def run_profile(profile: str, args) -> dict:
+    _, path = make_database(args.rows)
+    url = f"sqlite:///{path}"
+    writer = create_sqlite_engine(url, profile=profile)
+    reader = create_sqlite_engine(url, profile=profile, read_only=True) if profile == "production" else writer
+    WriteSession = sessionmaker(bind=writer)
+    ReadSession = sessionmaker(bind=reader)
+
+    counts = {"writes": 0, "reads": 0, "write_errors": 0, "read_errors": 0}
+    lock = threading.Lock()
+    stop_at = time.monotonic() + args.seconds
+
+    def worker(kind: str, fn, Session):
+        i = 0
+        while time.monotonic() < stop_at:
+            try:
+                fn(Session, i)
+                key = kind
+            except OperationalError:  # "database is locked"
+                key = kind[:-1] + "_errors"
+            with lock:
+                counts[key] += 1
+            i += 1
+
+    threads = [threading.Thread(target=worker, args=("writes", write_once, WriteSession)) for _ in range(args.writers)]
+    threads += [threading.Thread(target=worker, args=("reads", read_once, ReadSession)) for _ in range(args.readers)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    writer.dispose()
+    reader.dispose()
+    for suffix in ("", "-wal", "-shm"):
+        if os.path.exists(path + suffix):
+            os.remove(path + suffix)
+    return counts
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=50_000)
+    parser.add_argument("--writers", type=int, default=4)
+    parser.add_argument("--readers", type=int, default=8)
+    parser.add_argument("--seconds", type=float, default=10)
+    args = parser.parse_args()
+
+    print(f"{args.writers} writers, {args.readers} readers, {args.seconds:.0f}s, {args.rows:,} seed rows")
+    print(f"{'profile':<12} {'writes/s':>10} {'reads/s':>10} {'write errors':>13} {'read errors':>12}")
+    for profile in ("legacy", "production"):
+        c = run_profile(profile, args)
+        print(f"{profile:<12} {c['writes'] / args.seconds:>10.1f} {c['reads'] / args.seconds:>10.1f} "
+              f"{c['write_errors']:>13} {c['read_errors']:>12}")
+
+
+if __name__ == "__main__":
+    main()
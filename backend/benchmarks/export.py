@@ -0,0 +1,66 @@
+"""
+Regression benchmark: full complaint dump, peak Python memory and throughput
+(ORM .all() + Pydantic serialization vs the streaming column-tuple export)
+
+Usage: python -m benchmarks.export [--sizes 10000 100000] [--format ndjson]
+"""
+import argparse
+import json
+import os
+import time
+import tracemalloc
+
+from fastapi.encoders import jsonable_encoder
+
+from database import Complaint
+from main import ComplaintDetailResponse
+import export
+from benchmarks.common import make_database
+
+
+def legacy_dump(Session) -> int:
+    """Hydrate every complaint and serialize it through the response model"""
+    with Session() as db:
+        complaints = db.query(Complaint).order_by(Complaint.complaint_id).all()
+        body = "".join(
+            json.dumps(jsonable_encoder(ComplaintDetailResponse.model_validate(c))) + "\n"
+            for c in complaints
+        )
+    return len(body)
+
+
+def streaming_dump(Session, fmt: str) -> int:
+    return sum(len(chunk) for chunk in export.stream_complaints(Session, export.export_select(), fmt))
+
+
+def measure(fn, *args) -> tuple:
+    """(seconds, peak traced MiB, output bytes)"""
+    tracemalloc.start()
+    start = time.perf_counter()
+    size = fn(*args)
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak / 2**20, size
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000])
+    parser.add_argument("--format", choices=sorted(export.MEDIA_TYPES), default="ndjson")
+    args = parser.parse_args()
+
+    print(f"{'rows':>8} {'legacy s':>9} {'legacy MiB':>11} {'stream s':>9} {'stream MiB':>11} {'rows/s':>9}")
+    for size in args.sizes:
+        Session, path = make_database(size)
+        try:
+            legacy_s, legacy_mib, _ = measure(legacy_dump, Session)
+            stream_s, stream_mib, _ = measure(streaming_dump, Session, args.format)
+        finally:
+            os.remove(path)
+        print(f"{size:>8} {legacy_s:>9.2f} {legacy_mib:>11.1f} {stream_s:>9.2f} {stream_mib:>11.1f} "
+              f"{size / stream_s:>9,.0f}")
+
+
+if __name__ == "__main__":
+    main()
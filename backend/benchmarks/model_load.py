@@ -0,0 +1,71 @@
+"""
+Benchmark: model load time, pickle vs memory-mapped artifact
+
+Usage: python -m benchmarks.model_load [--repeat 50]
+"""
+import argparse
+import os
+import pickle
+import tempfile
+import time
+
+from ai_classifier import ComplaintClassifier
+from benchmarks.common import make_corpus, make_trained_classifier
+
+
+def best_ms(fn, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+
+    model, *_ = make_trained_classifier()
+    workdir = tempfile.mkdtemp(prefix="resolve_model_")
+    pickle_path = os.path.join(workdir, "model.pkl")
+    artifact_path = os.path.join(workdir, "model.rsm")
+
+    with open(pickle_path, "wb") as f:
+        pickle.dump({
+            'vectorizer': model.vectorizer,
+            'fault_model': model.fault_model,
+            'severity_model': model.severity_model
+        }, f)
+    model.save_model(artifact_path)
+
+    def load(path, **kwargs):
+        ComplaintClassifier().load_model(path, **kwargs)
+
+    # Both formats must produce the same predictions
+    samples = make_corpus(200, seed=5)
+    from_pickle, from_artifact = ComplaintClassifier(), ComplaintClassifier()
+    from_pickle.load_model(pickle_path)
+    from_artifact.load_model(artifact_path)
+    assert from_pickle.classify_many(samples) == from_artifact.classify_many(samples)
+
+    results = {
+        "pickle": best_ms(lambda: load(pickle_path), args.repeat),
+        "artifact (verified)": best_ms(lambda: load(artifact_path), args.repeat),
+        "artifact (no verify)": best_ms(lambda: load(artifact_path, verify=False), args.repeat),
+    }
+    sizes = {"pickle": os.path.getsize(pickle_path), "artifact": os.path.getsize(artifact_path)}
+
+    print(f"vocabulary: {len(model.vectorizer.vocabulary_)} terms; "
+          f"file size: pickle {sizes['pickle']:,} B, artifact {sizes['artifact']:,} B")
+    for name, ms in results.items():
+        print(f"{name:<22} {ms:8.2f} ms")
+
+    for path in (pickle_path, artifact_path):
+        os.remove(path)
+    os.rmdir(workdir)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""
+Benchmark: product health scores, per-product ORM loop vs single grouped query
+
+Usage: python -m benchmarks.product_health [--sizes 10000 100000 1000000]
+"""
+import argparse
+import os
+import statistics
+
+from database import Product, Complaint
+from predictive_insights import InsightsEngine
+from benchmarks.common import make_database, timed
+
+
+def legacy_product_health_scores(db) -> dict:
+    """Original implementation: one query per product, counting in Python"""
+    products = db.query(Product).all()
+    scores = []
+
+    for product in products:
+        complaints = db.query(Complaint).filter(
+            Complaint.product_id == product.product_id
+        ).all()
+
+        if not complaints:
+            score = 100
+        else:
+            critical_count = sum(1 for c in complaints if c.severity == "critical")
+            high_count = sum(1 for c in complaints if c.severity == "high")
+            resolved_count = sum(1 for c in complaints if c.status == "resolved")
+            resolution_rate = (resolved_count / len(complaints) * 100) if complaints else 0
+
+            avg_resolution_time = statistics.mean(
+                [c.resolution_time for c in complaints if c.resolution_time]
+            ) if any(c.resolution_time for c in complaints) else 0
+
+            severity_penalty = (critical_count * 15) + (high_count * 5)
+            time_penalty = min(avg_resolution_time / 3, 20)
+            resolution_bonus = (resolution_rate / 100) * 30
+
+            score = max(0, 100 - severity_penalty - time_penalty + resolution_bonus)
+
+        scores.append({
+            "product_id": product.product_id,
+            "product_name": product.product_name,
+            "category": product.category,
+            "health_score": round(score, 2),
+            "complaint_count": len(complaints)
+        })
+
+    return {
+        "scores": sorted(scores, key=lambda x: x["health_score"], reverse=True)
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--products", type=int, default=200)
+    args = parser.parse_args()
+
+    print(f"{'rows':>10} {'loop (ms)':>12} {'grouped (ms)':>14} {'speedup':>9}")
+    for size in args.sizes:
+        Session, path = make_database(size, n_products=args.products)
+        try:
+            with Session() as db:
+                expected = legacy_product_health_scores(db)
+                grouped = InsightsEngine.get_product_health_scores.__wrapped__  # bypass the result cache
+                actual = grouped(db)
+                assert expected == actual, "grouped query disagrees with the per-product loop"
+
+                # expunge between runs so the loop pays for hydration every time
+                loop_ms = timed(lambda: (legacy_product_health_scores(db), db.expunge_all()))
+                grouped_ms = timed(grouped, db)
+            print(f"{size:>10} {loop_ms:>12.1f} {grouped_ms:>14.1f} {loop_ms / grouped_ms:>8.1f}x")
+        finally:
+            os.remove(path)
+
+
+if __name__ == "__main__":
+    main()
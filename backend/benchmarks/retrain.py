@@ -0,0 +1,84 @@
+"""
+Benchmark: out-of-core retraining from the database vs in-memory train()
+
+For each size: a full streamed retrain (rows/s), an incremental update after
+1% more complaints, and the in-memory TF-IDF train() on the same rows for
+comparison. --memory also reports the peak Python heap of both trainings
+(tracemalloc slows them down several times, so timings are not comparable).
+
+Usage: python -m benchmarks.retrain [--sizes 100000 1000000] [--chunk-size 5000] [--memory]
+"""
+import argparse
+import os
+import tempfile
+import time
+import tracemalloc
+
+from sqlalchemy import select
+
+from ai_classifier import ComplaintClassifier, classifier
+from database import Complaint
+from seed_data import seed_complaints
+from retrain import Retrainer
+from benchmarks.common import make_database
+
+
+def measure(fn, memory: bool):
+    """(result, seconds, peak traced MB or None) of fn()"""
+    if memory:
+        tracemalloc.start()
+    start = time.perf_counter()
+    result = fn()
+    seconds = time.perf_counter() - start
+    peak = None
+    if memory:
+        peak = tracemalloc.get_traced_memory()[1] / 2 ** 20
+        tracemalloc.stop()
+    return result, seconds, peak
+
+
+def megabytes(peak) -> str:
+    return f"{peak:.1f}" if peak is not None else "-"
+
+
+def in_memory_train(db):
+    rows = db.execute(select(Complaint.complaint_text, Complaint.predicted_fault_type, Complaint.severity)).all()
+    model = ComplaintClassifier()
+    model.train([r[0] for r in rows], [r[1] for r in rows], [r[2] for r in rows])
+    return model
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100_000, 1_000_000])
+    parser.add_argument("--chunk-size", type=int, default=5000)
+    parser.add_argument("--memory", action="store_true", help="trace peak heap usage")
+    args = parser.parse_args()
+
+    model_path = os.path.join(tempfile.mkdtemp(prefix="resolve_retrain_"), "model.rslv")
+    print(f"{'complaints':>10} {'full s':>8} {'rows/s':>9} {'peak MB':>8} {'+1% s':>7} "
+          f"{'train() s':>10} {'peak MB':>8}")
+    for size in args.sizes:
+        Session, path = make_database(size, n_products=40)
+        try:
+            retrainer = Retrainer()
+            with Session() as db:
+                full, _, full_peak = measure(
+                    lambda: retrainer.retrain(db, chunk_size=args.chunk_size, model_path=model_path, install=False),
+                    args.memory
+                )
+                seed_complaints(db, size // 100, seed=7)
+                # Continue the saved model, as the live server would
+                classifier.load_model(model_path)
+                update = retrainer.retrain(db, incremental=True, chunk_size=args.chunk_size,
+                                           model_path=model_path, install=False)
+                _, memory_seconds, memory_peak = measure(lambda: in_memory_train(db), args.memory)
+            print(f"{size:>10,} {full['seconds']:>8.2f} {full['rows_per_second']:>9,.0f} {megabytes(full_peak):>8} "
+                  f"{update['seconds']:>7.2f} {memory_seconds:>10.2f} {megabytes(memory_peak):>8}")
+        finally:
+            os.remove(path)
+    os.remove(model_path)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""
+Benchmark: rule-based classification throughput on short and long complaint
+texts, original per-category any() scans vs the compiled KeywordMatcher
+
+Usage: python -m benchmarks.rules [--count 2000]
+"""
+import argparse
+import random
+import time
+
+from keyword_rules import KeywordMatcher
+from benchmarks.common import make_corpus
+
+EMAIL_FILLER = (
+    "Hello team, I am writing regarding the headset I purchased from your store "
+    "last month, which I have been using every day on my commute and at the office. "
+    "I have followed every step in the manual and spoken to two agents already. "
+)
+
+
+def legacy_fault(text: str) -> str:
+    text_lower = text.lower()
+    if any(word in text_lower for word in ['battery', 'charge', 'drain', 'power']):
+        return "Battery Issue"
+    elif any(word in text_lower for word in ['sound', 'audio', 'distort', 'crackle']):
+        return "Audio Quality"
+    elif any(word in text_lower for word in ['bluetooth', 'connect', 'pair', 'disconn']):
+        return "Connectivity"
+    elif any(word in text_lower for word in ['water', 'damage', 'crack', 'broken']):
+        return "Physical Damage"
+    elif any(word in text_lower for word in ['crash', 'freeze', 'bug', 'app']):
+        return "Software Bug"
+    elif any(word in text_lower for word in ['firmware', 'update', 'upgrade']):
+        return "Firmware Update"
+    elif any(word in text_lower for word in ['warranty', 'return', 'refund']):
+        return "Warranty/Return"
+    else:
+        return "Performance"
+
+
+def legacy_severity(text: str) -> str:
+    text_lower = text.lower()
+    critical_keywords = ['won\'t', 'doesn\'t work', 'completely broken', 'not working', 'dead']
+    high_keywords = ['completely', 'severe', 'major', 'extreme']
+    medium_keywords = ['issue', 'problem', 'bad', 'poor']
+    if any(word in text_lower for word in critical_keywords):
+        return "critical"
+    elif any(word in text_lower for word in high_keywords):
+        return "high"
+    elif any(word in text_lower for word in medium_keywords):
+        return "medium"
+    else:
+        return "low"
+
+
+def make_emails(count: int, paragraphs: int, seed: int = 11) -> list:
+    """Multi-paragraph emails with the actual complaint buried at the end"""
+    rng = random.Random(seed)
+    return [
+        "\n\n".join([EMAIL_FILLER] * paragraphs) + "\n\n" + text
+        for text in make_corpus(count, seed=rng.randint(0, 10_000))
+    ]
+
+
+def throughput(fn, texts) -> float:
+    start = time.perf_counter()
+    for text in texts:
+        fn(text)
+    return len(texts) / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--count", type=int, default=2000)
+    args = parser.parse_args()
+
+    matcher = KeywordMatcher.from_file()
+    datasets = {
+        "short (1 line)": make_corpus(args.count),
+        "email (5 paragraphs)": make_emails(args.count, 5),
+        "email (20 paragraphs)": make_emails(args.count, 20),
+        "no keywords (20 paragraphs)": ["\n\n".join([EMAIL_FILLER] * 20)] * args.count,
+    }
+
+    print(f"{'dataset':<30} {'legacy /s':>12} {'compiled /s':>12} {'speedup':>8}")
+    for name, texts in datasets.items():
+        for text in texts[:200]:
+            assert matcher.classify(text) == (legacy_fault(text), legacy_severity(text))
+        legacy = throughput(lambda t: (legacy_fault(t), legacy_severity(t)), texts)
+        compiled = throughput(matcher.classify, texts)
+        print(f"{name:<30} {legacy:>12,.0f} {compiled:>12,.0f} {compiled / legacy:>7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
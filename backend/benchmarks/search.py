@@ -0,0 +1,91 @@
+"""
+Benchmark: full-text search latency (FTS5, BM25-ranked and newest-first)
+against a LIKE scan, plus the time to build the index over an existing table
+
+Each query fetches the top 20 matches; median and p95 over --repeat runs.
+
+Usage: python -m benchmarks.search [--sizes 100000 1000000 3000000] [--repeat 20]
+"""
+import argparse
+import math
+import os
+import statistics
+import time
+
+from database import Complaint
+import search
+from benchmarks.common import make_database
+
+# (search string, LIKE pattern the naive approach would scan for, filters)
+QUERIES = [
+    ("battery", "%battery%", {}),
+    ('"left earbud"', "%left earbud%", {}),
+    ("firmw*", "%firmw%", {}),
+    ("bluetooth OR pairing", "%bluetooth%", {}),
+    ("crack*", "%crack%", {"severity": "critical"}),
+    ("refund warranty", "%refund%warranty%", {"status": "open"}),
+]
+LIMIT = 20
+
+
+def percentiles(samples: list) -> tuple:
+    """(median, p95) in milliseconds"""
+    ordered = sorted(samples)
+    return statistics.median(ordered) * 1000, ordered[math.ceil(0.95 * len(ordered)) - 1] * 1000
+
+
+def time_query(run, repeat: int) -> tuple:
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        run()
+        samples.append(time.perf_counter() - start)
+    return percentiles(samples)
+
+
+def fts_search(db, text: str, filters: dict, sort: str = "relevance"):
+    query = search.search_query(db, text, sort)
+    for field, value in filters.items():
+        query = query.filter(getattr(Complaint, field) == value)
+    return query.limit(LIMIT).all()
+
+
+def like_search(db, pattern: str, filters: dict):
+    query = db.query(Complaint).filter(Complaint.complaint_text.ilike(pattern))
+    for field, value in filters.items():
+        query = query.filter(getattr(Complaint, field) == value)
+    return query.order_by(Complaint.complaint_id.desc()).limit(LIMIT).all()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100_000, 1_000_000])
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    for size in args.sizes:
+        Session, path = make_database(size, n_products=40)
+        try:
+            bind = Session.kw["bind"]
+            start = time.perf_counter()
+            search.create_search_index(bind)
+            build_seconds = time.perf_counter() - start
+
+            print(f"\n== {size:,} complaints (index built in {build_seconds:.1f}s) ==")
+            print(f"{'query':<24} {'filters':<20} {'fts p50':>9} {'fts p95':>9} {'newest p50':>11} "
+                  f"{'like p50':>9} {'like p95':>9}")
+            with Session() as db:
+                for text, pattern, filters in QUERIES:
+                    fts = time_query(lambda: fts_search(db, text, filters), args.repeat)
+                    newest = time_query(lambda: fts_search(db, text, filters, "newest"), args.repeat)
+                    like = time_query(lambda: like_search(db, pattern, filters), max(1, args.repeat // 5))
+                    label = ",".join(f"{k}={v}" for k, v in filters.items())
+                    print(f"{text:<24} {label:<20} {fts[0]:>9.2f} {fts[1]:>9.2f} {newest[0]:>11.2f} "
+                          f"{like[0]:>9.2f} {like[1]:>9.2f}")
+                    db.expunge_all()
+        finally:
+            os.remove(path)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+"""
+Benchmark: API worker startup, from process launch to first request served,
+and the latency of the first classification afterwards
+
+Each scenario starts `uvicorn main:app` in a fresh process against its own
+temporary database, polls GET / until it answers, then POSTs one complaint.
+
+Usage: python -m benchmarks.startup [--repeat 3] [--backend-dir path/to/other/checkout/backend]
+"""
+import argparse
+import json
+import os
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+
+from benchmarks.common import make_trained_classifier
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def wait_until_serving(url: str, process, timeout: float = 60) -> float:
+    start = time.perf_counter()
+    while time.perf_counter() - start < timeout:
+        if process.poll() is not None:
+            raise RuntimeError("server exited during startup")
+        try:
+            with urllib.request.urlopen(url, timeout=1):
+                return time.perf_counter()
+        except OSError:
+            time.sleep(0.01)
+    raise TimeoutError(url)
+
+
+def post_complaint(base_url: str) -> float:
+    request = urllib.request.Request(
+        f"{base_url}/api/complaints",
+        data=json.dumps({
+            "product_id": 1,
+            "department": "support",
+            "complaint_text": "Battery dies after 2 hours of use"
+        }).encode(),
+        headers={"Content-Type": "application/json"}
+    )
+    start = time.perf_counter()
+    with urllib.request.urlopen(request, timeout=30) as response:
+        response.read()
+    return time.perf_counter() - start
+
+
+def run_scenario(backend_dir: str, db_path: str, env: dict) -> tuple:
+    """(seconds to first response, seconds for the first classification)"""
+    port = free_port()
+    base_url = f"http://127.0.0.1:{port}"
+    environment = {**os.environ, "DATABASE_URL": f"sqlite:///{db_path}", **env}
+    start = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--port", str(port), "--log-level", "warning"],
+        cwd=backend_dir, env=environment,
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    try:
+        ready = wait_until_serving(f"{base_url}/", process) - start
+        first_classification = post_complaint(base_url)
+    finally:
+        process.terminate()
+        process.wait()
+    return ready, first_classification
+
+
+def seed(db_path: str):
+    subprocess.run(
+        [sys.executable, "init_db.py", "seed"],
+        cwd=BACKEND_DIR, env={**os.environ, "DATABASE_URL": f"sqlite:///{db_path}"},
+        check=True, stdout=subprocess.DEVNULL
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--backend-dir", default=BACKEND_DIR, help="backend to start (compare revisions)")
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="resolve_startup_")
+    model_path = os.path.join(workdir, "model.rslv")
+    model, *_ = make_trained_classifier()
+    model.save_model(model_path)
+
+    seeded_db = os.path.join(workdir, "seeded.db")
+    seed(seeded_db)
+
+    scenarios = [
+        ("init+seed on an empty database", None, {"DB_AUTO_INIT": "seed"}),
+        ("schema check only", seeded_db, {"DB_AUTO_INIT": "schema"}),
+        ("no init (pre-seeded)", seeded_db, {"DB_AUTO_INIT": "none"}),
+        ("no init, lazy model", seeded_db, {"DB_AUTO_INIT": "none", "CLASSIFIER_MODEL_PATH": model_path}),
+        ("no init, model warmup", seeded_db,
+         {"DB_AUTO_INIT": "none", "CLASSIFIER_MODEL_PATH": model_path, "CLASSIFIER_WARMUP": "1"}),
+    ]
+
+    print(f"{'scenario':<32} {'first response ms':>18} {'first classify ms':>18}")
+    try:
+        for name, db_path, env in scenarios:
+            ready_times, classify_times = [], []
+            for i in range(args.repeat):
+                path = db_path or os.path.join(workdir, f"empty-{i}.db")
+                ready, classify = run_scenario(args.backend_dir, path, env)
+                ready_times.append(ready)
+                classify_times.append(classify)
+            print(f"{name:<32} {min(ready_times) * 1000:>18.0f} {min(classify_times) * 1000:>18.1f}")
+    finally:
+        shutil.rmtree(workdir)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,145 @@
+"""
+Standard benchmark suite: every InsightsEngine / RollupInsightsEngine method
+and the main API endpoints against synthetic datasets of increasing size
+
+Analytics methods are timed uncached (__wrapped__); endpoints are timed cold
+(result cache cleared before each call) and warm. Results can be saved as
+JSON to compare runs.
+
+Usage: python -m benchmarks.suite [--sizes 10000 100000 1000000] [--products 40]
+                                  [--days 365] [--skew 1.0] [--repeat 3] [--json out.json]
+"""
+import argparse
+import json
+import os
+import time
+
+from fastapi.testclient import TestClient
+
+from database import get_db, get_read_db
+from predictive_insights import InsightsEngine, RollupInsightsEngine, get_dashboard_summary
+from cache import result_cache
+from benchmarks.common import make_database, timed
+
+ENDPOINTS = [
+    ("GET", "/api/analytics/dashboard"),
+    ("GET", "/api/analytics/trends?days=30"),
+    ("GET", "/api/analytics/trends?days=365&granularity=week"),
+    ("GET", "/api/analytics/trends?days=730&granularity=month&split_by=product"),
+    ("GET", "/api/analytics/faults"),
+    ("GET", "/api/analytics/product-health"),
+    ("GET", "/api/analytics/resolution"),
+    ("GET", "/api/analytics/severity"),
+    ("GET", "/api/analytics/departments"),
+    ("GET", "/api/analytics/alerts"),
+    ("GET", "/api/analytics/anomalies"),
+    ("GET", "/api/stats/summary"),
+    ("GET", "/api/complaints?limit=100"),
+    ("GET", "/api/complaints?status=open&severity=critical&limit=100"),
+    ("GET", "/api/complaints/1"),
+    ("POST", "/api/complaints"),
+]
+
+NEW_COMPLAINT = {
+    "product_id": 1,
+    "department": "support",
+    "complaint_text": "Battery dies after 2 hours of use. This is a major problem."
+}
+
+
+def analytics_methods() -> list:
+    """(name, uncached function) for every public analytics method"""
+    methods = []
+    for engine in (InsightsEngine, RollupInsightsEngine):
+        for name, member in vars(engine).items():
+            if name.startswith("get_") and isinstance(member, staticmethod):
+                function = member.__func__
+                methods.append((f"{engine.__name__}.{name}", getattr(function, "__wrapped__", function)))
+    methods.append(("get_dashboard_summary", get_dashboard_summary.__wrapped__))
+    return methods
+
+
+def time_analytics(Session, repeat: int) -> dict:
+    results = {}
+    with Session() as db:
+        for name, function in analytics_methods():
+            results[name] = timed(function, db, repeat=repeat)
+            db.expunge_all()
+    return results
+
+
+def time_endpoints(Session, repeat: int) -> dict:
+    import main  # imported late: DB_AUTO_INIT is set by main() below
+
+    def override():
+        db = Session()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    main.app.dependency_overrides[get_db] = override
+    main.app.dependency_overrides[get_read_db] = override
+    client = TestClient(main.app)
+
+    def call(method: str, path: str):
+        response = client.post(path, json=NEW_COMPLAINT) if method == "POST" else client.get(path)
+        assert response.status_code < 300, (path, response.status_code)
+
+    def cold(method: str, path: str):
+        result_cache.clear()
+        call(method, path)
+
+    results = {}
+    try:
+        for method, path in ENDPOINTS:
+            results[f"{method} {path}"] = {
+                "cold": timed(cold, method, path, repeat=repeat),
+                "warm": timed(call, method, path, repeat=repeat)
+            }
+    finally:
+        main.app.dependency_overrides.clear()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000])
+    parser.add_argument("--products", type=int, default=40)
+    parser.add_argument("--days", type=int, default=365)
+    parser.add_argument("--skew", type=float, default=1.0)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--json", help="write results to this file")
+    args = parser.parse_args()
+    os.environ.setdefault("DB_AUTO_INIT", "none")
+
+    report = {"settings": vars(args), "runs": []}
+    for size in args.sizes:
+        start = time.perf_counter()
+        Session, path = make_database(size, n_products=args.products, days=args.days, product_skew=args.skew)
+        build_seconds = time.perf_counter() - start
+        try:
+            analytics = time_analytics(Session, args.repeat)
+            endpoints = time_endpoints(Session, args.repeat)
+        finally:
+            os.remove(path)
+        report["runs"].append({
+            "rows": size, "build_seconds": build_seconds,
+            "analytics_ms": analytics, "endpoints_ms": endpoints
+        })
+
+        print(f"\n== {size:,} complaints (built in {build_seconds:.1f}s) ==")
+        print(f"{'analytics method':<52} {'ms':>9}")
+        for name, ms in analytics.items():
+            print(f"{name:<52} {ms:>9.2f}")
+        print(f"\n{'endpoint':<62} {'cold ms':>9} {'warm ms':>9}")
+        for name, ms in endpoints.items():
+            print(f"{name:<62} {ms['cold']:>9.2f} {ms['warm']:>9.2f}")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""
+Regression benchmark: /api/stats/summary payload size and latency as the
+complaints table grows (legacy five counts + .all() vs one aggregate query)
+
+Usage: python -m benchmarks.summary_stats [--sizes 1000 10000 100000]
+"""
+import argparse
+import json
+import os
+import time
+
+from fastapi.encoders import jsonable_encoder
+
+from database import Complaint
+from predictive_insights import InsightsEngine
+from benchmarks.common import make_database
+
+
+def legacy_summary_stats(db) -> dict:
+    """Original endpoint body, including the full-row average_satisfaction list"""
+    total_complaints = db.query(Complaint).count()
+    resolved_complaints = db.query(Complaint).filter(Complaint.status == "resolved").count()
+    critical_complaints = db.query(Complaint).filter(Complaint.severity == "critical").count()
+    return {
+        "total_complaints": total_complaints,
+        "resolved_complaints": resolved_complaints,
+        "resolution_rate": round((resolved_complaints / total_complaints * 100), 2) if total_complaints > 0 else 0,
+        "critical_complaints": critical_complaints,
+        "open_complaints": db.query(Complaint).filter(Complaint.status == "open").count(),
+        "average_satisfaction": db.query(Complaint).filter(
+            Complaint.customer_satisfaction.isnot(None)
+        ).all(),
+    }
+
+
+def measure(fn, db) -> tuple:
+    """(milliseconds, response bytes) including JSON serialization, best of 3"""
+    best, size = float("inf"), 0
+    for _ in range(3):
+        start = time.perf_counter()
+        body = json.dumps(jsonable_encoder(fn(db)))
+        best = min(best, time.perf_counter() - start)
+        size = len(body)
+        db.expunge_all()
+    return best * 1000, size
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 10_000, 100_000])
+    args = parser.parse_args()
+
+    summary = InsightsEngine.get_summary_stats.__wrapped__  # bypass the result cache
+    sizes_seen = set()
+    print(f"{'rows':>8} {'legacy ms':>10} {'legacy bytes':>14} {'new ms':>8} {'new bytes':>10}")
+    for size in args.sizes:
+        Session, path = make_database(size)
+        try:
+            with Session() as db:
+                legacy = legacy_summary_stats(db)
+                current = summary(db)
+                for key in ("total_complaints", "resolved_complaints", "resolution_rate",
+                            "critical_complaints", "open_complaints"):
+                    assert legacy[key] == current[key], key
+                assert current["satisfaction_responses"] == len(legacy["average_satisfaction"])
+
+                legacy_ms, legacy_bytes = measure(legacy_summary_stats, db)
+                new_ms, new_bytes = measure(summary, db)
+        finally:
+            os.remove(path)
+        sizes_seen.add(new_bytes)
+        print(f"{size:>8} {legacy_ms:>10.1f} {legacy_bytes:>14,} {new_ms:>8.1f} {new_bytes:>10,}")
+
+    # Counters may gain digits as the table grows; anything more means rows leaked into the payload
+    assert max(sizes_seen) - min(sizes_seen) < 64, "summary payload grows with table size"
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,151 @@
+"""
+In-process result cache for analytics queries
+TTL + LRU eviction, invalidated by a data version counter that complaint
+writes bump, so analytics are recomputed once per write instead of once per poll
+"""
+import os
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+from typing import Any, Callable, Optional
+
+# Defaults, overridable via environment
+DEFAULT_TTL_SECONDS = float(os.getenv("ANALYTICS_CACHE_TTL", "30"))
+DEFAULT_MAX_ENTRIES = int(os.getenv("ANALYTICS_CACHE_SIZE", "128"))
+
+
+class ResultCache:
+    """
+    Thread-safe LRU cache whose entries expire after a TTL or when the
+    data version changes
+
+    Concurrent misses on the same key are collapsed: one caller computes,
+    the others wait for its result.
+    """
+
+    def __init__(self, max_entries: int = DEFAULT_MAX_ENTRIES, ttl: float = DEFAULT_TTL_SECONDS):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.version = 0
+        self._entries = OrderedDict()  # key -> (value, expires_at, version)
+        self._lock = threading.Lock()
+        self._key_locks = {}  # key -> [lock, users]
+        self._listeners = []
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def bump_version(self) -> int:
+        """Mark all cached results stale; call after any complaint write"""
+        with self._lock:
+            self.version += 1
+            self.invalidations += 1
+            version = self.version
+        for listener in list(self._listeners):
+            listener(version)
+        return version
+
+    def add_listener(self, listener: Callable[[int], None]):
+        """
+        Call listener(new_version) after every bump_version
+        Listeners run on the writer's thread and must not block.
+        """
+        self._listeners.append(listener)
+
+    def _lookup(self, key) -> tuple:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                value, expires_at, version = entry
+                if version == self.version and expires_at > time.monotonic():
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return True, value
+                del self._entries[key]
+            return False, None
+
+    def _store(self, key, value, ttl: float, version: int):
+        with self._lock:
+            if version != self.version:
+                # data changed while computing; don't cache a stale result
+                return
+            self._entries[key] = (value, time.monotonic() + ttl, version)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def get_or_compute(self, key, compute: Callable[[], Any], ttl: Optional[float] = None) -> Any:
+        """Return the cached value for key, computing and storing it on a miss"""
+        found, value = self._lookup(key)
+        if found:
+            return value
+
+        # Per-key locks are reference counted and dropped by the last user, so
+        # keys built from request parameters don't accumulate locks forever
+        with self._lock:
+            key_lock = self._key_locks.get(key)
+            if key_lock is None:
+                key_lock = self._key_locks[key] = [threading.Lock(), 0]
+            key_lock[1] += 1
+
+        try:
+            with key_lock[0]:
+                # another thread may have filled the entry while we waited
+                found, value = self._lookup(key)
+                if found:
+                    return value
+                with self._lock:
+                    self.misses += 1
+                    version = self.version
+                value = compute()
+                self._store(key, value, self.ttl if ttl is None else ttl, version)
+                return value
+        finally:
+            with self._lock:
+                key_lock[1] -= 1
+                if key_lock[1] == 0:
+                    del self._key_locks[key]
+
+    def cached(self, ttl: Optional[float] = None):
+        """
+        Decorator for analytics functions taking a DB session first
+
+        The session is excluded from the cache key; remaining arguments are
+        part of it. The undecorated function stays reachable as __wrapped__.
+        """
+        def decorator(func):
+            name = f"{func.__module__}.{func.__qualname__}"
+
+            @wraps(func)
+            def wrapper(db, *args, **kwargs):
+                key = (name, args, tuple(sorted(kwargs.items())))
+                return self.get_or_compute(key, lambda: func(db, *args, **kwargs), ttl)
+
+            return wrapper
+        return decorator
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "version": self.version,
+                "size": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations
+            }
+
+
+# Global cache for analytics results
+result_cache = ResultCache()
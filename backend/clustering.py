@@ -0,0 +1,444 @@
+"""
+Near-duplicate complaint clustering with MinHash + LSH
+Each complaint's character shingles are reduced to a MinHash signature; LSH
+band buckets find candidate clusters in time independent of the number of
+complaints, and the closest candidate above the join threshold absorbs the
+complaint. New complaints that closely match a cluster can reuse its
+classification instead of running the classifier again.
+
+Usage:
+    python clustering.py rebuild [--path complaint_clusters.rslv]
+    python clustering.py top [--limit 20] [--active-days 7]
+"""
+import argparse
+import os
+import re
+import sys
+import threading
+import time
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta
+from typing import Iterable, List, Optional
+
+import numpy as np
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from database import Complaint, SessionLocal
+from model_artifact import save_artifact, load_artifact, ArtifactError
+
+# Settings, overridable via environment
+CLUSTERING = os.getenv("CLUSTERING", "1") == "1"
+CLUSTER_INDEX_PATH = os.getenv("CLUSTER_INDEX_PATH", "complaint_clusters.rslv")
+CLUSTER_JOIN_THRESHOLD = float(os.getenv("CLUSTER_JOIN_THRESHOLD", "0.6"))  # estimated Jaccard to join a cluster
+CLUSTER_REUSE_THRESHOLD = float(os.getenv("CLUSTER_REUSE_THRESHOLD", "0.9"))  # ... to reuse its classification
+CLUSTER_ACTIVE_DAYS = int(os.getenv("CLUSTER_ACTIVE_DAYS", "7"))
+
+NUM_PERM = 64
+BANDS = 16  # 16 bands x 4 rows: pairs above ~0.5 Jaccard collide in some band
+SHINGLE_SIZE = 5
+SAMPLE_CHARS = 200
+REBUILD_BATCH = 5000
+SIGNATURE_BATCH = 256  # texts hashed per NumPy pass (bounds the temporary matrix)
+FORMAT_KIND = "minhash-clusters"
+
+# Multiply-shift hash family, h(x) = (a*x + b mod 2**64) >> 32 with odd a:
+# one multiply-add per value (uint64 arithmetic wraps) and uint32 results
+_rng = np.random.RandomState(1)
+_A = _rng.randint(0, 2**63, NUM_PERM, dtype=np.uint64) | np.uint64(1)
+_B = _rng.randint(0, 2**63, NUM_PERM, dtype=np.uint64)
+
+
+def normalize(text: str) -> str:
+    """Lower-case, digits collapsed (ticket numbers, durations), punctuation to spaces"""
+    text = re.sub(r"\d+", "0", text.lower())
+    return " ".join(re.sub(r"[^\w]+", " ", text).split())
+
+
+def signatures(texts: List[str]) -> np.ndarray:
+    """
+    MinHash signatures for a batch of texts, (len(texts), NUM_PERM) uint32
+
+    Shingles are the SHINGLE_SIZE-byte windows of the normalized text. The
+    texts of a SIGNATURE_BATCH are concatenated and every window is hashed at
+    once with a vectorized polynomial hash; windows are permuted in one
+    (NUM_PERM x windows) pass and reduced per text with np.minimum.reduceat.
+    Repeated shingles don't need removing: they can't change a minimum.
+    """
+    result = np.empty((len(texts), NUM_PERM), dtype=np.uint32)
+    for start in range(0, len(texts), SIGNATURE_BATCH):
+        encoded = [normalize(text).encode().ljust(SHINGLE_SIZE) for text in texts[start:start + SIGNATURE_BATCH]]
+        buffer = np.frombuffer(b"".join(encoded), dtype=np.uint8).astype(np.uint64)
+        lengths = np.fromiter((len(e) for e in encoded), dtype=np.int64, count=len(encoded))
+        text_starts = np.concatenate(([0], np.cumsum(lengths)[:-1]))
+
+        windows = len(buffer) - SHINGLE_SIZE + 1
+        window_hash = np.zeros(windows, dtype=np.uint64)
+        for offset in range(SHINGLE_SIZE):
+            window_hash = window_hash * np.uint64(257) + buffer[offset:offset + windows]
+
+        # keep only windows that lie inside one text
+        counts = lengths - SHINGLE_SIZE + 1
+        offsets = np.concatenate(([0], np.cumsum(counts)[:-1]))
+        positions = np.repeat(text_starts - offsets, counts) + np.arange(counts.sum())
+        shingles = window_hash[positions]
+
+        permuted = (_A[:, None] * shingles[None, :] + _B[:, None]) >> np.uint64(32)
+        result[start:start + len(encoded)] = np.minimum.reduceat(permuted, offsets, axis=1).T
+    return result
+
+
+def band_keys(signature: np.ndarray) -> list:
+    rows = NUM_PERM // BANDS
+    return [(band, signature[band * rows:(band + 1) * rows].tobytes()) for band in range(BANDS)]
+
+
+@dataclass
+class Match:
+    """Result of looking a complaint up in the index"""
+    signature: np.ndarray
+    cluster_id: Optional[int] = None
+    similarity: float = 0.0
+
+
+class ClusterIndex:
+    """
+    In-memory MinHash/LSH index of complaint clusters
+
+    Each cluster keeps its first complaint as representative (signature,
+    sample text) plus size, first/last seen day and the latest known
+    classification. Lookups compare a signature only against clusters that
+    share an LSH band with it. Thread-safe.
+
+    Complaints arrive through two paths that can interleave: add() for a
+    single create and catch_up() after batch imports. A per-id flag makes
+    both skip complaints already indexed, and only catch_up() advances
+    max_complaint_id, so an add() of a newer complaint can't hide batch
+    rows that catch_up() hasn't read yet.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._reset()
+        self.lookups = 0
+        self.reused = 0
+        self.ready = False  # set once open() has caught up with the database
+
+    def _reset(self):
+        self.clusters = []  # cluster_id (list index) -> dict
+        self.buckets = {}  # (band, band bytes) -> [cluster_id]
+        self.representatives = np.empty((1024, NUM_PERM), dtype=np.uint32)  # row cluster_id: representative signature
+        self.max_complaint_id = 0  # catch_up() has read every complaint up to here
+        self.indexed_ids = np.zeros(1024, dtype=bool)  # complaint_id -> already in a cluster
+        self.indexed = 0
+
+    # ---------- lookup and assignment ----------
+
+    def _best(self, signature: np.ndarray) -> tuple:
+        candidates = set()
+        for key in band_keys(signature):
+            candidates.update(self.buckets.get(key, ()))
+        if not candidates:
+            return None, 0.0
+        candidates = np.fromiter(candidates, dtype=np.int64, count=len(candidates))
+        agreement = (self.representatives[candidates] == signature).sum(axis=1)
+        best = int(agreement.argmax())
+        return int(candidates[best]), agreement[best] / NUM_PERM
+
+    def lookup(self, text: str) -> Match:
+        """Closest cluster for text (cluster_id None when nothing clears the join threshold)"""
+        signature = signatures([text])[0]
+        with self._lock:
+            self.lookups += 1
+            cluster_id, similarity = self._best(signature)
+        if cluster_id is None or similarity < CLUSTER_JOIN_THRESHOLD:
+            return Match(signature)
+        return Match(signature, cluster_id, similarity)
+
+    def reusable_classification(self, match: Match, model_version: str) -> Optional[dict]:
+        """
+        The matched cluster's classification, if the match is close enough and
+        it came from the current model; counts the reuse
+        """
+        if match.cluster_id is None or match.similarity < CLUSTER_REUSE_THRESHOLD:
+            return None
+        with self._lock:
+            classification = self.clusters[match.cluster_id]["classification"]
+            if not classification or classification["model_version"] != model_version:
+                return None
+            self.reused += 1
+            return dict(classification)
+
+    def add(self, match: Match, complaint_id: int, created: date, text: str,
+            classification: Optional[dict]) -> Optional[int]:
+        """
+        Record a stored complaint in its matched cluster (or a new one)
+        Returns the cluster id, or None if the complaint was already indexed.
+        """
+        with self._lock:
+            return self._add(match.signature, match.cluster_id, complaint_id, created, text, classification)
+
+    def _is_indexed(self, complaint_id: int) -> bool:
+        return complaint_id < len(self.indexed_ids) and bool(self.indexed_ids[complaint_id])
+
+    def _add(self, signature, cluster_id, complaint_id, created, text, classification) -> Optional[int]:
+        if self._is_indexed(complaint_id):
+            return None
+        if complaint_id >= len(self.indexed_ids):
+            grown = np.zeros(max(2 * len(self.indexed_ids), complaint_id + 1), dtype=bool)
+            grown[:len(self.indexed_ids)] = self.indexed_ids
+            self.indexed_ids = grown
+        self.indexed_ids[complaint_id] = True
+        if cluster_id is None:
+            cluster_id = len(self.clusters)
+            self.clusters.append({
+                "representative_id": complaint_id,
+                "sample_text": text[:SAMPLE_CHARS],
+                "size": 0,
+                "first_seen": created,
+                "last_seen": created,
+                "classification": None,
+            })
+            self._store_signature(cluster_id, signature)
+        cluster = self.clusters[cluster_id]
+        cluster["size"] += 1
+        cluster["first_seen"] = min(cluster["first_seen"], created)
+        cluster["last_seen"] = max(cluster["last_seen"], created)
+        if classification and classification.get("fault_type"):
+            cluster["classification"] = classification
+        self.indexed += 1
+        return cluster_id
+
+    def _store_signature(self, cluster_id: int, signature: np.ndarray):
+        if cluster_id >= len(self.representatives):
+            grown = np.empty((2 * len(self.representatives), NUM_PERM), dtype=np.uint32)
+            grown[:len(self.representatives)] = self.representatives
+            self.representatives = grown
+        self.representatives[cluster_id] = signature
+        for key in band_keys(signature):
+            self.buckets.setdefault(key, []).append(cluster_id)
+
+    def add_many(self, rows: Iterable[dict]) -> int:
+        """
+        Assign stored complaints (dicts with complaint_id, complaint_text,
+        created_date and classification fields) in order, skipping those
+        already indexed; returns the number added
+        """
+        with self._lock:
+            rows = [row for row in rows if not self._is_indexed(row["complaint_id"])]
+        if not rows:
+            return 0
+        batch = signatures([row["complaint_text"] for row in rows])
+        added = 0
+        with self._lock:
+            for row, signature in zip(rows, batch):
+                cluster_id, similarity = self._best(signature)
+                if similarity < CLUSTER_JOIN_THRESHOLD:
+                    cluster_id = None
+                if self._add(
+                    signature, cluster_id, row["complaint_id"], row["created_date"],
+                    row["complaint_text"], _classification(row)
+                ) is not None:
+                    added += 1
+        return added
+
+    # ---------- queries ----------
+
+    def largest(self, limit: int = 20, active_days: int = CLUSTER_ACTIVE_DAYS, min_size: int = 2) -> dict:
+        """Largest clusters seen in the last active_days days"""
+        since = datetime.utcnow().date() - timedelta(days=active_days)
+        with self._lock:
+            active = [
+                (cluster_id, cluster) for cluster_id, cluster in enumerate(self.clusters)
+                if cluster["last_seen"] >= since and cluster["size"] >= min_size
+            ]
+            top = sorted(active, key=lambda item: item[1]["size"], reverse=True)[:limit]
+            return {
+                "active_days": active_days,
+                "total_clusters": len(self.clusters),
+                "active_clusters": len(active),
+                "indexed_complaints": self.indexed,
+                "clusters": [
+                    {
+                        "cluster_id": cluster_id,
+                        "size": cluster["size"],
+                        "first_seen": cluster["first_seen"].isoformat(),
+                        "last_seen": cluster["last_seen"].isoformat(),
+                        "representative_id": cluster["representative_id"],
+                        "sample_text": cluster["sample_text"],
+                        "fault_type": (cluster["classification"] or {}).get("fault_type"),
+                        "severity": (cluster["classification"] or {}).get("severity"),
+                    }
+                    for cluster_id, cluster in top
+                ]
+            }
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "ready": self.ready,
+                "clusters": len(self.clusters),
+                "indexed": self.indexed,
+                "max_complaint_id": self.max_complaint_id,
+                "lookups": self.lookups,
+                "reused": self.reused,
+            }
+
+    # ---------- rebuild and persistence ----------
+
+    def catch_up(self, db: Session, batch_size: int = REBUILD_BATCH) -> int:
+        """Index complaints stored after max_complaint_id (all of them when empty)"""
+        stmt = select(
+            Complaint.complaint_id, Complaint.complaint_text, Complaint.created_date,
+            Complaint.predicted_fault_type, Complaint.severity,
+            Complaint.fault_confidence, Complaint.severity_confidence, Complaint.model_version
+        ).where(
+            Complaint.complaint_id > self.max_complaint_id
+        ).order_by(Complaint.complaint_id).execution_options(yield_per=batch_size)
+        added = 0
+        for partition in db.execute(stmt).mappings().partitions():
+            added += self.add_many(partition)
+            with self._lock:
+                self.max_complaint_id = max(self.max_complaint_id, partition[-1]["complaint_id"])
+        return added
+
+    def rebuild(self, db: Session) -> int:
+        """Re-cluster every stored complaint from scratch"""
+        with self._lock:
+            self._reset()
+        return self.catch_up(db)
+
+    def save(self, path: str = CLUSTER_INDEX_PATH):
+        """Write the index to path atomically"""
+        with self._lock:
+            clusters = list(self.clusters)
+            signature_matrix = self.representatives[:len(self.clusters)].copy()
+            meta = {
+                "kind": FORMAT_KIND,
+                "num_perm": NUM_PERM,
+                "bands": BANDS,
+                "shingle_size": SHINGLE_SIZE,
+                "max_complaint_id": self.max_complaint_id,
+                "indexed": self.indexed,
+                "indexed_id_capacity": len(self.indexed_ids),
+            }
+            indexed_ids = np.packbits(self.indexed_ids)
+        classifications = [c["classification"] or {} for c in clusters]
+        arrays = {
+            "signatures": signature_matrix,
+            "representative_id": np.array([c["representative_id"] for c in clusters], dtype=np.int64),
+            "size": np.array([c["size"] for c in clusters], dtype=np.int64),
+            "first_seen": np.array([c["first_seen"].toordinal() for c in clusters], dtype=np.int64),
+            "last_seen": np.array([c["last_seen"].toordinal() for c in clusters], dtype=np.int64),
+            "sample_text": np.array([c["sample_text"] for c in clusters], dtype=f"U{SAMPLE_CHARS}"),
+            "indexed_ids": indexed_ids,
+        }
+        for field in ("fault_type", "severity", "model_version"):
+            arrays[field] = np.array([c.get(field) or "" for c in classifications], dtype="U64")
+        for field in ("fault_confidence", "severity_confidence"):
+            arrays[field] = np.array([c.get(field) or 0.0 for c in classifications], dtype=np.float64)
+        save_artifact(path, arrays, meta)
+
+    def load(self, path: str = CLUSTER_INDEX_PATH):
+        """Replace the index with one saved by save()"""
+        arrays, meta = load_artifact(path)
+        if (meta.get("kind"), meta.get("num_perm"), meta.get("bands"), meta.get("shingle_size")) != (
+            FORMAT_KIND, NUM_PERM, BANDS, SHINGLE_SIZE
+        ):
+            raise ArtifactError(f"{path} is not a compatible cluster index")
+        with self._lock:
+            self._reset()
+            for i, signature in enumerate(np.array(arrays["signatures"])):
+                fault_type = str(arrays["fault_type"][i])
+                self.clusters.append({
+                    "representative_id": int(arrays["representative_id"][i]),
+                    "sample_text": str(arrays["sample_text"][i]),
+                    "size": int(arrays["size"][i]),
+                    "first_seen": date.fromordinal(int(arrays["first_seen"][i])),
+                    "last_seen": date.fromordinal(int(arrays["last_seen"][i])),
+                    "classification": {
+                        "fault_type": fault_type,
+                        "severity": str(arrays["severity"][i]),
+                        "fault_confidence": float(arrays["fault_confidence"][i]),
+                        "severity_confidence": float(arrays["severity_confidence"][i]),
+                        "model_version": str(arrays["model_version"][i]),
+                    } if fault_type else None,
+                })
+                self._store_signature(i, signature)
+            self.max_complaint_id = meta["max_complaint_id"]
+            self.indexed = meta["indexed"]
+            if "indexed_ids" in arrays:
+                self.indexed_ids = np.unpackbits(np.array(arrays["indexed_ids"])).astype(bool)
+                self.indexed_ids = self.indexed_ids[:meta["indexed_id_capacity"]]
+            else:
+                # saved before per-id flags: everything up to the high-water mark
+                self.indexed_ids = np.zeros(self.max_complaint_id + 1024, dtype=bool)
+                self.indexed_ids[:self.max_complaint_id + 1] = True
+
+    def open(self, session_factory, path: str = CLUSTER_INDEX_PATH) -> int:
+        """
+        Load the saved index if there is a usable one, then index complaints
+        added since it was saved (a full rebuild when there is none)
+        Returns the number of complaints indexed from the database
+        """
+        if path and os.path.exists(path):
+            try:
+                self.load(path)
+            except (ArtifactError, OSError, KeyError):
+                with self._lock:
+                    self._reset()
+        db = session_factory()
+        try:
+            added = self.catch_up(db)
+        finally:
+            db.close()
+        self.ready = True
+        return added
+
+
+def _classification(row) -> Optional[dict]:
+    if not row.get("predicted_fault_type"):
+        return None
+    return {
+        "fault_type": row["predicted_fault_type"],
+        "severity": row["severity"],
+        "fault_confidence": row["fault_confidence"],
+        "severity_confidence": row["severity_confidence"],
+        "model_version": row["model_version"],
+    }
+
+
+# Global index used by the API
+complaint_clusters = ClusterIndex()
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Build and inspect the near-duplicate complaint clusters")
+    parser.add_argument("command", choices=["rebuild", "top"])
+    parser.add_argument("--path", default=CLUSTER_INDEX_PATH)
+    parser.add_argument("--limit", type=int, default=20)
+    parser.add_argument("--active-days", type=int, default=CLUSTER_ACTIVE_DAYS)
+    args = parser.parse_args(argv)
+
+    index = ClusterIndex()
+    if args.command == "rebuild":
+        start = time.perf_counter()
+        db = SessionLocal()
+        try:
+            indexed = index.rebuild(db)
+        finally:
+            db.close()
+        index.save(args.path)
+        print(f"✓ Clustered {indexed} complaints into {len(index.clusters)} clusters "
+              f"in {time.perf_counter() - start:.1f}s ({args.path})")
+        return 0
+
+    index.open(SessionLocal, args.path)
+    for cluster in index.largest(args.limit, args.active_days)["clusters"]:
+        print(f"{cluster['size']:>8}  {cluster['last_seen']}  {cluster['fault_type'] or '-':<18} "
+              f"{cluster['sample_text'][:80]}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
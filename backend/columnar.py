@@ -0,0 +1,711 @@
+"""
+In-memory columnar snapshot of the complaints table
+Keeps ids, created dates, resolution times and satisfaction scores as NumPy
+arrays and product, department, status, severity and fault type as
+dictionary-encoded integer codes, so insights and ad-hoc group-by / filter
+slices are computed with vectorized operations instead of SQL round trips.
+
+The snapshot follows the table incrementally: rows above the complaint_id
+high-water mark are appended after every complaint write in this process
+(result_cache listener) and at least every SNAPSHOT_POLL seconds (writes by
+other processes), updated rows are patched in place by the API's update
+hook, and a full rebuild every SNAPSHOT_TTL seconds (or after a re-score),
+run in the background, picks up anything else (other workers' updates).
+Table reads never hold the snapshot lock: new arrays are loaded first and
+swapped (or merged) in, so concurrent queries keep using the current ones.
+"""
+import os
+import threading
+import time
+from datetime import date, timedelta
+from typing import Dict, List, Optional
+
+import numpy as np
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from database import Complaint, Product, ReadSessionLocal
+from cache import result_cache
+from predictive_insights import calculate_health_score, insights_engine, trend_payload, trend_range
+
+# Settings, overridable via environment
+ANALYTICS_SNAPSHOT = os.getenv("ANALYTICS_SNAPSHOT", "1") == "1"  # serve insights from the snapshot
+SNAPSHOT_TTL = float(os.getenv("ANALYTICS_SNAPSHOT_TTL", "300"))  # seconds between full rebuilds
+SNAPSHOT_POLL = float(os.getenv("ANALYTICS_SNAPSHOT_POLL", "5"))  # seconds between high-water checks
+LOAD_BATCH = 50_000
+
+EPOCH = date(1970, 1, 1)
+
+# Dictionary-encoded columns, in the order they are selected
+CATEGORICAL = ("product_id", "department", "status", "severity", "predicted_fault_type")
+COLUMNS = (
+    Complaint.complaint_id, Complaint.created_date, Complaint.resolution_time,
+    Complaint.customer_satisfaction, *(getattr(Complaint, name) for name in CATEGORICAL)
+)
+
+# Group-by / filter names accepted by aggregate(), mapped to snapshot columns
+DIMENSIONS = {
+    "product": "product_id",
+    "department": "department",
+    "status": "status",
+    "severity": "severity",
+    "fault_type": "predicted_fault_type",
+}
+TIME_DIMENSIONS = ("day", "week", "month")
+
+
+class Dictionary:
+    """Value <-> code mapping for one categorical column; codes are assigned in first-seen order"""
+
+    def __init__(self):
+        self.values = []
+        self.codes = {}
+
+    def code(self, value) -> int:
+        code = self.codes.get(value)
+        if code is None:
+            code = self.codes[value] = len(self.values)
+            self.values.append(value)
+        return code
+
+    def encode(self, values) -> np.ndarray:
+        for value in set(values).difference(self.codes):
+            self.code(value)
+        return np.fromiter(map(self.codes.__getitem__, values), dtype=np.int32, count=len(values))
+
+    def lookup(self, values) -> np.ndarray:
+        """Codes of the given values that exist (unknown values match nothing)"""
+        return np.array([self.codes[value] for value in values if value in self.codes], dtype=np.int32)
+
+
+class SnapshotView:
+    """
+    Consistent read-only view of the first `size` rows of a snapshot
+    Columns are views of the snapshot arrays; later appends don't change them.
+    """
+
+    def __init__(self, columns: Dict[str, np.ndarray], dictionaries: Dict[str, Dictionary], size: int):
+        self.size = size
+        self.columns = {name: column[:size] for name, column in columns.items()}
+        self.dictionaries = dictionaries
+
+    def codes_of(self, column: str, *values) -> np.ndarray:
+        return self.dictionaries[column].lookup(values)
+
+    def is_value(self, column: str, value) -> np.ndarray:
+        """Boolean mask of rows whose column equals value"""
+        code = self.dictionaries[column].codes.get(value)
+        if code is None:
+            return np.zeros(self.size, dtype=bool)
+        return self.columns[column] == code
+
+    def counts(self, column: str, mask: Optional[np.ndarray] = None, weights=None) -> np.ndarray:
+        """Rows (or weight sums) per code of column, optionally restricted to mask"""
+        # Masks are applied as 0/1 weights: cheaper than copying the selected rows out
+        if mask is not None:
+            weights = mask if weights is None else np.where(mask, weights, 0)
+        return np.bincount(self.columns[column], weights=weights, minlength=len(self.dictionaries[column].values))
+
+    def date_mask(self, start: Optional[date], end: Optional[date]) -> np.ndarray:
+        created = self.columns["created_date"]
+        mask = np.ones(self.size, dtype=bool)
+        if start is not None:
+            mask &= created >= (start - EPOCH).days
+        if end is not None:
+            mask &= created <= (end - EPOCH).days
+        return mask
+
+    def time_codes(self, granularity: str, mask: np.ndarray) -> tuple:
+        """(codes, bucket start dates) for grouping the masked rows by day, week or month"""
+        days = self.columns["created_date"][mask]
+        if granularity == "week":
+            days = days - (days + 3) % 7  # 1970-01-01 was a Thursday; weeks start on Monday
+        elif granularity == "month":
+            days = days.astype("datetime64[D]").astype("datetime64[M]").astype("datetime64[D]").astype(np.int64)
+        buckets, codes = np.unique(days, return_inverse=True)
+        return codes, [EPOCH + timedelta(days=int(day)) for day in buckets]
+
+
+class ComplaintSnapshot:
+    """
+    Columnar copy of the complaints table, kept current from the complaint_id
+    high-water mark (see the module docstring for the refresh rules)
+
+    _lock guards the arrays and counters and is held only to swap or merge
+    loaded rows in. Change signals are counted (_writes, _invalidations) so a
+    load clears its dirty/stale flag only if no signal arrived while it read
+    the table, and updates arriving during a load are replayed after it.
+    """
+
+    def __init__(self, ttl: float = SNAPSHOT_TTL, poll: float = SNAPSHOT_POLL, session_factory=ReadSessionLocal):
+        self.ttl = ttl
+        self.poll = poll
+        self.session_factory = session_factory
+        self.high_water = 0
+        self.size = 0
+        self.built_at = None  # monotonic time of the last full build
+        self.checked_at = 0.0
+        self.rebuilds = 0
+        self.refreshes = 0
+        self.rows_appended = 0
+        self.rows_updated = 0
+        self.last_rebuild_seconds = 0.0
+        self._columns = None
+        self._dictionaries = None
+        self.generation = 0  # full rebuilds swapped in
+        self._dirty = False
+        self._stale = False
+        self._writes = 0  # mark_dirty calls
+        self._invalidations = 0  # invalidate calls
+        self._rebuilding = False
+        self._update_logs = []  # one list per load in flight: updates to replay after it
+        self._lock = threading.Lock()
+        self._first_load = threading.Lock()
+        self._appending = threading.Lock()
+
+    @staticmethod
+    def _empty_columns(capacity: int) -> Dict[str, np.ndarray]:
+        columns = {
+            "complaint_id": np.zeros(capacity, dtype=np.int64),
+            "created_date": np.zeros(capacity, dtype=np.int32),  # days since 1970-01-01
+            "resolution_time": np.full(capacity, np.nan),  # NaN = NULL
+            "customer_satisfaction": np.zeros(capacity, dtype=np.int8),  # 0 = NULL
+        }
+        for name in CATEGORICAL:
+            columns[name] = np.zeros(capacity, dtype=np.int32)
+        return columns
+
+    # ---------- loading ----------
+
+    def _load(self, db: Session, after_id: int) -> tuple:
+        """
+        Rows with complaint_id > after_id as new arrays with their own
+        dictionaries; returns (columns, dictionaries, size, high water)
+        """
+        stmt = select(*COLUMNS).where(
+            Complaint.complaint_id > after_id
+        ).order_by(Complaint.complaint_id).execution_options(yield_per=LOAD_BATCH)
+        columns, size = self._empty_columns(1024), 0
+        dictionaries = {name: Dictionary() for name in CATEGORICAL}
+        dates = Dictionary()  # few distinct dates: convert each once
+        # Core rows straight from the connection, skipping ORM result processing
+        for partition in db.connection().execute(stmt).partitions():
+            n = len(partition)
+            if size + n > len(columns["complaint_id"]):
+                columns = _grow(columns, max(2 * len(columns["complaint_id"]), size + n))
+            ids, created, resolution, satisfaction, *categorical = zip(*partition)
+            rows = slice(size, size + n)
+            columns["complaint_id"][rows] = ids
+            date_codes = dates.encode(created)
+            columns["created_date"][rows] = np.array(
+                [(day - EPOCH).days for day in dates.values], dtype=np.int32
+            )[date_codes]
+            columns["resolution_time"][rows] = np.array(resolution, dtype=float)
+            columns["customer_satisfaction"][rows] = [value or 0 for value in satisfaction]
+            for name, values in zip(CATEGORICAL, categorical):
+                columns[name][rows] = dictionaries[name].encode(values)
+            size += n
+            after_id = ids[-1]
+        return columns, dictionaries, size, after_id
+
+    def _start_load(self) -> tuple:
+        """Register a load about to read the table; returns its update log and the signal counts"""
+        with self._lock:
+            log = []
+            self._update_logs.append(log)
+            return log, self._writes, self._invalidations
+
+    def _end_load(self, log: list):
+        with self._lock:
+            # By identity: logs of other loads may compare equal (e.g. both empty)
+            self._update_logs = [other for other in self._update_logs if other is not log]
+
+    def _replay(self, log: list):
+        # Updates committed while the load read the table may hold newer values than it saw
+        for row in log:
+            self._patch(row)
+
+    def rebuild(self, db: Session) -> bool:
+        """
+        Load the whole table into new arrays and swap them in
+        Returns True if the snapshot was marked stale (invalidate) before the load.
+        """
+        start = time.perf_counter()
+        log, writes, invalidations = self._start_load()
+        try:
+            with self._lock:
+                was_stale = self._stale
+            columns, dictionaries, size, high_water = self._load(db, 0)
+            with self._lock:
+                self._columns, self._dictionaries = columns, dictionaries
+                self.size, self.high_water = size, high_water
+                self.generation += 1
+                self.built_at = self.checked_at = time.monotonic()
+                # Signals that arrived during the load may not be reflected in it
+                self._dirty = self._writes != writes
+                self._stale = self._invalidations != invalidations
+                self.rebuilds += 1
+                self.last_rebuild_seconds = time.perf_counter() - start
+                self._replay(log)
+        finally:
+            self._end_load(log)
+        return was_stale
+
+    def _append_new(self, db: Session):
+        """Load rows above the high-water mark and merge them in (skipped if another append is running)"""
+        if not self._appending.acquire(blocking=False):
+            return
+        log, writes, _ = self._start_load()
+        try:
+            with self._lock:
+                generation, after_id = self.generation, self.high_water
+            columns, dictionaries, n, high_water = self._load(db, after_id)
+            with self._lock:
+                if self.generation != generation:
+                    return  # a rebuild was swapped in meanwhile; append from its high-water mark next time
+                self._merge(columns, dictionaries, n)
+                self.rows_appended += n
+                self.high_water = high_water
+                self.checked_at = time.monotonic()
+                self._dirty = self._writes != writes
+                self.refreshes += 1
+                self._replay(log)
+        finally:
+            self._end_load(log)
+            self._appending.release()
+
+    def _merge(self, columns: dict, dictionaries: dict, n: int):
+        """Append n loaded rows, re-coding their categorical values (caller holds _lock)"""
+        if not n:
+            return
+        if self.size + n > len(self._columns["complaint_id"]):
+            self._columns = _grow(self._columns, max(2 * len(self._columns["complaint_id"]), self.size + n))
+        rows = slice(self.size, self.size + n)
+        for name in ("complaint_id", "created_date", "resolution_time", "customer_satisfaction"):
+            self._columns[name][rows] = columns[name][:n]
+        for name in CATEGORICAL:
+            recode = np.array([self._dictionaries[name].code(value) for value in dictionaries[name].values], dtype=np.int32)
+            self._columns[name][rows] = recode[columns[name][:n]]
+        self.size += n
+
+    def _rebuild_in_background(self):
+        with self._lock:
+            if self._rebuilding:
+                return
+            self._rebuilding = True
+
+        def run():
+            db = self.session_factory()
+            try:
+                if self.rebuild(db):
+                    # Results computed from the stale arrays meanwhile (dashboard
+                    # stream, ETags) are refreshed like after a write
+                    result_cache.bump_version()
+            finally:
+                db.close()
+                with self._lock:
+                    self._rebuilding = False
+
+        threading.Thread(target=run, name="snapshot-rebuild", daemon=True).start()
+
+    def view(self, db: Session) -> SnapshotView:
+        """Bring the snapshot up to date as needed and return a view of it"""
+        with self._lock:
+            loaded = self._columns is not None
+            now = time.monotonic()
+            rebuild_due = loaded and (self._stale or now - self.built_at > self.ttl)
+            append_due = loaded and (self._dirty or now - self.checked_at > self.poll)
+        if not loaded:
+            # Nothing to serve yet: one caller loads, the others wait for it
+            with self._first_load:
+                if self._columns is None:
+                    self.rebuild(db)
+        if rebuild_due:
+            # Serve the current arrays (plus new rows) while the replacement loads
+            self._rebuild_in_background()
+        if append_due:
+            self._append_new(db)
+        with self._lock:
+            return SnapshotView(self._columns, self._dictionaries, self.size)
+
+    def open(self, session_factory=None):
+        """Build the snapshot up front (startup), instead of on the first query"""
+        db = (session_factory or self.session_factory)()
+        try:
+            self.view(db)
+        finally:
+            db.close()
+
+    # ---------- change hooks ----------
+
+    def mark_dirty(self, version: Optional[int] = None):
+        """New complaints may exist; append them on the next read (result_cache listener)"""
+        with self._lock:
+            self._writes += 1
+            self._dirty = True
+
+    def invalidate(self):
+        """Many rows changed (e.g. a re-score); rebuild on the next read"""
+        with self._lock:
+            self._invalidations += 1
+            self._stale = True
+
+    def update(self, complaint):
+        """Apply an updated complaint row (ORM object) to the snapshot in place"""
+        # Plain values: the row may be replayed from a loading thread after the session moved on
+        row = {column.key: getattr(complaint, column.key) for column in COLUMNS}
+        with self._lock:
+            for log in self._update_logs:
+                log.append(row)
+            if self._columns is not None:
+                self._patch(row)
+
+    def _patch(self, row: dict):
+        ids = self._columns["complaint_id"][:self.size]
+        i = int(np.searchsorted(ids, row["complaint_id"]))
+        if i >= self.size or ids[i] != row["complaint_id"]:
+            return  # not loaded yet; the next append picks it up
+        self._columns["created_date"][i] = (row["created_date"] - EPOCH).days
+        self._columns["resolution_time"][i] = np.nan if row["resolution_time"] is None else row["resolution_time"]
+        self._columns["customer_satisfaction"][i] = row["customer_satisfaction"] or 0
+        for name in CATEGORICAL:
+            self._columns[name][i] = self._dictionaries[name].code(row[name])
+        self.rows_updated += 1
+
+    # ---------- ad-hoc slicing ----------
+
+    def aggregate(
+        self,
+        db: Session,
+        group_by: List[str],
+        filters: Optional[Dict[str, list]] = None,
+        start: Optional[date] = None,
+        end: Optional[date] = None
+    ) -> dict:
+        """
+        Complaint counters per combination of group_by values
+
+        group_by: any of product, department, status, severity, fault_type,
+        day, week and month. filters maps the categorical names to lists of
+        accepted values (product ids for product); start/end bound
+        created_date (inclusive). Groups are ordered by complaint count,
+        largest first. Raises ValueError for an unknown group or filter name.
+        """
+        unknown = [name for name in group_by if name not in DIMENSIONS and name not in TIME_DIMENSIONS]
+        unknown += [name for name in (filters or {}) if name not in DIMENSIONS]
+        if unknown:
+            raise ValueError(f"unknown dimension(s): {', '.join(unknown)}")
+        view = self.view(db)
+        mask = view.date_mask(start, end)
+        for name, values in (filters or {}).items():
+            mask &= np.isin(view.columns[DIMENSIONS[name]], view.codes_of(DIMENSIONS[name], *values))
+
+        keys, labels, sizes = [], [], []  # keys: codes of the masked rows
+        for name in group_by:
+            if name in TIME_DIMENSIONS:
+                codes, buckets = view.time_codes(name, mask)
+                keys.append(codes)
+                labels.append([bucket.isoformat() for bucket in buckets])
+            else:
+                column = DIMENSIONS[name]
+                keys.append(view.columns[column][mask])
+                labels.append(view.dictionaries[column].values)
+            sizes.append(max(len(labels[-1]), 1))
+
+        if keys:
+            combined = np.ravel_multi_index(keys, sizes)
+            groups, inverse = np.unique(combined, return_inverse=True)
+        else:
+            groups, inverse = np.zeros(1, dtype=np.int64), np.zeros(int(mask.sum()), dtype=np.int64)
+
+        def per_group(values=None):
+            return np.bincount(inverse, weights=values, minlength=len(groups))
+
+        resolution = view.columns["resolution_time"][mask]
+        has_resolution = ~np.isnan(resolution)
+        satisfaction = view.columns["customer_satisfaction"][mask]
+        counters = {
+            "complaints": per_group(),
+            "critical": per_group(view.is_value("severity", "critical")[mask]),
+            "high": per_group(view.is_value("severity", "high")[mask]),
+            "resolved": per_group(view.is_value("status", "resolved")[mask]),
+            "open": per_group(view.is_value("status", "open")[mask]),
+            "resolution_sum": per_group(np.where(has_resolution, resolution, 0)),
+            "resolution_count": per_group(has_resolution),
+            "satisfaction_sum": per_group(satisfaction.astype(float)),
+            "satisfaction_count": per_group(satisfaction > 0),
+        }
+
+        names = {}
+        if "product" in group_by:
+            names = dict(db.query(Product.product_id, Product.product_name).all())
+        rows = []
+        for g, group_codes in enumerate(zip(*np.unravel_index(groups, sizes)) if keys else [()]):
+            count = int(counters["complaints"][g])
+            if not count:
+                continue
+            row = {name: labels[k][code] for k, (name, code) in enumerate(zip(group_by, group_codes))}
+            if "product" in row:
+                row["product_name"] = names.get(row["product"])
+            resolution_count = counters["resolution_count"][g]
+            satisfaction_count = counters["satisfaction_count"][g]
+            row.update({
+                "complaints": count,
+                "critical": int(counters["critical"][g]),
+                "high": int(counters["high"][g]),
+                "resolved": int(counters["resolved"][g]),
+                "open": int(counters["open"][g]),
+                "resolution_rate": round(counters["resolved"][g] / count * 100, 2),
+                "avg_resolution_time": round(counters["resolution_sum"][g] / resolution_count, 2) if resolution_count else None,
+                "avg_satisfaction": round(counters["satisfaction_sum"][g] / satisfaction_count, 2) if satisfaction_count else None,
+            })
+            rows.append(row)
+        rows.sort(key=lambda row: row["complaints"], reverse=True)
+
+        return {
+            "group_by": group_by,
+            "filters": filters or {},
+            "start": start.isoformat() if start else None,
+            "end": end.isoformat() if end else None,
+            "total": int(mask.sum()),
+            "groups": rows,
+        }
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "loaded": self._columns is not None,
+                "rows": self.size,
+                "high_water": self.high_water,
+                "memory_bytes": sum(c.nbytes for c in self._columns.values()) if self._columns else 0,
+                "rebuilds": self.rebuilds,
+                "refreshes": self.refreshes,
+                "rows_appended": self.rows_appended,
+                "rows_updated": self.rows_updated,
+                "last_rebuild_seconds": round(self.last_rebuild_seconds, 3),
+                "age_seconds": round(time.monotonic() - self.built_at, 1) if self.built_at else None,
+            }
+
+
+def _grow(columns: Dict[str, np.ndarray], capacity: int) -> Dict[str, np.ndarray]:
+    grown = ComplaintSnapshot._empty_columns(capacity)
+    size = len(columns["complaint_id"])
+    for name, column in columns.items():
+        grown[name][:size] = column
+    return grown
+
+
+def _ranked(counts: np.ndarray, values: list) -> list:
+    """(value, count) pairs with a non-zero count, largest first, ties by value as SQLite groups them"""
+    ranked = [(values[i], int(count)) for i, count in enumerate(counts) if count > 0]
+    return sorted(ranked, key=lambda pair: (-pair[1], pair[0] is not None, pair[0] or ""))
+
+
+class ColumnarInsightsEngine:
+    """
+    InsightsEngine computed from the in-memory snapshot
+    Same methods and output as InsightsEngine; each call is a handful of
+    vectorized passes over the snapshot arrays
+    """
+
+    def __init__(self, snapshot: ComplaintSnapshot):
+        self.snapshot = snapshot
+
+    def get_complaint_trend(
+        self,
+        db: Session,
+        days: int = 30,
+        granularity: str = "day",
+        split_by: Optional[str] = None,
+        start: Optional[date] = None,
+        end: Optional[date] = None
+    ) -> dict:
+        """Get complaint trend over the last N days (or start..end)"""
+        start, end = trend_range(days, start, end)
+        view = self.snapshot.view(db)
+        mask = view.date_mask(start, end)
+        span = (end - start).days + 1
+        offsets = view.columns["created_date"][mask] - (start - EPOCH).days
+        counts = {}
+        if split_by:
+            column = DIMENSIONS[split_by]
+            values = view.dictionaries[column].values
+            width = max(len(values), 1)
+            grid = np.bincount(offsets * width + view.columns[column][mask], minlength=span * width)
+            grid = grid.reshape(span, width)
+            for offset, code in zip(*np.nonzero(grid)):
+                value = values[code]
+                key = None if value is None else str(value)
+                counts[(start + timedelta(days=int(offset)), key)] = int(grid[offset, code])
+        else:
+            per_day = np.bincount(offsets, minlength=span)
+            for offset in np.flatnonzero(per_day):
+                counts[(start + timedelta(days=int(offset)), None)] = int(per_day[offset])
+        return trend_payload(db, counts, start, end, granularity, split_by)
+
+    def get_fault_distribution(self, db: Session) -> dict:
+        """Get distribution of fault types"""
+        view = self.snapshot.view(db)
+        faults = _ranked(view.counts("predicted_fault_type"), view.dictionaries["predicted_fault_type"].values)
+        total = view.size
+        return {
+            "total_faults": total,
+            "distribution": [
+                {
+                    "fault_type": fault_type,
+                    "count": count,
+                    "percentage": round((count / total * 100), 2) if total > 0 else 0
+                }
+                for fault_type, count in faults
+            ]
+        }
+
+    def get_product_health_scores(self, db: Session) -> dict:
+        """Calculate health scores for each product based on complaint metrics"""
+        view = self.snapshot.view(db)
+        products = view.dictionaries["product_id"]
+        resolution = view.columns["resolution_time"]
+        # Only truthy resolution times count towards the average (NULL and 0 are skipped)
+        timed = ~np.isnan(resolution) & (resolution != 0)
+        complaints = view.counts("product_id")
+        critical = view.counts("product_id", view.is_value("severity", "critical"))
+        high = view.counts("product_id", view.is_value("severity", "high"))
+        resolved = view.counts("product_id", view.is_value("status", "resolved"))
+        time_sum = view.counts("product_id", timed, resolution)
+        time_count = view.counts("product_id", timed)
+
+        scores = []
+        for product in db.query(Product).order_by(Product.product_id).all():
+            i = products.codes.get(product.product_id)
+            complaint_count = int(complaints[i]) if i is not None else 0
+            scores.append({
+                "product_id": product.product_id,
+                "product_name": product.product_name,
+                "category": product.category,
+                "health_score": round(calculate_health_score(
+                    complaint_count,
+                    int(critical[i]) if i is not None else 0,
+                    int(high[i]) if i is not None else 0,
+                    int(resolved[i]) if i is not None else 0,
+                    float(time_sum[i] / time_count[i]) if i is not None and time_count[i] else 0
+                ), 2),
+                "complaint_count": complaint_count
+            })
+        return {
+            "scores": sorted(scores, key=lambda x: x["health_score"], reverse=True)
+        }
+
+    def get_resolution_metrics(self, db: Session) -> dict:
+        """Get complaint resolution statistics"""
+        view = self.snapshot.view(db)
+        resolved = view.is_value("status", "resolved")
+        times = view.columns["resolution_time"][resolved]
+        times = times[~np.isnan(times) & (times != 0)]
+        if not len(times):
+            return {
+                "total_resolved": 0,
+                "avg_resolution_days": 0,
+                "median_resolution_days": 0,
+                "min_resolution_days": 0,
+                "max_resolution_days": 0
+            }
+        median = float(np.median(times))
+        return {
+            "total_resolved": int(resolved.sum()),
+            "avg_resolution_days": round(float(times.mean()), 2),
+            # statistics.median semantics: a middle element stays an int
+            "median_resolution_days": round(int(median) if len(times) % 2 else median, 2),
+            "min_resolution_days": int(times.min()),
+            "max_resolution_days": int(times.max())
+        }
+
+    def get_severity_distribution(self, db: Session) -> dict:
+        """Get distribution of complaint severity levels"""
+        view = self.snapshot.view(db)
+        severities = _ranked(view.counts("severity"), view.dictionaries["severity"].values)
+        total = view.size
+        return {
+            "total": total,
+            "by_severity": [
+                {
+                    "severity": severity,
+                    "count": count,
+                    "percentage": round((count / total * 100), 2) if total > 0 else 0
+                }
+                for severity, count in severities
+            ]
+        }
+
+    def get_department_workload(self, db: Session) -> dict:
+        """Get complaint distribution by department"""
+        view = self.snapshot.view(db)
+        resolution = view.columns["resolution_time"]
+        timed = ~np.isnan(resolution)
+        time_sum = view.counts("department", timed, resolution)
+        time_count = view.counts("department", timed)
+        codes = view.dictionaries["department"].codes
+        by_department = []
+        for department, count in _ranked(view.counts("department"), view.dictionaries["department"].values):
+            i = codes[department]
+            avg_time = time_sum[i] / time_count[i] if time_count[i] else None
+            by_department.append({
+                "department": department,
+                "complaint_count": count,
+                "avg_resolution_time": round(float(avg_time), 2) if avg_time else None
+            })
+        return {"by_department": by_department}
+
+    def get_summary_stats(self, db: Session) -> dict:
+        """High-level counters and customer satisfaction summary"""
+        view = self.snapshot.view(db)
+        total = view.size
+        resolved = int(view.is_value("status", "resolved").sum())
+        satisfaction = np.bincount(view.columns["customer_satisfaction"], minlength=6)
+        rated = int(satisfaction[1:].sum())
+        return {
+            "total_complaints": total,
+            "resolved_complaints": resolved,
+            "resolution_rate": round((resolved / total * 100), 2) if total > 0 else 0,
+            "critical_complaints": int(view.is_value("severity", "critical").sum()),
+            "open_complaints": int(view.is_value("status", "open").sum()),
+            "average_satisfaction": round(float(satisfaction @ np.arange(len(satisfaction))) / rated, 2) if rated else None,
+            "satisfaction_responses": rated,
+            "satisfaction_distribution": {str(rating): int(satisfaction[rating]) for rating in range(1, 6)}
+        }
+
+    def get_critical_alerts(self, db: Session) -> dict:
+        """Identify critical issues requiring immediate attention"""
+        view = self.snapshot.view(db)
+        products = view.dictionaries["product_id"]
+        critical = view.counts("product_id", view.is_value("severity", "critical"))
+        critical_by_name = {}
+        for product_id, name in db.query(Product.product_id, Product.product_name).all():
+            i = products.codes.get(product_id)
+            if i is not None and critical[i] > 0:
+                critical_by_name[name] = critical_by_name.get(name, 0) + int(critical[i])
+        critical_products = sorted(critical_by_name.items(), key=lambda p: (-p[1], p[0]))[:5]
+
+        # status != 'resolved' in SQL also skips rows without a status
+        unresolved_mask = ~view.is_value("status", "resolved") & ~view.is_value("status", None)
+        unresolved = _ranked(
+            view.counts("predicted_fault_type", unresolved_mask), view.dictionaries["predicted_fault_type"].values
+        )[:5]
+        return {
+            "critical_products": [
+                {"product": p[0], "critical_count": p[1]}
+                for p in critical_products
+            ],
+            "unresolved_fault_types": [
+                {"fault_type": u[0], "unresolved_count": u[1]}
+                for u in unresolved
+            ]
+        }
+
+
+# Global snapshot (built at startup, or on first use with ANALYTICS_SNAPSHOT=0)
+complaint_snapshot = ComplaintSnapshot()
+result_cache.add_listener(complaint_snapshot.mark_dirty)
+columnar_insights = ColumnarInsightsEngine(complaint_snapshot)
+
+# Engine behind the distribution / health / resolution / summary endpoints
+analytics_insights = columnar_insights if ANALYTICS_SNAPSHOT else insights_engine
@@ -1,23 +1,156 @@
 """
 Database configuration and session management
 """
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event, func, cast
+from sqlalchemy.engine import make_url
 from sqlalchemy.orm import sessionmaker, declarative_base
-from sqlalchemy import Column, Integer, String, Date, ForeignKey, Text
+from sqlalchemy import Column, Integer, String, Date, ForeignKey, Text, Float, Index, inspect, text
 from datetime import datetime
+import os
 
-# SQLite database URL
-DATABASE_URL = "sqlite:///./resolve_analytics.db"
 
-# Create engine
-engine = create_engine(
-    DATABASE_URL,
-    connect_args={"check_same_thread": False},
-    echo=False
-)
+# Database URLs, overridable via environment
+# e.g. DATABASE_URL=postgresql+psycopg2://resolve:secret@db:5432/resolve
+DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./resolve_analytics.db")
+DATABASE_READ_URL = os.getenv("DATABASE_READ_URL")  # optional replica for read-only queries
 
-# Session factory
+# Storage profile, overridable via environment
+#   production: WAL journaling, tuned pragmas, BEGIN IMMEDIATE writes, read-only engine for queries
+#   legacy:     the original bare engine (default journaling, no pragmas)
+SQLITE_PROFILE = os.getenv("SQLITE_PROFILE", "production")
+SQLITE_PRAGMAS = {
+    "journal_mode": os.getenv("SQLITE_JOURNAL_MODE", "WAL"),
+    "synchronous": os.getenv("SQLITE_SYNCHRONOUS", "NORMAL"),  # safe with WAL; FULL fsyncs every commit
+    "cache_size": int(os.getenv("SQLITE_CACHE_SIZE_KB", "65536")) * -1,  # negative = KiB
+    "mmap_size": int(os.getenv("SQLITE_MMAP_SIZE", str(256 * 1024 * 1024))),
+    "temp_store": os.getenv("SQLITE_TEMP_STORE", "MEMORY"),
+    "busy_timeout": int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "5000")),
+}
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "10"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "20"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))  # seconds; server backends only
+# Route read-only queries (analytics, listings) to a separate read-only engine
+DB_READ_ENGINE = os.getenv("DB_READ_ENGINE", "1" if SQLITE_PROFILE == "production" else "0") == "1"
+
+
+def _apply_sqlite_profile(engine, read_only: bool):
+    """Set pragmas on every new connection and take the write lock up front"""
+    
+    @event.listens_for(engine, "connect")
+    def on_connect(dbapi_connection, connection_record):
+        # Let SQLAlchemy, not pysqlite, decide when transactions begin
+        dbapi_connection.isolation_level = None
+        cursor = dbapi_connection.cursor()
+        for name, value in SQLITE_PRAGMAS.items():
+            if read_only and name == "journal_mode":
+                continue  # persistent setting, owned by the writer
+            cursor.execute(f"PRAGMA {name}={value}")
+        cursor.close()
+    
+    @event.listens_for(engine, "begin")
+    def on_begin(conn):
+        # A deferred transaction that reads and then writes can fail with
+        # SQLITE_BUSY without waiting; IMMEDIATE queues on busy_timeout instead
+        conn.exec_driver_sql("BEGIN" if read_only else "BEGIN IMMEDIATE")
+
+
+def create_sqlite_engine(url: str = DATABASE_URL, profile: str = SQLITE_PROFILE, read_only: bool = False):
+    """
+    Create an engine for a SQLite file using the given storage profile
+    read_only opens the file with mode=ro (production profile only)
+    """
+    if profile != "production":
+        return create_engine(url, connect_args={"check_same_thread": False}, echo=False)
+    
+    connect_args = {
+        "check_same_thread": False,
+        "timeout": SQLITE_PRAGMAS["busy_timeout"] / 1000,
+    }
+    if read_only:
+        database = os.path.abspath(make_url(url).database)
+        url = f"sqlite:///file:{database}?mode=ro&uri=true"
+    
+    engine = create_engine(
+        url,
+        connect_args=connect_args,
+        pool_size=DB_POOL_SIZE,
+        max_overflow=DB_MAX_OVERFLOW,
+        pool_timeout=DB_POOL_TIMEOUT,
+        echo=False
+    )
+    _apply_sqlite_profile(engine, read_only)
+    return engine
+
+
+def create_db_engine(url: str = DATABASE_URL, read_only: bool = False):
+    """
+    Create an engine for any supported backend
+    SQLite gets the storage profile above; server databases (PostgreSQL)
+    get a pre-pinged, recycled connection pool
+    """
+    if make_url(url).get_backend_name() == "sqlite":
+        return create_sqlite_engine(url, read_only=read_only)
+    return create_engine(
+        url,
+        pool_size=DB_POOL_SIZE,
+        max_overflow=DB_MAX_OVERFLOW,
+        pool_timeout=DB_POOL_TIMEOUT,
+        pool_recycle=DB_POOL_RECYCLE,
+        pool_pre_ping=True,
+        echo=False
+    )
+
+
+def _create_read_engine(writer):
+    if DATABASE_READ_URL:
+        return create_db_engine(DATABASE_READ_URL, read_only=True)
+    if DB_READ_ENGINE and writer.dialect.name == "sqlite":
+        return create_db_engine(DATABASE_URL, read_only=True)
+    return writer
+
+
+# Create engines
+engine = create_db_engine(DATABASE_URL)
+read_engine = _create_read_engine(engine)
+
+def date_bucket(column, granularity: str, dialect: str):
+    """
+    SQL expression truncating a date column to the start of its day/week/month
+    Weeks start on Monday. PostgreSQL uses date_trunc; SQLite uses date() modifiers.
+    """
+    if granularity == "day":
+        return column
+    if granularity not in ("week", "month"):
+        raise ValueError(f"unsupported granularity: {granularity}")
+    if dialect == "postgresql":
+        return cast(func.date_trunc(granularity, column), Date)
+    if granularity == "week":
+        return func.date(column, "weekday 0", "-6 days")
+    return func.date(column, "start of month")
+
+
+def for_update(db, stmt):
+    """
+    Lock the rows stmt (a select or ORM query) reads until the transaction ends
+
+    For read-then-write code that derives rollup deltas from what it read:
+    without the lock, two writers can both subtract the same "before" state.
+    Server backends get SELECT ... FOR UPDATE. SQLite has no row locks; the
+    production profile already holds the write lock (BEGIN IMMEDIATE), other
+    SQLite engines take it here, before the read.
+    """
+    connection = db.connection()
+    if connection.dialect.name != "sqlite":
+        return stmt.with_for_update()
+    if not connection.connection.driver_connection.in_transaction:
+        connection.exec_driver_sql("BEGIN IMMEDIATE")
+    return stmt
+
+
+# Session factories
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+ReadSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=read_engine)
 
 # Base class for models
 Base = declarative_base()
@@ -55,6 +188,62 @@ class Complaint(Base):
     resolution_time = Column(Integer, nullable=True)  # in days
     severity = Column(String(50), default="medium")  # low, medium, high, critical
     customer_satisfaction = Column(Integer, nullable=True)  # 1-5 rating
+    fault_confidence = Column(Float, nullable=True)  # classifier confidence at scoring time
+    severity_confidence = Column(Float, nullable=True)
+    model_version = Column(String(64), nullable=True)  # classifier version that produced the predictions
+    
+    __table_args__ = (
+        # Keyset pagination order (newest first) and date-range scans
+        Index("ix_complaints_created", "created_date", "complaint_id"),
+        # get_complaints filters, each followed by the pagination key
+        Index("ix_complaints_status_created", "status", "created_date", "complaint_id"),
+        Index("ix_complaints_severity_created", "severity", "created_date", "complaint_id"),
+        Index("ix_complaints_product_created", "product_id", "created_date", "complaint_id"),
+        # InsightsEngine group-bys (fault distribution, unresolved alerts, department workload)
+        Index("ix_complaints_fault_status", "predicted_fault_type", "status"),
+        Index("ix_complaints_department", "department", "resolution_time"),
+    )
+
+
+class ComplaintRollup(Base):
+    """
+    Pre-aggregated complaint counters, one row per (dimension, bucket)
+    Maintained incrementally by rollups.py so dashboard reads are O(groups)
+    """
+    __tablename__ = "complaint_rollups"
+    
+    dimension = Column(String(50), primary_key=True)  # product, fault_type, ..., day, day_product, ..., resolution_days
+    bucket = Column(String(255), primary_key=True)
+    complaint_count = Column(Integer, nullable=False, default=0)
+    critical_count = Column(Integer, nullable=False, default=0)
+    high_count = Column(Integer, nullable=False, default=0)
+    resolved_count = Column(Integer, nullable=False, default=0)
+    resolution_time_sum = Column(Integer, nullable=False, default=0)
+    resolution_time_count = Column(Integer, nullable=False, default=0)  # rows with a resolution_time
+    resolution_time_nonzero_count = Column(Integer, nullable=False, default=0)  # rows with resolution_time > 0
+
+
+def migrate_schema(bind=engine):
+    """
+    Bring an existing database up to date with the models
+    create_all() only creates missing tables, so columns and indexes added
+    to existing tables are applied here
+    """
+    with bind.begin() as conn:
+        inspector = inspect(conn)
+        for table in Base.metadata.sorted_tables:
+            if not inspector.has_table(table.name):
+                continue
+            existing = {c["name"] for c in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name not in existing:
+                    column_type = column.type.compile(dialect=bind.dialect)
+                    conn.execute(text(f"ALTER TABLE {table.name} ADD COLUMN {column.name} {column_type}"))
+            
+            existing_indexes = {i["name"] for i in inspector.get_indexes(table.name)}
+            for index in table.indexes:
+                if index.name not in existing_indexes:
+                    index.create(conn)
 
 
 def get_db():
@@ -64,3 +253,12 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+def get_read_db():
+    """Dependency to get a session for read-only queries (read engine when enabled)"""
+    db = ReadSessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
@@ -0,0 +1,173 @@
+"""
+Bulk complaint ingestion
+Validates, classifies and inserts complaint batches (API and nightly imports)
+"""
+import argparse
+import csv
+import json
+import sys
+from datetime import datetime
+from typing import Iterable, List
+
+from pydantic import BaseModel, Field, ValidationError
+from sqlalchemy import insert, select
+from sqlalchemy.orm import Session
+
+from database import Complaint, Product, SessionLocal
+from ai_classifier import classifier, classification_cache
+import rollups
+
+DEFAULT_CHUNK_SIZE = 1000
+
+
+class IngestRow(BaseModel):
+    """One complaint in a batch import"""
+    product_id: int
+    department: str = Field(min_length=1)
+    complaint_text: str = Field(min_length=1)
+
+
+def _validation_message(error: ValidationError) -> str:
+    return "; ".join(
+        f"{'.'.join(str(part) for part in e['loc'])}: {e['msg']}"
+        for e in error.errors()
+    )
+
+
+def _insert_chunk(db: Session, rows: List[dict]) -> List[int]:
+    """Insert rows with one executemany and update rollups; caller commits"""
+    result = db.execute(
+        insert(Complaint).returning(Complaint.complaint_id, sort_by_parameter_order=True),
+        rows
+    )
+    complaint_ids = list(result.scalars())
+    rollups.apply_complaints(db, rows)
+    return complaint_ids
+
+
+def ingest_complaints(db: Session, raw_rows: Iterable[dict], chunk_size: int = DEFAULT_CHUNK_SIZE) -> dict:
+    """
+    Validate, classify and bulk-insert a batch of complaints
+
+    Product ids are checked with a single query and all valid texts are
+    classified in one classify_many call, through the classification cache
+    so repeated texts are classified once, outside any transaction. Inserts
+    run in chunked transactions; a failing chunk is retried row by row so
+    one bad row doesn't abort the rest of the batch.
+
+    Returns:
+        {
+            "received": int,
+            "created": int,
+            "failed": int,
+            "complaint_ids": [int, ...],
+            "errors": [{"index": int, "error": str}, ...]
+        }
+    """
+    raw_rows = list(raw_rows)
+    errors = []
+    valid = []  # (index, IngestRow)
+
+    for index, raw in enumerate(raw_rows):
+        try:
+            valid.append((index, IngestRow.model_validate(raw)))
+        except ValidationError as e:
+            errors.append({"index": index, "error": _validation_message(e)})
+
+    # Validate all product ids with one query
+    product_ids = {row.product_id for _, row in valid}
+    known_products = set(db.scalars(
+        select(Product.product_id).where(Product.product_id.in_(product_ids))
+    )) if product_ids else set()
+    # End that read before classifying: on a writer session (BEGIN IMMEDIATE on
+    # SQLite) it would hold the write lock for the whole classification pass.
+    # Only the insert chunks below take it.
+    db.rollback()
+
+    accepted = []
+    for index, row in valid:
+        if row.product_id in known_products:
+            accepted.append((index, row))
+        else:
+            errors.append({"index": index, "error": f"Product {row.product_id} not found"})
+
+    # Classify the whole batch in one pass
+    classifications = classification_cache.classify_many(classifier, [row.complaint_text for _, row in accepted])
+
+    today = datetime.utcnow().date()
+    pending = [
+        (index, {
+            "product_id": row.product_id,
+            "department": row.department,
+            "complaint_text": row.complaint_text,
+            "created_date": today,
+            "resolved_date": None,
+            "status": "open",
+            "predicted_fault_type": classification["fault_type"],
+            "resolution_time": None,
+            "severity": classification["severity"],
+            "fault_confidence": classification["fault_confidence"],
+            "severity_confidence": classification["severity_confidence"],
+            "model_version": classification["model_version"]
+        })
+        for (index, row), classification in zip(accepted, classifications)
+    ]
+
+    created_ids = []
+    for start in range(0, len(pending), chunk_size):
+        chunk = pending[start:start + chunk_size]
+        try:
+            created_ids.extend(_insert_chunk(db, [row for _, row in chunk]))
+            db.commit()
+        except Exception:
+            db.rollback()
+            # Isolate the failing rows
+            for index, row in chunk:
+                try:
+                    created_ids.extend(_insert_chunk(db, [row]))
+                    db.commit()
+                except Exception as e:
+                    db.rollback()
+                    errors.append({"index": index, "error": str(e).splitlines()[0]})
+
+    errors.sort(key=lambda e: e["index"])
+    return {
+        "received": len(raw_rows),
+        "created": len(created_ids),
+        "failed": len(errors),
+        "complaint_ids": created_ids,
+        "errors": errors
+    }
+
+
+def read_rows(path: str) -> List[dict]:
+    """Read complaints from a CSV file (with a header row) or JSON Lines file"""
+    if path.endswith((".jsonl", ".ndjson")):
+        with open(path, encoding="utf-8") as f:
+            return [json.loads(line) for line in f if line.strip()]
+    with open(path, newline="", encoding="utf-8") as f:
+        return list(csv.DictReader(f))
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Bulk-import complaints from a CSV or JSON Lines export")
+    parser.add_argument("path", help="CSV (product_id,department,complaint_text) or .jsonl file")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE)
+    args = parser.parse_args(argv)
+
+    db = SessionLocal()
+    try:
+        result = ingest_complaints(db, read_rows(args.path), chunk_size=args.chunk_size)
+    finally:
+        db.close()
+
+    print(f"✓ Imported {result['created']} of {result['received']} complaints")
+    for error in result["errors"][:20]:
+        print(f"  row {error['index']}: {error['error']}")
+    if result["failed"] > 20:
+        print(f"  ... and {result['failed'] - 20} more errors")
+    return 0 if not result["failed"] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,93 +1,101 @@
 """
 Database initialization with sample data
+
+Usage:
+    python init_db.py init   # create/migrate tables and repair rollups only
+    python init_db.py seed   # init, then add sample data to an empty database (default)
+    python init_db.py seed --complaints 1000000 --products 40 --days 730 --skew 1.2
 """
-from database import Base, engine, SessionLocal, Product, FaultCategory, Complaint
-from datetime import datetime, timedelta
-import random
+from database import Base, engine, SessionLocal, Product, migrate_schema
+from rollups import rebuild_rollups, rollups_missing
+import search
+from seed_data import seed_complaints, PRODUCTS, FAULT_CATEGORIES, DEFAULT_CHUNK_SIZE
+from datetime import date
+import argparse
+import sys
+
 
-def init_database():
-    """Create all tables and populate with sample data"""
+def create_schema():
+    """Create missing tables, apply column/index migrations and repair rollups"""
     Base.metadata.create_all(bind=engine)
+    migrate_schema(engine)
     print("✓ Database tables created")
+    if search.create_search_index(engine):
+        print("✓ Built full-text search index")
     
     db = SessionLocal()
-    
-    # Check if data already exists
-    if db.query(Product).count() > 0:
-        print("✓ Database already populated")
+    try:
+        if rollups_missing(db):
+            print(f"✓ Built {rebuild_rollups(db)} analytics rollup rows")
+    finally:
+        db.close()
+
+
+def init_database(seed: bool = True):
+    """Create all tables and, if seed is set, populate an empty database with sample data"""
+    create_schema()
+    if seed:
+        seed_database()
+
+
+def seed_database(n_complaints: int = 150, **options):
+    """
+    Populate an empty database with sample products, fault categories and
+    complaints (see seed_data.seed_complaints for options)
+    """
+    db = SessionLocal()
+    try:
+        # Check if data already exists
+        if db.query(Product).count() > 0:
+            print("✓ Database already populated")
+            return
+        
+        result = seed_complaints(
+            db, n_complaints,
+            progress=_print_progress if n_complaints >= 100_000 else None,
+            **options
+        )
+    finally:
         db.close()
-        return
-    
-    # ==================== Products ====================
-    products = [
-        Product(product_name="EarBud Pro X", category="earbuds"),
-        Product(product_name="EarBud Lite", category="earbuds"),
-        Product(product_name="Headphone Max", category="headphones"),
-        Product(product_name="Headphone Studio", category="headphones"),
-        Product(product_name="Speaker Boom", category="speakers"),
-        Product(product_name="Speaker Mini", category="speakers"),
-        Product(product_name="Watch Ultra", category="smartwatches"),
-        Product(product_name="Watch Fit", category="smartwatches"),
-    ]
-    db.add_all(products)
-    db.flush()
-    print(f"✓ Added {len(products)} products")
-    
-    # ==================== Fault Categories ====================
-    fault_categories = [
-        FaultCategory(fault_name="Battery Issue", description="Battery drains quickly or won't charge"),
-        FaultCategory(fault_name="Audio Quality", description="Poor sound output, distortion, or imbalance"),
-        FaultCategory(fault_name="Connectivity", description="Bluetooth pairing or connection issues"),
-        FaultCategory(fault_name="Physical Damage", description="Cracked casing, water damage, or breakage"),
-        FaultCategory(fault_name="Software Bug", description="App crashes, freezing, or unresponsive"),
-        FaultCategory(fault_name="Firmware Update", description="Issues after firmware update"),
-        FaultCategory(fault_name="Warranty/Return", description="Warranty claims and return requests"),
-        FaultCategory(fault_name="Performance", description="Reduced performance or speed"),
-    ]
-    db.add_all(fault_categories)
-    db.flush()
-    print(f"✓ Added {len(fault_categories)} fault categories")
-    
-    # ==================== Complaints (Sample Data) ====================
-    complaint_texts = [
-        "Battery dies after 2 hours of use. Not acceptable for the price.",
-        "Left earbud stopped working completely. No sound at all.",
-        "Bluetooth keeps disconnecting every few minutes.",
-        "Audio is extremely distorted and crackles at high volume.",
-        "Device won't charge even when plugged in for hours.",
-        "App crashes whenever I try to adjust settings.",
-        "Water damage after accidental splash, speaker doesn't work.",
-        "After the latest firmware update, the device won't turn on.",
-        "One speaker is significantly quieter than the other.",
-        "Device randomly restarts without warning.",
-    ]
     
-    departments = ["support", "quality", "sales", "returns", "technical"]
-    statuses = ["open", "in_progress", "resolved", "escalated"]
-    severities = ["low", "medium", "high", "critical"]
+    print(f"✓ Added {result['products']} products")
+    print(f"✓ Added {len(FAULT_CATEGORIES)} fault categories")
+    print(f"✓ Added {result['complaints']} sample complaints")
+    print(f"✓ Built {result['rollup_rows']} analytics rollup rows")
+    print(f"\n✓ Database initialized successfully! ({result['seconds']}s)")
+
+
+def _print_progress(inserted: int):
+    print(f"  ... {inserted:,} complaints", flush=True)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Create the Resolve database schema and sample data")
+    parser.add_argument("command", nargs="?", choices=["init", "seed"], default="seed")
+    parser.add_argument("--complaints", type=int, default=150, help="number of complaints to generate")
+    parser.add_argument("--products", type=int, default=len(PRODUCTS))
+    parser.add_argument("--days", type=int, default=90, help="created_date span ending at --end-date")
+    parser.add_argument("--skew", type=float, default=1.0, help="Zipf exponent of product popularity (0 = uniform)")
+    parser.add_argument("--variety", type=float, default=0.5, help="0-1, amount of varied detail in complaint texts")
+    parser.add_argument("--random-seed", type=int, default=42, help="same seed and options give the same data")
+    parser.add_argument("--end-date", type=date.fromisoformat, default=None, help="YYYY-MM-DD (default: today)")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE)
+    args = parser.parse_args(argv)
     
-    complaints = []
-    for i in range(150):
-        complaint = Complaint(
-            product_id=random.randint(1, 8),
-            department=random.choice(departments),
-            complaint_text=random.choice(complaint_texts),
-            created_date=datetime.utcnow().date() - timedelta(days=random.randint(0, 90)),
-            resolved_date=datetime.utcnow().date() - timedelta(days=random.randint(0, 60)) if random.random() > 0.3 else None,
-            status=random.choice(statuses),
-            predicted_fault_type=random.choice([f.fault_name for f in fault_categories]),
-            resolution_time=random.randint(1, 30) if random.random() > 0.3 else None,
-            severity=random.choice(severities),
-            customer_satisfaction=random.choice([1, 2, 3, 4, 5, None])
+    create_schema()
+    if args.command == "seed":
+        seed_database(
+            args.complaints,
+            n_products=args.products,
+            days=args.days,
+            product_skew=args.skew,
+            text_variety=args.variety,
+            seed=args.random_seed,
+            end_date=args.end_date,
+            chunk_size=args.chunk_size
         )
-        complaints.append(complaint)
-    
-    db.add_all(complaints)
-    db.commit()
-    print(f"✓ Added {len(complaints)} sample complaints")
-    db.close()
-    print("\n✓ Database initialized successfully!")
+    return 0
 
 
 if __name__ == "__main__":
-    init_database()
+    sys.exit(main())
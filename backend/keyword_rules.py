@@ -0,0 +1,72 @@
+"""
+Rule-based complaint classification
+Keyword rules are loaded from a JSON config and compiled once into a matcher
+used by ComplaintClassifier before a model is trained
+"""
+import hashlib
+import json
+import os
+from typing import List, Tuple
+
+DEFAULT_RULES_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "classifier_rules.json")
+RULES_PATH = os.getenv("CLASSIFIER_RULES_PATH", DEFAULT_RULES_PATH)
+
+
+def _compile(rules: list) -> Tuple[Tuple[str, Tuple[str, ...]], ...]:
+    """(label, keywords) pairs in priority order, keywords lowercased and de-duplicated"""
+    compiled = []
+    for rule in rules:
+        keywords = tuple(dict.fromkeys(k.lower() for k in rule["keywords"] if k))
+        compiled.append((rule["label"], keywords))
+    return tuple(compiled)
+
+
+def _first_match(rules, text_lower: str, default: str) -> str:
+    # Substring tests run in C and beat a per-character automaton in CPython,
+    # so the "compilation" is flattening the rules into tuples scanned in order
+    for label, keywords in rules:
+        for keyword in keywords:
+            if keyword in text_lower:
+                return label
+    return default
+
+
+class KeywordMatcher:
+    """
+    Compiled keyword rules for fault type and severity
+
+    Rules are checked in config order and the first rule with any keyword
+    contained in the (lowercased) text wins; otherwise the default label is
+    returned. The text is lowercased once for both heads.
+    """
+
+    def __init__(self, config: dict):
+        self.fault_rules = _compile(config["fault_rules"])
+        self.default_fault = config["default_fault"]
+        self.severity_rules = _compile(config["severity_rules"])
+        self.default_severity = config["default_severity"]
+        self.version = "rules-" + hashlib.sha256(repr((
+            self.fault_rules, self.default_fault, self.severity_rules, self.default_severity
+        )).encode()).hexdigest()[:8]
+
+    @classmethod
+    def from_file(cls, path: str = RULES_PATH) -> "KeywordMatcher":
+        with open(path, encoding="utf-8") as f:
+            return cls(json.load(f))
+
+    def fault_type(self, text: str) -> str:
+        return _first_match(self.fault_rules, text.lower(), self.default_fault)
+
+    def severity(self, text: str) -> str:
+        return _first_match(self.severity_rules, text.lower(), self.default_severity)
+
+    def classify(self, text: str) -> Tuple[str, str]:
+        """(fault_type, severity) for one text"""
+        text_lower = text.lower()
+        return (
+            _first_match(self.fault_rules, text_lower, self.default_fault),
+            _first_match(self.severity_rules, text_lower, self.default_severity)
+        )
+
+    def classify_many(self, texts: List[str]) -> List[Tuple[str, str]]:
+        return [self.classify(text) for text in texts]
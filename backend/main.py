@@ -2,26 +2,97 @@
 Resolve - AI-Powered Complaint Intelligence Platform
 FastAPI Backend
 """
-from fastapi import FastAPI, Depends, HTTPException, Query
+from fastapi import FastAPI, Depends, HTTPException, Query, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import PlainTextResponse, StreamingResponse
+from sqlalchemy import tuple_
 from sqlalchemy.orm import Session
 from pydantic import BaseModel
-from typing import Optional, List
+from typing import Optional, List, Dict, Any
+from contextlib import asynccontextmanager
 from datetime import datetime, date
-
-from database import get_db, Complaint, Product, FaultCategory, SessionLocal
-from ai_classifier import classify_complaint
-from predictive_insights import insights_engine, get_dashboard_summary
+import asyncio
+import base64
+import hashlib
+import json
+import os
+import sys
+import time
+
+from database import (
+    get_db, get_read_db, Complaint, Product, FaultCategory, SessionLocal, ReadSessionLocal,
+    engine, read_engine, for_update
+)
+from ai_classifier import classifier, classification_cache, inference_service, warmup
+from predictive_insights import (
+    rollup_insights, get_dashboard_summary, trend_range, trend_bucket_count, MAX_TREND_DAYS, MAX_TREND_BUCKETS
+)
 from init_db import init_database
+import rollups
+from ingest import ingest_complaints, DEFAULT_CHUNK_SIZE
+from rescore import start_background_rescore
+from retrain import retrainer
+import export
+import search
+from cache import result_cache
+from analytics_stream import broadcaster
+from anomalies import anomaly_detector
+import clustering
+from clustering import complaint_clusters
+import columnar
+from columnar import analytics_insights, complaint_snapshot
+import metrics
+
+# ==================== Startup ====================
+# Startup settings, overridable via environment
+#   DB_AUTO_INIT: seed (create schema, add sample data if empty), schema, or none
+#   (multi-worker deployments: run `python init_db.py seed` once and use none)
+DB_AUTO_INIT = os.getenv("DB_AUTO_INIT", "seed")
+# Load the classifier model and run a first prediction before serving
+CLASSIFIER_WARMUP = os.getenv("CLASSIFIER_WARMUP", "0") == "1"
+
+
+def _report_failure(task: asyncio.Task):
+    """Done callback for background startup work: print why it failed instead of losing the error"""
+    if not task.cancelled() and task.exception() is not None:
+        print(f"✗ {task.get_name()} failed: {task.exception()!r}", file=sys.stderr)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Initialize the database and inference service per worker, not at import"""
+    if DB_AUTO_INIT in ("schema", "seed"):
+        await run_in_threadpool(init_database, DB_AUTO_INIT == "seed")
+    if CLASSIFIER_WARMUP:
+        await run_in_threadpool(warmup)
+    await inference_service.start()
+    if clustering.CLUSTERING:
+        # Catching up a large database takes a while; serve meanwhile
+        cluster_loader = asyncio.create_task(run_in_threadpool(complaint_clusters.open, ReadSessionLocal))
+    if columnar.ANALYTICS_SNAPSHOT:
+        # A failed build is reported and retried by the first analytics read
+        snapshot_loader = asyncio.create_task(
+            run_in_threadpool(complaint_snapshot.open, ReadSessionLocal), name="Analytics snapshot build"
+        )
+        snapshot_loader.add_done_callback(_report_failure)
+    yield
+    await inference_service.stop()
+    if columnar.ANALYTICS_SNAPSHOT:
+        # The build runs in a worker thread and can't be cancelled; let it finish
+        await asyncio.wait([snapshot_loader])
+    if clustering.CLUSTERING:
+        await cluster_loader
+        if complaint_clusters.ready:
+            await run_in_threadpool(complaint_clusters.save)
 
-# ==================== Initialize Database ====================
-init_database()
 
 # ==================== FastAPI App ====================
 app = FastAPI(
     title="Resolve - Complaint Intelligence Platform",
     description="AI-powered analytics for consumer electronics complaints",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 # CORS middleware
@@ -31,8 +102,152 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "ETag"],
 )
 
+# GET endpoints whose JSON bodies carry an ETag for conditional requests
+ETAG_PREFIXES = ("/api/analytics/", "/api/stats/")
+ETAG_EXCLUDED = {"/api/analytics/stream"}
+
+
+@app.middleware("http")
+async def conditional_get(request: Request, call_next):
+    """
+    Add a content ETag to analytics responses and answer If-None-Match with
+    304, so polling clients only download bodies that changed
+    """
+    response = await call_next(request)
+    path = request.url.path
+    if (
+        request.method != "GET"
+        or response.status_code != 200
+        or not path.startswith(ETAG_PREFIXES)
+        or path in ETAG_EXCLUDED
+    ):
+        return response
+    
+    body = b"".join([chunk async for chunk in response.body_iterator])
+    etag = f'"{hashlib.sha1(body).hexdigest()}"'
+    headers = {k: v for k, v in response.headers.items() if k.lower() != "content-length"}
+    headers["ETag"] = etag
+    headers["Cache-Control"] = "no-cache"  # always revalidate
+    
+    if_none_match = request.headers.get("if-none-match", "")
+    if etag in (tag.strip() for tag in if_none_match.split(",")) or if_none_match.strip() == "*":
+        return Response(status_code=304, headers={"ETag": etag, "Cache-Control": "no-cache"})
+    return Response(content=body, status_code=response.status_code, headers=headers)
+
+
+# ==================== Metrics ====================
+
+metrics.instrument_engine(engine, "write")
+if read_engine is not engine:
+    metrics.instrument_engine(read_engine, "read")
+metrics.registry.add_collector(metrics.pool_collector({"write": engine, "read": read_engine}))
+metrics.registry.add_collector(metrics.stats_collector(
+    "resolve_analytics_cache", result_cache.stats,
+    counters={
+        "hits_total": ("hits", "Analytics cache hits"),
+        "misses_total": ("misses", "Analytics cache misses"),
+        "evictions_total": ("evictions", "Analytics cache LRU evictions"),
+        "invalidations_total": ("invalidations", "Analytics cache invalidations (complaint writes)"),
+    },
+    gauges={"entries": ("size", "Analytics cache entries")}
+))
+metrics.registry.add_collector(metrics.stats_collector(
+    "resolve_inference", inference_service.stats,
+    counters={
+        "requests_total": ("requests", "Classification requests"),
+        "batches_total": ("batches", "Classifier batches run"),
+        "seconds_total": ("inference_seconds_total", "Time spent in classifier batches"),
+        "pool_restarts_total": ("pool_restarts", "Worker pools replaced after a worker process died"),
+    },
+    gauges={
+        "queue_depth": ("queue_depth", "Classification requests waiting for a batch"),
+        "batches_in_flight": ("batches_in_flight", "Classifier batches running"),
+    }
+))
+metrics.registry.add_collector(metrics.stats_collector(
+    "resolve_classification_cache", classification_cache.stats,
+    counters={
+        "hits_total": ("hits", "Classifications served from the in-memory cache"),
+        "disk_hits_total": ("disk_hits", "Classifications served from the on-disk cache table"),
+        "misses_total": ("misses", "Classification cache misses"),
+        "evictions_total": ("evictions", "Classification cache LRU evictions"),
+        "invalidations_total": ("invalidations", "Classification cache resets on a model change"),
+    },
+    gauges={
+        "entries": ("size", "Classification cache entries"),
+        "hit_rate": ("hit_rate", "Share of classification lookups served from the cache"),
+    }
+))
+metrics.registry.add_collector(metrics.stats_collector(
+    "resolve_analytics_stream", broadcaster.stats,
+    counters={
+        "recomputes_total": ("recomputes", "Dashboard state recomputations"),
+        "external_changes_total": ("external_changes", "Writes by other processes found by the change check"),
+    },
+    gauges={"subscribers": ("subscribers", "Connected live dashboard clients")}
+))
+metrics.registry.add_collector(metrics.stats_collector(
+    "resolve_clusters", complaint_clusters.stats,
+    counters={
+        "lookups_total": ("lookups", "Cluster lookups for new complaints"),
+        "reused_total": ("reused", "Classifications reused from a matching cluster"),
+    },
+    gauges={
+        "clusters": ("clusters", "Near-duplicate clusters"),
+        "indexed": ("indexed", "Complaints in the cluster index"),
+    }
+))
+metrics.registry.add_collector(metrics.stats_collector(
+    "resolve_anomalies", anomaly_detector.stats,
+    counters={"evaluations_total": ("evaluations", "Anomaly detector evaluations")},
+    gauges={"flagged": ("flagged", "Product/fault combinations currently flagged")}
+))
+metrics.registry.add_collector(metrics.stats_collector(
+    "resolve_analytics_snapshot", complaint_snapshot.stats,
+    counters={
+        "rebuilds_total": ("rebuilds", "Full rebuilds of the columnar complaint snapshot"),
+        "refreshes_total": ("refreshes", "Incremental high-water refreshes of the snapshot"),
+        "rows_appended_total": ("rows_appended", "Complaints appended to the snapshot incrementally"),
+        "rows_updated_total": ("rows_updated", "Complaint updates patched into the snapshot"),
+    },
+    gauges={
+        "rows": ("rows", "Complaints in the columnar snapshot"),
+        "memory_bytes": ("memory_bytes", "Memory held by the snapshot arrays"),
+    }
+))
+metrics.registry.add_collector(metrics.stats_collector(
+    "resolve_retrain", retrainer.stats,
+    counters={
+        "runs_total": ("runs", "Classifier retraining runs"),
+        "rows_total": ("rows_total", "Complaints fed to the classifier by retraining"),
+        "seconds_total": ("seconds_total", "Time spent retraining the classifier"),
+    },
+    gauges={"rows_per_second": ("rows_per_second", "Average retraining throughput")}
+))
+
+
+@app.middleware("http")
+async def record_metrics(request: Request, call_next):
+    """Per-route latency and SQL activity; logs slow requests with their SQL"""
+    stats, token = metrics.start_request(capture_statements=bool(metrics.SLOW_REQUEST_MS))
+    start = time.perf_counter()
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+        return response
+    finally:
+        elapsed = time.perf_counter() - start
+        metrics.end_request(token)
+        route = request.scope.get("route")
+        metrics.record_request(
+            request.method, route.path if route is not None else "<unmatched>", status, elapsed, stats
+        )
+
+
 # ==================== Pydantic Models ====================
 
 class ProductSchema(BaseModel):
@@ -77,9 +292,19 @@ class ComplaintResponse(BaseModel):
         from_attributes = True
 
 
+class ComplaintSearchResult(ComplaintResponse):
+    score: float
+    snippet: str
+
+
 class ComplaintDetailResponse(ComplaintResponse):
     fault_confidence: Optional[float] = None
     severity_confidence: Optional[float] = None
+    model_version: Optional[str] = None
+    
+    class Config:
+        from_attributes = True
+        protected_namespaces = ()
 
 
 # ==================== Health Check ====================
@@ -100,7 +325,6 @@ def health_check():
     db = SessionLocal()
     try:
         db.query(Complaint).limit(1).all()
-        db.close()
         return {
             "status": "healthy",
             "database": "connected",
@@ -111,18 +335,30 @@ def health_check():
             "status": "unhealthy",
             "error": str(e)
         }
+    finally:
+        db.close()
+
+
+@app.get("/metrics", tags=["Health"], response_class=PlainTextResponse)
+def get_metrics():
+    """
+    Prometheus metrics: per-route latency and SQL statement histograms,
+    SQL statement latency, classifier inference time, connection pool
+    occupancy, analytics cache and inference service counters
+    """
+    return PlainTextResponse(metrics.registry.render(), media_type="text/plain; version=0.0.4")
 
 
 # ==================== Products Endpoints ====================
 
 @app.get("/api/products", tags=["Products"], response_model=List[ProductSchema])
-def get_products(db: Session = Depends(get_db)):
+def get_products(db: Session = Depends(get_read_db)):
     """Get all products"""
     return db.query(Product).all()
 
 
 @app.get("/api/products/{product_id}", tags=["Products"], response_model=ProductSchema)
-def get_product(product_id: int, db: Session = Depends(get_db)):
+def get_product(product_id: int, db: Session = Depends(get_read_db)):
     """Get specific product"""
     product = db.query(Product).filter(Product.product_id == product_id).first()
     if not product:
@@ -133,28 +369,24 @@ def get_product(product_id: int, db: Session = Depends(get_db)):
 # ==================== Fault Categories Endpoints ====================
 
 @app.get("/api/fault-categories", tags=["Faults"], response_model=List[FaultCategorySchema])
-def get_fault_categories(db: Session = Depends(get_db)):
+def get_fault_categories(db: Session = Depends(get_read_db)):
     """Get all fault categories"""
     return db.query(FaultCategory).all()
 
 
 # ==================== Complaints Endpoints ====================
 
-@app.post("/api/complaints", tags=["Complaints"], response_model=ComplaintDetailResponse)
-def create_complaint(complaint: ComplaintCreate, db: Session = Depends(get_db)):
-    """
-    Create a new complaint with AI classification
-    
-    The complaint will be automatically classified for fault type and severity
-    """
-    # Verify product exists
-    product = db.query(Product).filter(Product.product_id == complaint.product_id).first()
+def _require_product(db: Session, product_id: int):
+    """404 unless the product exists (runs in the threadpool, on a read session)"""
+    product = db.query(Product).filter(Product.product_id == product_id).first()
+    # End the read transaction before the caller awaits inference
+    db.rollback()
     if not product:
         raise HTTPException(status_code=404, detail="Product not found")
-    
-    # AI Classification
-    classification = classify_complaint(complaint.complaint_text)
-    
+
+
+def _save_complaint(db: Session, complaint: ComplaintCreate, classification: dict) -> Complaint:
+    """Store a classified complaint (runs in the threadpool)"""
     # Create complaint record
     db_complaint = Complaint(
         product_id=complaint.product_id,
@@ -163,66 +395,250 @@ def create_complaint(complaint: ComplaintCreate, db: Session = Depends(get_db)):
         created_date=datetime.utcnow().date(),
         status="open",
         predicted_fault_type=classification["fault_type"],
-        severity=classification["severity"]
+        severity=classification["severity"],
+        fault_confidence=classification["fault_confidence"],
+        severity_confidence=classification["severity_confidence"],
+        model_version=classification["model_version"]
     )
     
     db.add(db_complaint)
+    db.flush()
+    rollups.apply_complaints(db, [db_complaint])
     db.commit()
+    result_cache.bump_version()
     db.refresh(db_complaint)
     
-    return {
-        **ComplaintResponse.from_orm(db_complaint).dict(),
-        "fault_confidence": classification["fault_confidence"],
-        "severity_confidence": classification["severity_confidence"]
-    }
+    return db_complaint
+
+
+@app.post("/api/complaints", tags=["Complaints"], response_model=ComplaintDetailResponse)
+async def create_complaint(
+    complaint: ComplaintCreate,
+    db: Session = Depends(get_db),
+    read_db: Session = Depends(get_read_db)
+):
+    """
+    Create a new complaint with AI classification
+    
+    The complaint will be automatically classified for fault type and severity
+    """
+    # Verify the product before spending inference capacity on the complaint.
+    # On the read session: a writer transaction (BEGIN IMMEDIATE on SQLite)
+    # would hold the write lock across inference and serialize creates.
+    await run_in_threadpool(_require_product, read_db, complaint.product_id)
+    
+    # Near-copies of earlier complaints reuse their cluster's classification
+    match, classification = None, None
+    if clustering.CLUSTERING:
+        # MinHash of the text is CPU work; keep it off the event loop
+        match = await run_in_threadpool(complaint_clusters.lookup, complaint.complaint_text)
+        # A model still waiting for its lazy load reports the rules version;
+        # reusing a rule-based label then would bypass the trained model
+        if inference_service.model.pending_path is None:
+            classification = complaint_clusters.reusable_classification(match, inference_service.model.model_version)
+    
+    # AI Classification, micro-batched with concurrent requests by the inference service
+    if not classification:
+        classification = await inference_service.classify(complaint.complaint_text)
+    
+    # Database access is synchronous; keep it off the event loop
+    saved = await run_in_threadpool(_save_complaint, db, complaint, classification)
+    if match:
+        complaint_clusters.add(match, saved.complaint_id, saved.created_date, saved.complaint_text, classification)
+    return saved
+
+
+class BatchIngestError(BaseModel):
+    index: int
+    error: str
+
+
+class BatchIngestResponse(BaseModel):
+    received: int
+    created: int
+    failed: int
+    complaint_ids: List[int]
+    errors: List[BatchIngestError]
+
+
+@app.post("/api/complaints/batch", tags=["Complaints"], response_model=BatchIngestResponse)
+def create_complaints_batch(
+    complaints: List[Dict[str, Any]],
+    db: Session = Depends(get_db),
+    chunk_size: int = Query(DEFAULT_CHUNK_SIZE, ge=1, le=10000)
+):
+    """
+    Create many complaints at once with AI classification
+    
+    Rows are validated individually; invalid rows are reported in `errors`
+    (by position in the request) without aborting the rest of the batch.
+    """
+    result = ingest_complaints(db, complaints, chunk_size=chunk_size)
+    if result["created"]:
+        result_cache.bump_version()
+        if clustering.CLUSTERING and complaint_clusters.ready:
+            complaint_clusters.catch_up(db)
+    return result
+
+
+def _encode_cursor(complaint: Complaint) -> str:
+    """Opaque keyset cursor for the row after which the next page starts"""
+    payload = json.dumps({"d": complaint.created_date.isoformat(), "id": complaint.complaint_id})
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def _decode_cursor(cursor: str) -> tuple:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        return date.fromisoformat(payload["d"]), int(payload["id"])
+    except (ValueError, KeyError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def _filter_complaints(query, product_id: Optional[int], status: Optional[str], severity: Optional[str]):
+    if product_id:
+        query = query.filter(Complaint.product_id == product_id)
+    if status:
+        query = query.filter(Complaint.status == status)
+    if severity:
+        query = query.filter(Complaint.severity == severity)
+    return query
 
 
 @app.get("/api/complaints", tags=["Complaints"], response_model=List[ComplaintResponse])
 def get_complaints(
-    db: Session = Depends(get_db),
+    response: Response,
+    db: Session = Depends(get_read_db),
     product_id: Optional[int] = Query(None),
     status: Optional[str] = Query(None),
     severity: Optional[str] = Query(None),
     limit: int = Query(50, le=100),
-    skip: int = Query(0)
+    skip: int = Query(0),
+    cursor: Optional[str] = Query(None)
 ):
     """
-    Get complaints with optional filters
+    Get complaints with optional filters, newest first
     
     Query parameters:
     - product_id: Filter by product
     - status: Filter by status (open, in_progress, resolved, escalated)
     - severity: Filter by severity (low, medium, high, critical)
     - limit: Maximum number of results (default: 50, max: 100)
-    - skip: Number of results to skip (pagination)
+    - cursor: Opaque cursor from the X-Next-Cursor header of the previous page
+    - skip: Number of results to skip (offset pagination; prefer cursor)
+    
+    When more results exist, the X-Next-Cursor response header holds the
+    cursor for the next page.
     """
-    query = db.query(Complaint)
+    if cursor and skip:
+        raise HTTPException(status_code=400, detail="Use either cursor or skip, not both")
     
-    if product_id:
-        query = query.filter(Complaint.product_id == product_id)
-    if status:
-        query = query.filter(Complaint.status == status)
-    if severity:
-        query = query.filter(Complaint.severity == severity)
+    query = _filter_complaints(db.query(Complaint), product_id, status, severity)
     
-    return query.offset(skip).limit(limit).all()
+    if cursor:
+        created_date, complaint_id = _decode_cursor(cursor)
+        query = query.filter(
+            tuple_(Complaint.created_date, Complaint.complaint_id) < (created_date, complaint_id)
+        )
+    
+    query = query.order_by(Complaint.created_date.desc(), Complaint.complaint_id.desc())
+    if skip:
+        query = query.offset(skip)
+    
+    complaints = query.limit(limit + 1).all()
+    if len(complaints) > limit:
+        complaints = complaints[:limit]
+        response.headers["X-Next-Cursor"] = _encode_cursor(complaints[-1])
+    return complaints
+
+
+@app.get("/api/complaints/search", tags=["Complaints"], response_model=List[ComplaintSearchResult])
+def search_complaints(
+    db: Session = Depends(get_read_db),
+    q: str = Query(..., min_length=1, max_length=500),
+    product_id: Optional[int] = Query(None),
+    status: Optional[str] = Query(None),
+    severity: Optional[str] = Query(None),
+    sort: str = Query("relevance", pattern="^(relevance|newest)$"),
+    limit: int = Query(20, ge=1, le=100),
+    skip: int = Query(0, ge=0)
+):
+    """
+    Full-text search over complaint text, most relevant first (BM25) or newest first
+    
+    - words must all appear: `left earbud`
+    - quotes match a phrase: `"left earbud"`
+    - a trailing `*` matches a prefix: `firmw*`
+    - `OR` / `NOT` combine terms: `battery OR charging`
+    
+    product_id, status and severity filter within the same query. `snippet`
+    shows the best-matching passage with matches in [brackets]. Ranking
+    scores every match; for very common terms `sort=newest` is much cheaper.
+    """
+    try:
+        query = _filter_complaints(search.search_query(db, q, sort), product_id, status, severity)
+    except search.SearchUnavailable as e:
+        raise HTTPException(status_code=501, detail=str(e))
+    except search.InvalidSearchQuery as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    results = query.offset(skip).limit(limit).all()
+    highlighted = search.snippets(db, q, [complaint.complaint_id for complaint, _ in results])
+    return [
+        ComplaintSearchResult(
+            **ComplaintResponse.model_validate(complaint).model_dump(),
+            score=round(score, 4),
+            snippet=highlighted.get(complaint.complaint_id, "")
+        )
+        for complaint, score in results
+    ]
+
+
+@app.get("/api/complaints/export", tags=["Complaints"])
+def export_complaints(
+    format: str = Query("ndjson", pattern="^(ndjson|csv)$"),
+    product_id: Optional[int] = Query(None),
+    status: Optional[str] = Query(None),
+    severity: Optional[str] = Query(None),
+    created_from: Optional[date] = Query(None),
+    created_to: Optional[date] = Query(None)
+):
+    """
+    Stream every matching complaint as NDJSON or CSV, in complaint_id order
+    
+    Accepts the same filters as GET /api/complaints plus an inclusive
+    created_date range. Rows are streamed from a server-side cursor, so
+    exports of any size use constant memory.
+    """
+    if created_from and created_to and created_from > created_to:
+        raise HTTPException(status_code=400, detail="created_from must not be after created_to")
+    
+    stmt = _filter_complaints(export.export_select(), product_id, status, severity)
+    if created_from:
+        stmt = stmt.filter(Complaint.created_date >= created_from)
+    if created_to:
+        stmt = stmt.filter(Complaint.created_date <= created_to)
+    
+    return StreamingResponse(
+        export.stream_complaints(ReadSessionLocal, stmt, format),
+        media_type=export.MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="complaints.{format}"'}
+    )
 
 
 @app.get("/api/complaints/{complaint_id}", tags=["Complaints"], response_model=ComplaintDetailResponse)
-def get_complaint(complaint_id: int, db: Session = Depends(get_db)):
-    """Get a specific complaint with AI confidence scores"""
+def get_complaint(complaint_id: int, db: Session = Depends(get_read_db)):
+    """
+    Get a specific complaint with AI confidence scores
+    
+    Confidences are the ones stored when the complaint was (re)scored;
+    model_version identifies the classifier that produced them.
+    """
     complaint = db.query(Complaint).filter(Complaint.complaint_id == complaint_id).first()
     if not complaint:
         raise HTTPException(status_code=404, detail="Complaint not found")
-    
-    # Re-classify to get confidence scores
-    classification = classify_complaint(complaint.complaint_text)
-    
-    return {
-        **ComplaintResponse.from_orm(complaint).dict(),
-        "fault_confidence": classification["fault_confidence"],
-        "severity_confidence": classification["severity_confidence"]
-    }
+    return complaint
 
 
 class ComplaintUpdate(BaseModel):
@@ -238,10 +654,13 @@ def update_complaint(
     db: Session = Depends(get_db)
 ):
     """Update complaint status and resolution"""
-    complaint = db.query(Complaint).filter(Complaint.complaint_id == complaint_id).first()
+    # Locked until commit: the rollup delta is computed from this read
+    complaint = for_update(db, db.query(Complaint).filter(Complaint.complaint_id == complaint_id)).first()
     if not complaint:
         raise HTTPException(status_code=404, detail="Complaint not found")
     
+    before = rollups.snapshot(complaint)
+    
     if update.status:
         complaint.status = update.status
     if update.resolved_date:
@@ -252,15 +671,18 @@ def update_complaint(
     if update.customer_satisfaction:
         complaint.customer_satisfaction = update.customer_satisfaction
     
+    rollups.record_change(db, before, complaint)
     db.commit()
+    result_cache.bump_version()
     db.refresh(complaint)
+    complaint_snapshot.update(complaint)
     return complaint
 
 
 # ==================== Analytics Endpoints ====================
 
 @app.get("/api/analytics/dashboard", tags=["Analytics"])
-def get_dashboard(db: Session = Depends(get_db)):
+def get_dashboard(db: Session = Depends(get_read_db)):
     """
     Get comprehensive dashboard summary with all key metrics
     
@@ -277,68 +699,219 @@ def get_dashboard(db: Session = Depends(get_db)):
 
 @app.get("/api/analytics/trends", tags=["Analytics"])
 def get_trends(
-    db: Session = Depends(get_db),
-    days: int = Query(30, ge=1, le=365)
+    db: Session = Depends(get_read_db),
+    days: int = Query(30, ge=1, le=MAX_TREND_DAYS),
+    granularity: str = Query("day", pattern="^(day|week|month)$"),
+    split_by: Optional[str] = Query(None, pattern="^(product|fault_type|severity)$"),
+    start: Optional[date] = Query(None, description="First day (inclusive); defaults to `days` before end"),
+    end: Optional[date] = Query(None, description="Last day (inclusive); defaults to today")
 ):
-    """Get complaint trends over the specified period"""
-    return insights_engine.get_complaint_trend(db, days)
+    """
+    Get complaint trends over the specified period, bucketed by day, week or month
+    
+    Empty buckets are returned as zeros. With split_by, `series` holds one
+    count list per product, fault type or severity, aligned with `data`.
+    """
+    if start and end and start > end:
+        raise HTTPException(status_code=400, detail="start must not be after end")
+    # Every bucket is zero-filled, so bound the range like `days`
+    if trend_bucket_count(*trend_range(days, start, end), granularity) > MAX_TREND_BUCKETS[granularity]:
+        raise HTTPException(
+            status_code=400,
+            detail=f"range too long: at most {MAX_TREND_BUCKETS[granularity]} {granularity} buckets"
+        )
+    return rollup_insights.get_complaint_trend(db, days, granularity, split_by, start, end)
 
 
 @app.get("/api/analytics/faults", tags=["Analytics"])
-def get_fault_analysis(db: Session = Depends(get_db)):
+def get_fault_analysis(db: Session = Depends(get_read_db)):
     """Get fault type distribution and analysis"""
-    return insights_engine.get_fault_distribution(db)
+    return analytics_insights.get_fault_distribution(db)
 
 
 @app.get("/api/analytics/product-health", tags=["Analytics"])
-def get_product_health(db: Session = Depends(get_db)):
+def get_product_health(db: Session = Depends(get_read_db)):
     """Get health scores for all products"""
-    return insights_engine.get_product_health_scores(db)
+    return analytics_insights.get_product_health_scores(db)
 
 
 @app.get("/api/analytics/resolution", tags=["Analytics"])
-def get_resolution_stats(db: Session = Depends(get_db)):
+def get_resolution_stats(db: Session = Depends(get_read_db)):
     """Get complaint resolution statistics"""
-    return insights_engine.get_resolution_metrics(db)
+    return analytics_insights.get_resolution_metrics(db)
 
 
 @app.get("/api/analytics/severity", tags=["Analytics"])
-def get_severity_stats(db: Session = Depends(get_db)):
+def get_severity_stats(db: Session = Depends(get_read_db)):
     """Get severity distribution statistics"""
-    return insights_engine.get_severity_distribution(db)
+    return analytics_insights.get_severity_distribution(db)
 
 
 @app.get("/api/analytics/departments", tags=["Analytics"])
-def get_department_stats(db: Session = Depends(get_db)):
+def get_department_stats(db: Session = Depends(get_read_db)):
     """Get complaint distribution and metrics by department"""
-    return insights_engine.get_department_workload(db)
+    return analytics_insights.get_department_workload(db)
 
 
 @app.get("/api/analytics/alerts", tags=["Analytics"])
-def get_critical_alerts(db: Session = Depends(get_db)):
+def get_critical_alerts(db: Session = Depends(get_read_db)):
     """Get critical alerts and concerning trends"""
-    return insights_engine.get_critical_alerts(db)
+    return analytics_insights.get_critical_alerts(db)
+
+
+@app.get("/api/analytics/slice", tags=["Analytics"])
+def get_analytics_slice(
+    db: Session = Depends(get_read_db),
+    group_by: str = Query("fault_type", description="Comma-separated: product, department, status, severity, fault_type, day, week, month"),
+    product_id: Optional[List[int]] = Query(None),
+    department: Optional[List[str]] = Query(None),
+    status: Optional[List[str]] = Query(None),
+    severity: Optional[List[str]] = Query(None),
+    fault_type: Optional[List[str]] = Query(None),
+    start: Optional[date] = Query(None, description="First created day (inclusive)"),
+    end: Optional[date] = Query(None, description="Last created day (inclusive)")
+):
+    """
+    Complaint counters for any group-by / filter combination
+    
+    Computed from the in-memory columnar snapshot of the complaints table,
+    e.g. `group_by=fault_type&product_id=3&start=2024-07-01` for one
+    product's fault mix over a quarter. Repeat a filter to accept several values.
+    """
+    if start and end and start > end:
+        raise HTTPException(status_code=400, detail="start must not be after end")
+    filters = {
+        name: values for name, values in (
+            ("product", product_id), ("department", department), ("status", status),
+            ("severity", severity), ("fault_type", fault_type)
+        ) if values
+    }
+    try:
+        return complaint_snapshot.aggregate(db, [name for name in group_by.split(",") if name], filters, start, end)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@app.get("/api/analytics/anomalies", tags=["Analytics"])
+def get_anomalies(
+    db: Session = Depends(get_read_db),
+    as_of: Optional[date] = Query(None, description="Day to score (default: today)"),
+    limit: int = Query(20, ge=1, le=200)
+):
+    """
+    Get (product, fault type) combinations with a complaint spike
+    
+    Each combination's count on the scored day is compared with an
+    exponentially weighted baseline of the previous days (z-score and
+    Poisson tail probability). Recomputed on the first read after each write.
+    """
+    return anomaly_detector.detect(db, as_of, limit)
+
+
+@app.get("/api/analytics/clusters", tags=["Analytics"])
+def get_complaint_clusters(
+    limit: int = Query(20, ge=1, le=200),
+    active_days: int = Query(clustering.CLUSTER_ACTIVE_DAYS, ge=1, le=3650),
+    min_size: int = Query(2, ge=1)
+):
+    """
+    Get the largest clusters of near-duplicate complaints seen recently
+    
+    Complaints are grouped by MinHash similarity of their text (repeated
+    templates, the same outage reported by many customers). A cluster is
+    active when one of its complaints was filed in the last active_days days.
+    """
+    if not clustering.CLUSTERING:
+        raise HTTPException(status_code=404, detail="Complaint clustering is disabled")
+    return complaint_clusters.largest(limit, active_days, min_size)
+
+
+@app.get("/api/analytics/stream", tags=["Analytics"])
+async def stream_analytics(request: Request):
+    """
+    Server-Sent Events feed of dashboard analytics
+    
+    Sends a `snapshot` event with the full state (dashboard, summary and
+    30-day trends), then a `delta` event with only the changed sections
+    whenever complaints are created, updated, imported or re-scored.
+    """
+    return StreamingResponse(
+        broadcaster.events(request),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+@app.get("/api/analytics/cache", tags=["Analytics"])
+def get_cache_stats():
+    """Get analytics result cache and live stream statistics"""
+    return {**result_cache.stats(), "stream": broadcaster.stats()}
+
+
+# ==================== Admin Endpoints ====================
+
+@app.post("/api/admin/rescore", tags=["Admin"], status_code=202)
+def rescore_stored_complaints():
+    """
+    Re-score, in the background, every complaint whose stored predictions
+    came from a different model version than the one currently loaded
+    """
+    classifier.ensure_loaded()
+    
+    def on_done(result):
+        complaint_snapshot.invalidate()
+        result_cache.bump_version()
+    
+    started = start_background_rescore(on_done=on_done)
+    if not started:
+        raise HTTPException(status_code=409, detail="A re-score is already running")
+    return {"status": "started", "model_version": classifier.model_version}
+
+
+@app.post("/api/admin/retrain", tags=["Admin"], status_code=202)
+async def retrain_classifier(incremental: bool = Query(True, description="Update the live model with complaints it has not seen")):
+    """
+    Retrain the classifier in the background from stored complaints
+
+    Complaints are streamed in chunks into a hashing Naive Bayes model. The
+    new model is saved atomically and swapped into this process and its
+    inference workers; stored predictions keep their old model_version until
+    /api/admin/rescore is run.
+    """
+    loop = asyncio.get_running_loop()
+    started = retrainer.start_background(
+        incremental,
+        on_done=lambda result: loop.call_soon_threadsafe(inference_service.reload)
+    )
+    if not started:
+        raise HTTPException(status_code=409, detail="A retraining run is already in progress")
+    return {"status": "started", "mode": "incremental" if incremental else "full",
+            "model_version": classifier.model_version}
+
+
+@app.get("/api/admin/retrain", tags=["Admin"])
+def get_retrain_stats():
+    """Get retraining statistics (runs, throughput, last run, live model version)"""
+    return retrainer.stats()
+
+
+@app.get("/api/admin/inference", tags=["Admin"])
+def get_inference_stats():
+    """Get inference service metrics (queue depth, batch sizes, throughput, classification cache)"""
+    return inference_service.stats()
 
 
 # ==================== Stats Endpoints ====================
 
 @app.get("/api/stats/summary", tags=["Statistics"])
-def get_summary_stats(db: Session = Depends(get_db)):
-    """Get high-level statistics"""
-    total_complaints = db.query(Complaint).count()
-    resolved_complaints = db.query(Complaint).filter(Complaint.status == "resolved").count()
-    critical_complaints = db.query(Complaint).filter(Complaint.severity == "critical").count()
+def get_summary_stats(db: Session = Depends(get_read_db)):
+    """
+    Get high-level statistics
     
-    return {
-        "total_complaints": total_complaints,
-        "resolved_complaints": resolved_complaints,
-        "resolution_rate": round((resolved_complaints / total_complaints * 100), 2) if total_complaints > 0 else 0,
-        "critical_complaints": critical_complaints,
-        "open_complaints": db.query(Complaint).filter(Complaint.status == "open").count(),
-        "average_satisfaction": db.query(Complaint).filter(
-            Complaint.customer_satisfaction.isnot(None)
-        ).all(),
-    }
+    Counters plus the mean and 1-5 distribution of customer satisfaction;
+    the payload size does not grow with the number of complaints.
+    """
+    return analytics_insights.get_summary_stats(db)
 
 
 if __name__ == "__main__":
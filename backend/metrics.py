@@ -0,0 +1,260 @@
+"""
+Request, SQL and inference metrics in Prometheus text format
+Per-route latency histograms, per-request SQL query counts and durations
+(captured with SQLAlchemy engine events), and scrape-time gauges for the
+connection pools, analytics cache and inference service
+"""
+import logging
+import os
+import threading
+import time
+from contextvars import ContextVar
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import event
+
+# Settings, overridable via environment
+SLOW_REQUEST_MS = float(os.getenv("SLOW_REQUEST_MS", "0"))  # 0 = slow-request logging off
+SLOW_REQUEST_MAX_STATEMENTS = int(os.getenv("SLOW_REQUEST_MAX_STATEMENTS", "50"))
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 200, 500)
+
+slow_request_logger = logging.getLogger("resolve.slow_requests")
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(labelnames: Tuple[str, ...], values: Tuple, extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(labelnames, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    """Monotonic counter with optional labels"""
+
+    def __init__(self, name: str, help: str, labelnames: Tuple[str, ...] = ()):
+        self.name = name
+        self.help = help
+        self.labelnames = labelnames
+        self._values: Dict[Tuple, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *labels, amount: float = 1):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            for labels, value in sorted(self._values.items()):
+                lines.append(f"{self.name}{_format_labels(self.labelnames, labels)} {_format_value(value)}")
+        return lines
+
+
+class Histogram:
+    """Cumulative-bucket histogram with optional labels"""
+
+    def __init__(self, name: str, help: str, labelnames: Tuple[str, ...] = (), buckets: Iterable[float] = LATENCY_BUCKETS):
+        self.name = name
+        self.help = help
+        self.labelnames = labelnames
+        self.buckets = tuple(buckets) + (float("inf"),)
+        self._series: Dict[Tuple, list] = {}  # labels -> [bucket counts..., sum, count]
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *labels):
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [0] * len(self.buckets) + [0.0, 0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[i] += 1
+                    break
+            series[-2] += value
+            series[-1] += 1
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            for labels, series in sorted(self._series.items()):
+                cumulative = 0
+                for bound, count in zip(self.buckets, series):
+                    cumulative += count
+                    le = 'le="' + _format_value(bound) + '"'
+                    lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, labels, le)} {cumulative}")
+                label_text = _format_labels(self.labelnames, labels)
+                lines.append(f"{self.name}_sum{label_text} {series[-2]!r}")
+                lines.append(f"{self.name}_count{label_text} {series[-1]}")
+        return lines
+
+
+class Registry:
+    """
+    Metric families rendered at /metrics
+
+    Collectors are callables returning (name, type, help, [(labels dict, value)])
+    evaluated at scrape time, for values owned by other components.
+    """
+
+    def __init__(self):
+        self.metrics = []
+        self.collectors: List[Callable[[], Iterable[tuple]]] = []
+
+    def register(self, metric):
+        self.metrics.append(metric)
+        return metric
+
+    def add_collector(self, collector: Callable[[], Iterable[tuple]]):
+        self.collectors.append(collector)
+
+    def render(self) -> str:
+        lines = []
+        for metric in self.metrics:
+            lines.extend(metric.render())
+        for collector in self.collectors:
+            for name, kind, help, samples in collector():
+                lines.append(f"# HELP {name} {help}")
+                lines.append(f"# TYPE {name} {kind}")
+                for labels, value in samples:
+                    label_names = tuple(labels)
+                    lines.append(f"{name}{_format_labels(label_names, tuple(labels.values()))} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
+
+http_request_duration = registry.register(Histogram(
+    "resolve_http_request_duration_seconds", "HTTP request latency by route",
+    ("method", "route", "status")
+))
+http_request_sql_queries = registry.register(Histogram(
+    "resolve_http_request_sql_queries", "SQL statements executed per HTTP request",
+    ("method", "route"), QUERY_COUNT_BUCKETS
+))
+http_request_sql_seconds = registry.register(Counter(
+    "resolve_http_request_sql_seconds_total", "Time spent in SQL statements, by route",
+    ("method", "route")
+))
+sql_query_duration = registry.register(Histogram(
+    "resolve_sql_query_duration_seconds", "SQL statement latency by engine and statement type",
+    ("engine", "statement")
+))
+classifier_inference_duration = registry.register(Histogram(
+    "resolve_classifier_inference_seconds", "Classifier latency per classify_many batch",
+    ("mode",)
+))
+classifier_batch_size = registry.register(Histogram(
+    "resolve_classifier_batch_size", "Complaints per classifier batch",
+    ("mode",), (1, 2, 4, 8, 16, 32, 64, 128, 256)
+))
+
+
+# ==================== Per-request SQL capture ====================
+
+class RequestStats:
+    """SQL activity of the current request"""
+
+    __slots__ = ("queries", "sql_seconds", "statements")
+
+    def __init__(self, capture_statements: bool):
+        self.queries = 0
+        self.sql_seconds = 0.0
+        self.statements = [] if capture_statements else None
+
+
+_request_stats: ContextVar[Optional[RequestStats]] = ContextVar("request_stats", default=None)
+
+
+def start_request(capture_statements: bool = False):
+    """Begin collecting SQL stats for the current context; returns (stats, reset token)"""
+    stats = RequestStats(capture_statements)
+    return stats, _request_stats.set(stats)
+
+
+def end_request(token):
+    _request_stats.reset(token)
+
+
+def instrument_engine(engine, name: str):
+    """Time every statement on engine and attribute it to the current request"""
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - conn.info["query_start"].pop()
+        sql_query_duration.observe(elapsed, name, statement.lstrip()[:6].upper())
+        stats = _request_stats.get()
+        if stats is not None:
+            stats.queries += 1
+            stats.sql_seconds += elapsed
+            if stats.statements is not None and len(stats.statements) < SLOW_REQUEST_MAX_STATEMENTS:
+                stats.statements.append((elapsed, " ".join(statement.split())))
+
+
+def record_request(method: str, route: str, status: int, seconds: float, stats: RequestStats):
+    http_request_duration.observe(seconds, method, route, str(status))
+    http_request_sql_queries.observe(stats.queries, method, route)
+    http_request_sql_seconds.inc(method, route, amount=stats.sql_seconds)
+
+    if SLOW_REQUEST_MS and seconds * 1000 >= SLOW_REQUEST_MS:
+        lines = [
+            f"slow request {method} {route} -> {status}: {seconds * 1000:.1f} ms, "
+            f"{stats.queries} SQL statements, {stats.sql_seconds * 1000:.1f} ms in SQL"
+        ]
+        for elapsed, statement in stats.statements or ():
+            lines.append(f"  {elapsed * 1000:8.2f} ms  {statement[:500]}")
+        if stats.queries > len(stats.statements or ()):
+            lines.append(f"  ... {stats.queries - len(stats.statements or ())} more statements")
+        slow_request_logger.warning("\n".join(lines))
+
+
+# ==================== Scrape-time collectors ====================
+
+def pool_collector(engines: Dict[str, object]):
+    """Connection pool occupancy for each named engine"""
+    def collect():
+        checked_out, size, overflow = [], [], []
+        for name, engine in engines.items():
+            pool = engine.pool
+            if hasattr(pool, "checkedout"):
+                checked_out.append(({"engine": name}, pool.checkedout()))
+            if hasattr(pool, "size"):
+                size.append(({"engine": name}, pool.size()))
+            if hasattr(pool, "overflow"):
+                overflow.append(({"engine": name}, pool.overflow()))
+        return [
+            ("resolve_db_pool_checked_out", "gauge", "Connections currently checked out", checked_out),
+            ("resolve_db_pool_size", "gauge", "Configured pool size", size),
+            ("resolve_db_pool_overflow", "gauge", "Current overflow connections (negative = unused capacity)", overflow),
+        ]
+    return collect
+
+
+def stats_collector(prefix: str, stats: Callable[[], dict], counters: Dict[str, tuple], gauges: Dict[str, tuple]):
+    """
+    Expose numeric fields of a component's stats() dict
+    counters/gauges map metric suffix -> (stats key, help text)
+    """
+    def collect():
+        values = stats()
+        families = []
+        for kind, fields in (("counter", counters), ("gauge", gauges)):
+            for suffix, (key, help) in fields.items():
+                families.append((f"{prefix}_{suffix}", kind, help, [({}, values[key])]))
+        return families
+    return collect
@@ -0,0 +1,127 @@
+"""
+Memory-mappable model artifact format
+Stores named NumPy arrays plus JSON metadata in one file so that workers can
+map the weights read-only (sharing page cache) instead of unpickling copies
+
+Layout:
+    magic (8 bytes) | format version (uint32 LE) | header length (uint32 LE)
+    header (UTF-8 JSON: meta, array table, SHA-256 of the data section)
+    padding to ALIGNMENT
+    data section: arrays, each starting on an ALIGNMENT boundary
+"""
+import hashlib
+import json
+import mmap
+import os
+import struct
+import tempfile
+from typing import Dict, Tuple
+
+import numpy as np
+
+MAGIC = b"RSLVMDL\x00"
+FORMAT_VERSION = 1
+ALIGNMENT = 64
+_PREAMBLE = struct.Struct("<8sII")
+
+
+class ArtifactError(ValueError):
+    """Raised when a model artifact is malformed, unsupported or corrupted"""
+
+
+def _padding(offset: int) -> int:
+    return -offset % ALIGNMENT
+
+
+def is_artifact(path: str) -> bool:
+    """True if the file starts with the artifact magic bytes"""
+    with open(path, "rb") as f:
+        return f.read(len(MAGIC)) == MAGIC
+
+
+def save_artifact(path: str, arrays: Dict[str, np.ndarray], meta: dict):
+    """
+    Write arrays and metadata to path atomically (temp file + rename)
+
+    Object arrays are not supported; store strings as fixed-width unicode ('U').
+    """
+    table = {}
+    blobs = []
+    offset = 0
+    for name, array in arrays.items():
+        array = np.ascontiguousarray(array)
+        if array.dtype.hasobject:
+            raise ArtifactError(f"array {name!r} has object dtype")
+        offset += _padding(offset)
+        table[name] = {
+            "dtype": array.dtype.str,
+            "shape": list(array.shape),
+            "offset": offset,
+            "nbytes": array.nbytes
+        }
+        blobs.append((offset, array))
+        offset += array.nbytes
+
+    data = bytearray(offset)
+    for start, array in blobs:
+        data[start:start + array.nbytes] = array.tobytes()
+
+    header = json.dumps({
+        "meta": meta,
+        "arrays": table,
+        "checksum": {"algorithm": "sha256", "digest": hashlib.sha256(data).hexdigest()}
+    }).encode("utf-8")
+    preamble = _PREAMBLE.pack(MAGIC, FORMAT_VERSION, len(header))
+    head_size = len(preamble) + len(header)
+
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".model-", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(preamble)
+            f.write(header)
+            f.write(b"\x00" * _padding(head_size))
+            f.write(data)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def load_artifact(path: str, verify: bool = True) -> Tuple[Dict[str, np.ndarray], dict]:
+    """
+    Map an artifact read-only and return (arrays, meta)
+
+    Arrays are zero-copy views over the mapping; they keep it alive. With
+    verify=True the data section is checked against the stored SHA-256
+    (this reads every page once).
+    """
+    with open(path, "rb") as f:
+        mapping = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    if len(mapping) < _PREAMBLE.size:
+        raise ArtifactError(f"{path} is too short to be a model artifact")
+    magic, version, header_length = _PREAMBLE.unpack_from(mapping, 0)
+    if magic != MAGIC:
+        raise ArtifactError(f"{path} is not a model artifact")
+    if version != FORMAT_VERSION:
+        raise ArtifactError(f"{path} has unsupported format version {version}")
+
+    header_end = _PREAMBLE.size + header_length
+    header = json.loads(mapping[_PREAMBLE.size:header_end].decode("utf-8"))
+    data_start = header_end + _padding(header_end)
+
+    if verify:
+        digest = hashlib.sha256(memoryview(mapping)[data_start:]).hexdigest()
+        if digest != header["checksum"]["digest"]:
+            raise ArtifactError(f"{path} failed checksum verification")
+
+    arrays = {}
+    for name, spec in header["arrays"].items():
+        dtype = np.dtype(spec["dtype"])
+        count = spec["nbytes"] // dtype.itemsize if dtype.itemsize else 0
+        array = np.frombuffer(mapping, dtype=dtype, count=count, offset=data_start + spec["offset"])
+        arrays[name] = array.reshape(spec["shape"])
+
+    return arrays, header["meta"]
@@ -3,42 +3,191 @@ Predictive insights and analytics engine
 Generates business intelligence metrics from complaint data
 """
 from sqlalchemy.orm import Session
-from database import Complaint, Product, FaultCategory
-from datetime import datetime, timedelta
-from sqlalchemy import func, and_, desc
+from database import Complaint, ComplaintRollup, Product, FaultCategory, date_bucket
+from rollups import RESOLUTION_DAYS, from_bucket, to_bucket, split_bucket
+from cache import result_cache
+from anomalies import anomaly_detector
+from collections import defaultdict
+from datetime import date, datetime, timedelta
+from typing import Optional
+from sqlalchemy import func, and_, desc, case
 import statistics
 
+
+def calculate_health_score(
+    complaint_count: int,
+    critical_count: int,
+    high_count: int,
+    resolved_count: int,
+    avg_resolution_time: float
+) -> float:
+    """
+    Product health score (0-100, higher is better) from aggregated counters
+    Based on: severity, resolution time, resolution rate
+    """
+    if not complaint_count:
+        return 100
+
+    resolution_rate = resolved_count / complaint_count * 100
+
+    # Score calculation (0-100)
+    severity_penalty = (critical_count * 15) + (high_count * 5)
+    time_penalty = min(avg_resolution_time / 3, 20)  # max 20 point penalty
+    resolution_bonus = (resolution_rate / 100) * 30  # max 30 point bonus
+
+    return max(0, 100 - severity_penalty - time_penalty + resolution_bonus)
+
+
+# split_by -> complaint column each trend series groups on
+TREND_SPLITS = {
+    "product": Complaint.product_id,
+    "fault_type": Complaint.predicted_fault_type,
+    "severity": Complaint.severity,
+}
+
+
+def trend_range(days: int, start: Optional[date], end: Optional[date]) -> tuple:
+    """Inclusive (start, end) dates: explicit bounds, or the last N days up to today"""
+    end = end or datetime.utcnow().date()
+    return start or end - timedelta(days=days), end
+
+
+# Longest trend: the `days` limit of the trends endpoint, and for explicit
+# start/end ranges as many buckets as a range that long can span
+MAX_TREND_DAYS = 3650
+MAX_TREND_BUCKETS = {
+    "day": MAX_TREND_DAYS + 1,
+    "week": MAX_TREND_DAYS // 7 + 2,
+    "month": MAX_TREND_DAYS // 28 + 2,
+}
+
+
+def trend_bucket_count(start: date, end: date, granularity: str) -> int:
+    """Number of buckets a start..end trend returns, without building them"""
+    first = period_start(start, granularity)
+    if end < first:
+        return 0
+    if granularity == "week":
+        return (end - first).days // 7 + 1
+    if granularity == "month":
+        return (end.year - first.year) * 12 + end.month - first.month + 1
+    return (end - first).days + 1
+
+
+def period_start(day: date, granularity: str) -> date:
+    """First day of the day/week (Monday)/month bucket containing day"""
+    if granularity == "week":
+        return day - timedelta(days=day.weekday())
+    if granularity == "month":
+        return day.replace(day=1)
+    return day
+
+
+def _periods(start: date, end: date, granularity: str) -> list:
+    """Every bucket start between start and end, empty buckets included"""
+    periods = []
+    current = period_start(start, granularity)
+    while current <= end:
+        periods.append(current)
+        if granularity == "week":
+            current += timedelta(days=7)
+        elif granularity == "month":
+            current = (current + timedelta(days=32)).replace(day=1)
+        else:
+            current += timedelta(days=1)
+    return periods
+
+
+def trend_payload(db: Session, counts: dict, start: date, end: date, granularity: str, split_by: Optional[str]) -> dict:
+    """
+    Densified trend response from {(day, split value or None): count}
+    Every bucket in the range appears, with 0 where nothing was filed; split
+    series share the bucket list of "data" and are ordered by total
+    """
+    periods = _periods(start, end, granularity)
+    index = {period: i for i, period in enumerate(periods)}
+    totals = [0] * len(periods)
+    series = defaultdict(lambda: [0] * len(periods))
+    for (day, key), count in counts.items():
+        i = index[period_start(day, granularity)]
+        totals[i] += count
+        if split_by:
+            series[key][i] += count
+    
+    result = {
+        "period_days": (end - start).days,
+        "granularity": granularity,
+        "start": start.isoformat(),
+        "end": end.isoformat(),
+        "split_by": split_by,
+        "data": [
+            {"date": period.isoformat(), "complaints": total}
+            for period, total in zip(periods, totals)
+        ]
+    }
+    if split_by:
+        labels = {}
+        if split_by == "product":
+            labels = {str(p.product_id): p.product_name for p in db.query(Product.product_id, Product.product_name)}
+        result["series"] = sorted(
+            (
+                {
+                    "key": key,
+                    "label": labels.get(key, key or "Unknown"),
+                    "total": sum(values),
+                    "counts": values
+                }
+                for key, values in series.items()
+            ),
+            key=lambda s: s["total"],
+            reverse=True
+        )
+    return result
+
+
 class InsightsEngine:
     """Generate predictive insights from complaint data"""
     
     @staticmethod
-    def get_complaint_trend(db: Session, days: int = 30) -> dict:
+    @result_cache.cached()
+    def get_complaint_trend(
+        db: Session,
+        days: int = 30,
+        granularity: str = "day",
+        split_by: Optional[str] = None,
+        start: Optional[date] = None,
+        end: Optional[date] = None
+    ) -> dict:
         """
-        Get complaint trend over the last N days
-        Returns daily complaint counts for visualization
+        Get complaint trend over the last N days (or start..end)
+        Returns complaint counts per day, week or month for visualization,
+        optionally split into one series per product, fault type or severity
         """
-        cutoff_date = datetime.utcnow().date() - timedelta(days=days)
+        start, end = trend_range(days, start, end)
+        bucket = date_bucket(Complaint.created_date, granularity, db.get_bind().dialect.name)
+        columns = [bucket.label("bucket")]
+        if split_by:
+            columns.append(TREND_SPLITS[split_by])
         
-        complaints = db.query(
-            Complaint.created_date,
+        query = db.query(
+            *columns,
             func.count(Complaint.complaint_id).label("count")
         ).filter(
-            Complaint.created_date >= cutoff_date
+            Complaint.created_date >= start,
+            Complaint.created_date <= end
         ).group_by(
-            Complaint.created_date
-        ).order_by(
-            Complaint.created_date
-        ).all()
+            *columns
+        )
         
-        return {
-            "period_days": days,
-            "data": [
-                {"date": str(c[0]), "complaints": c[1]}
-                for c in complaints
-            ]
-        }
+        counts = defaultdict(int)
+        for row in query:
+            key = from_bucket(to_bucket(row[1])) if split_by else None
+            counts[(date.fromisoformat(str(row[0])), key)] += row[-1]
+        
+        return trend_payload(db, counts, start, end, granularity, split_by)
     
     @staticmethod
+    @result_cache.cached()
     def get_fault_distribution(db: Session) -> dict:
         """Get distribution of fault types"""
         faults = db.query(
@@ -65,52 +214,56 @@ class InsightsEngine:
         }
     
     @staticmethod
+    @result_cache.cached()
     def get_product_health_scores(db: Session) -> dict:
         """
         Calculate health scores for each product based on complaint metrics
         Score: 0-100 (higher is better)
+
+        All per-product counters are computed in a single grouped query
+        (products LEFT JOIN complaints) instead of loading every complaint.
         """
-        products = db.query(Product).all()
-        scores = []
-        
-        for product in products:
-            complaints = db.query(Complaint).filter(
-                Complaint.product_id == product.product_id
-            ).all()
-            
-            if not complaints:
-                score = 100
-            else:
-                # Calculate based on: severity, resolution time, resolution rate
-                critical_count = sum(1 for c in complaints if c.severity == "critical")
-                high_count = sum(1 for c in complaints if c.severity == "high")
-                resolved_count = sum(1 for c in complaints if c.status == "resolved")
-                resolution_rate = (resolved_count / len(complaints) * 100) if complaints else 0
-                
-                avg_resolution_time = statistics.mean(
-                    [c.resolution_time for c in complaints if c.resolution_time]
-                ) if any(c.resolution_time for c in complaints) else 0
-                
-                # Score calculation (0-100)
-                severity_penalty = (critical_count * 15) + (high_count * 5)
-                time_penalty = min(avg_resolution_time / 3, 20)  # max 20 point penalty
-                resolution_bonus = (resolution_rate / 100) * 30  # max 30 point bonus
-                
-                score = max(0, 100 - severity_penalty - time_penalty + resolution_bonus)
-            
-            scores.append({
-                "product_id": product.product_id,
-                "product_name": product.product_name,
-                "category": product.category,
-                "health_score": round(score, 2),
-                "complaint_count": len(complaints)
-            })
-        
+        rows = db.query(
+            Product.product_id,
+            Product.product_name,
+            Product.category,
+            func.count(Complaint.complaint_id).label("complaint_count"),
+            func.sum(case((Complaint.severity == "critical", 1), else_=0)).label("critical_count"),
+            func.sum(case((Complaint.severity == "high", 1), else_=0)).label("high_count"),
+            func.sum(case((Complaint.status == "resolved", 1), else_=0)).label("resolved_count"),
+            # Only truthy resolution times count towards the average (NULL and 0 are skipped)
+            func.avg(func.nullif(Complaint.resolution_time, 0)).label("avg_resolution_time")
+        ).outerjoin(
+            Complaint, Product.product_id == Complaint.product_id
+        ).group_by(
+            Product.product_id, Product.product_name, Product.category
+        ).order_by(
+            Product.product_id
+        ).all()
+
+        scores = [
+            {
+                "product_id": r.product_id,
+                "product_name": r.product_name,
+                "category": r.category,
+                "health_score": round(calculate_health_score(
+                    r.complaint_count,
+                    r.critical_count or 0,
+                    r.high_count or 0,
+                    r.resolved_count or 0,
+                    float(r.avg_resolution_time or 0)  # Decimal on PostgreSQL
+                ), 2),
+                "complaint_count": r.complaint_count
+            }
+            for r in rows
+        ]
+
         return {
             "scores": sorted(scores, key=lambda x: x["health_score"], reverse=True)
         }
     
     @staticmethod
+    @result_cache.cached()
     def get_resolution_metrics(db: Session) -> dict:
         """Get complaint resolution statistics"""
         resolved = db.query(Complaint).filter(
@@ -137,6 +290,7 @@ class InsightsEngine:
         }
     
     @staticmethod
+    @result_cache.cached()
     def get_severity_distribution(db: Session) -> dict:
         """Get distribution of complaint severity levels"""
         severities = db.query(
@@ -163,6 +317,7 @@ class InsightsEngine:
         }
     
     @staticmethod
+    @result_cache.cached()
     def get_department_workload(db: Session) -> dict:
         """Get complaint distribution by department"""
         departments = db.query(
@@ -180,13 +335,52 @@ class InsightsEngine:
                 {
                     "department": d[0],
                     "complaint_count": d[1],
-                    "avg_resolution_time": round(d[2], 2) if d[2] else None
+                    "avg_resolution_time": round(float(d[2]), 2) if d[2] else None
                 }
                 for d in departments
             ]
         }
     
     @staticmethod
+    @result_cache.cached()
+    def get_summary_stats(db: Session) -> dict:
+        """
+        High-level counters and customer satisfaction summary
+        Computed with one conditional-aggregation query; fixed-size result
+        """
+        ratings = range(1, 6)
+        row = db.query(
+            func.count(Complaint.complaint_id),
+            func.sum(case((Complaint.status == "resolved", 1), else_=0)),
+            func.sum(case((Complaint.severity == "critical", 1), else_=0)),
+            func.sum(case((Complaint.status == "open", 1), else_=0)),
+            func.count(Complaint.customer_satisfaction),
+            func.avg(Complaint.customer_satisfaction),
+            *(
+                func.sum(case((Complaint.customer_satisfaction == rating, 1), else_=0))
+                for rating in ratings
+            )
+        ).one()
+        
+        total, resolved, critical, open_count, rated, avg_satisfaction = row[:6]
+        total = total or 0
+        resolved = resolved or 0
+        
+        return {
+            "total_complaints": total,
+            "resolved_complaints": resolved,
+            "resolution_rate": round((resolved / total * 100), 2) if total > 0 else 0,
+            "critical_complaints": critical or 0,
+            "open_complaints": open_count or 0,
+            "average_satisfaction": round(float(avg_satisfaction), 2) if avg_satisfaction is not None else None,
+            "satisfaction_responses": rated,
+            "satisfaction_distribution": {
+                str(rating): count or 0 for rating, count in zip(ratings, row[6:])
+            }
+        }
+    
+    @staticmethod
+    @result_cache.cached()
     def get_critical_alerts(db: Session) -> dict:
         """
         Identify critical issues requiring immediate attention
@@ -230,18 +424,229 @@ class InsightsEngine:
         }
 
 
-# Global insights instance
+class RollupInsightsEngine:
+    """
+    Dashboard insights read from the complaint_rollups table
+    Same output as InsightsEngine, but each call reads O(groups) rollup rows
+    """
+    
+    @staticmethod
+    def _rollups(db: Session, dimension: str) -> list:
+        return db.query(ComplaintRollup).filter(
+            ComplaintRollup.dimension == dimension,
+            ComplaintRollup.complaint_count > 0
+        ).all()
+    
+    @staticmethod
+    def _distribution(db: Session, dimension: str) -> tuple:
+        rows = sorted(
+            RollupInsightsEngine._rollups(db, dimension),
+            key=lambda r: r.complaint_count,
+            reverse=True
+        )
+        total = sum(r.complaint_count for r in rows)
+        return rows, total
+    
+    @staticmethod
+    @result_cache.cached()
+    def get_complaint_trend(
+        db: Session,
+        days: int = 30,
+        granularity: str = "day",
+        split_by: Optional[str] = None,
+        start: Optional[date] = None,
+        end: Optional[date] = None
+    ) -> dict:
+        """
+        Get complaint trend from the precomputed daily counts
+        Reads one rollup row per day (per split value) in the range and
+        re-buckets them to weeks or months, so long ranges stay cheap
+        """
+        start, end = trend_range(days, start, end)
+        dimension = f"day_{split_by}" if split_by else "day"
+        rows = db.query(ComplaintRollup.bucket, ComplaintRollup.complaint_count).filter(
+            ComplaintRollup.dimension == dimension,
+            ComplaintRollup.bucket >= start.isoformat(),
+            # compound buckets are "YYYY-MM-DD|value", so stop before the next day
+            ComplaintRollup.bucket < (end + timedelta(days=1)).isoformat(),
+            ComplaintRollup.complaint_count > 0
+        )
+        
+        counts = defaultdict(int)
+        for bucket, count in rows:
+            day, key = split_bucket(bucket) if split_by else (bucket, None)
+            counts[(date.fromisoformat(day), key)] += count
+        
+        return trend_payload(db, counts, start, end, granularity, split_by)
+    
+    @staticmethod
+    def get_fault_distribution(db: Session) -> dict:
+        """Get distribution of fault types"""
+        rows, total = RollupInsightsEngine._distribution(db, "fault_type")
+        return {
+            "total_faults": total,
+            "distribution": [
+                {
+                    "fault_type": from_bucket(r.bucket),
+                    "count": r.complaint_count,
+                    "percentage": round((r.complaint_count / total * 100), 2) if total > 0 else 0
+                }
+                for r in rows
+            ]
+        }
+    
+    @staticmethod
+    def get_product_health_scores(db: Session) -> dict:
+        """Calculate health scores for each product from the product rollups"""
+        rollups = {r.bucket: r for r in RollupInsightsEngine._rollups(db, "product")}
+        scores = []
+        
+        for product in db.query(Product).order_by(Product.product_id).all():
+            r = rollups.get(str(product.product_id))
+            complaint_count = r.complaint_count if r else 0
+            avg_resolution_time = (
+                r.resolution_time_sum / r.resolution_time_nonzero_count
+            ) if r and r.resolution_time_nonzero_count else 0
+            
+            scores.append({
+                "product_id": product.product_id,
+                "product_name": product.product_name,
+                "category": product.category,
+                "health_score": round(calculate_health_score(
+                    complaint_count,
+                    r.critical_count if r else 0,
+                    r.high_count if r else 0,
+                    r.resolved_count if r else 0,
+                    avg_resolution_time
+                ), 2),
+                "complaint_count": complaint_count
+            })
+        
+        return {
+            "scores": sorted(scores, key=lambda x: x["health_score"], reverse=True)
+        }
+    
+    @staticmethod
+    def get_resolution_metrics(db: Session) -> dict:
+        """Get complaint resolution statistics from the resolution-time histogram"""
+        histogram = sorted(
+            (int(r.bucket), r.complaint_count)
+            for r in RollupInsightsEngine._rollups(db, RESOLUTION_DAYS)
+        )
+        n = sum(count for _, count in histogram)
+        
+        if not n:
+            return {
+                "total_resolved": 0,
+                "avg_resolution_days": 0,
+                "median_resolution_days": 0,
+                "min_resolution_days": 0,
+                "max_resolution_days": 0
+            }
+        
+        def nth_value(index: int) -> int:
+            seen = 0
+            for days, count in histogram:
+                seen += count
+                if index < seen:
+                    return days
+        
+        if n % 2:
+            median = nth_value(n // 2)
+        else:
+            median = (nth_value(n // 2 - 1) + nth_value(n // 2)) / 2
+        
+        resolved = db.query(ComplaintRollup.complaint_count).filter(
+            ComplaintRollup.dimension == "status",
+            ComplaintRollup.bucket == "resolved"
+        ).scalar() or 0
+        
+        return {
+            "total_resolved": resolved,
+            "avg_resolution_days": round(sum(days * count for days, count in histogram) / n, 2),
+            "median_resolution_days": round(median, 2),
+            "min_resolution_days": histogram[0][0],
+            "max_resolution_days": histogram[-1][0]
+        }
+    
+    @staticmethod
+    def get_severity_distribution(db: Session) -> dict:
+        """Get distribution of complaint severity levels"""
+        rows, total = RollupInsightsEngine._distribution(db, "severity")
+        return {
+            "total": total,
+            "by_severity": [
+                {
+                    "severity": from_bucket(r.bucket),
+                    "count": r.complaint_count,
+                    "percentage": round((r.complaint_count / total * 100), 2) if total > 0 else 0
+                }
+                for r in rows
+            ]
+        }
+    
+    @staticmethod
+    def get_department_workload(db: Session) -> dict:
+        """Get complaint distribution by department"""
+        rows, _ = RollupInsightsEngine._distribution(db, "department")
+        by_department = []
+        for r in rows:
+            avg_time = r.resolution_time_sum / r.resolution_time_count if r.resolution_time_count else None
+            by_department.append({
+                "department": from_bucket(r.bucket),
+                "complaint_count": r.complaint_count,
+                "avg_resolution_time": round(avg_time, 2) if avg_time else None
+            })
+        return {"by_department": by_department}
+    
+    @staticmethod
+    def get_critical_alerts(db: Session) -> dict:
+        """Identify critical issues requiring immediate attention"""
+        names = dict(db.query(Product.product_id, Product.product_name).all())
+        critical_by_name = {}
+        for r in RollupInsightsEngine._rollups(db, "product"):
+            name = names.get(int(r.bucket))
+            if name is not None and r.critical_count > 0:
+                critical_by_name[name] = critical_by_name.get(name, 0) + r.critical_count
+        critical_products = sorted(critical_by_name.items(), key=lambda p: p[1], reverse=True)[:5]
+        
+        unresolved = sorted(
+            (
+                (from_bucket(r.bucket), r.complaint_count - r.resolved_count)
+                for r in RollupInsightsEngine._rollups(db, "fault_type")
+                if r.complaint_count > r.resolved_count
+            ),
+            key=lambda u: u[1],
+            reverse=True
+        )[:5]
+        
+        return {
+            "critical_products": [
+                {"product": p[0], "critical_count": p[1]}
+                for p in critical_products
+            ],
+            "unresolved_fault_types": [
+                {"fault_type": u[0], "unresolved_count": u[1]}
+                for u in unresolved
+            ]
+        }
+
+
+# Global insights instances
 insights_engine = InsightsEngine()
+rollup_insights = RollupInsightsEngine()
 
 
+@result_cache.cached()
 def get_dashboard_summary(db: Session) -> dict:
-    """Get comprehensive dashboard summary"""
+    """Get comprehensive dashboard summary (served from the rollup tables)"""
     return {
-        "fault_distribution": insights_engine.get_fault_distribution(db),
-        "product_health": insights_engine.get_product_health_scores(db),
-        "resolution_metrics": insights_engine.get_resolution_metrics(db),
-        "severity_distribution": insights_engine.get_severity_distribution(db),
-        "department_workload": insights_engine.get_department_workload(db),
-        "critical_alerts": insights_engine.get_critical_alerts(db),
+        "fault_distribution": rollup_insights.get_fault_distribution(db),
+        "product_health": rollup_insights.get_product_health_scores(db),
+        "resolution_metrics": rollup_insights.get_resolution_metrics(db),
+        "severity_distribution": rollup_insights.get_severity_distribution(db),
+        "department_workload": rollup_insights.get_department_workload(db),
+        "critical_alerts": rollup_insights.get_critical_alerts(db),
+        "anomalies": anomaly_detector.detect(db, limit=10),
         "timestamp": datetime.utcnow().isoformat()
     }
@@ -0,0 +1,139 @@
+"""
+Bulk re-scoring of stored complaints
+Refreshes predictions, confidences and model_version for rows scored by an
+older classifier (or never scored), e.g. after a new model is loaded
+"""
+import argparse
+import sys
+import threading
+
+from sqlalchemy import or_, select, update
+from sqlalchemy.orm import Session
+
+from database import Complaint, SessionLocal, for_update
+from ai_classifier import classifier
+import rollups
+
+DEFAULT_CHUNK_SIZE = 1000
+
+_rescore_lock = threading.Lock()
+
+
+def rescore_complaints(db: Session, chunk_size: int = DEFAULT_CHUNK_SIZE) -> dict:
+    """
+    Re-classify every complaint whose model_version differs from the live model
+
+    Works through the table in complaint_id order, one chunk at a time: the
+    chunk is read and classified with one classify_many call outside any
+    transaction, then written back with a bulk UPDATE and its rollup
+    contributions are moved to the new labels. The rollup deltas come from a
+    locked re-read of the chunk in that write transaction, so status edits
+    made while the chunk was classified aren't lost.
+
+    Returns {"model_version": str, "rescored": int}
+    """
+    classifier.ensure_loaded()
+    model_version = classifier.model_version
+    stale = or_(Complaint.model_version.is_(None), Complaint.model_version != model_version)
+    tracked = [getattr(Complaint, field) for field in rollups.TRACKED_FIELDS]
+    rescored = 0
+    last_id = 0
+
+    while True:
+        rows = db.execute(
+            select(Complaint.complaint_id, Complaint.complaint_text).where(
+                Complaint.complaint_id > last_id, stale
+            ).order_by(Complaint.complaint_id).limit(chunk_size)
+        ).all()
+        # Classify outside any transaction: on a writer session (BEGIN IMMEDIATE
+        # on SQLite) the read would otherwise hold the write lock meanwhile
+        db.rollback()
+        if not rows:
+            break
+        last_id = rows[-1].complaint_id
+
+        classifications = classifier.classify_many([row.complaint_text for row in rows])
+        by_id = {row.complaint_id: classification for row, classification in zip(rows, classifications)}
+
+        current = db.execute(
+            for_update(db, select(Complaint.complaint_id, *tracked).where(
+                Complaint.complaint_id.in_(list(by_id)), stale
+            ))
+        ).mappings().all()
+        if not current:
+            db.commit()
+            continue
+
+        before = [rollups.snapshot(dict(row)) for row in current]
+        after = []
+        changes = []
+        for row in current:
+            classification = by_id[row["complaint_id"]]
+            changes.append({
+                "complaint_id": row["complaint_id"],
+                "predicted_fault_type": classification["fault_type"],
+                "severity": classification["severity"],
+                "fault_confidence": classification["fault_confidence"],
+                "severity_confidence": classification["severity_confidence"],
+                "model_version": classification["model_version"]
+            })
+            after.append(rollups.snapshot({
+                **row,
+                "predicted_fault_type": classification["fault_type"],
+                "severity": classification["severity"]
+            }))
+
+        db.execute(update(Complaint), changes)
+        rollups.apply_complaints(db, before, sign=-1)
+        rollups.apply_complaints(db, after)
+        db.commit()
+
+        rescored += len(current)
+
+    return {"model_version": model_version, "rescored": rescored}
+
+
+def start_background_rescore(chunk_size: int = DEFAULT_CHUNK_SIZE, on_done=None) -> bool:
+    """
+    Run rescore_complaints in a daemon thread with its own session
+
+    Returns False (and does nothing) if a re-score is already running.
+    on_done, if given, is called with the result dict when the job finishes.
+    """
+    if not _rescore_lock.acquire(blocking=False):
+        return False
+
+    def run():
+        db = SessionLocal()
+        try:
+            result = rescore_complaints(db, chunk_size)
+            if on_done:
+                on_done(result)
+        finally:
+            db.close()
+            _rescore_lock.release()
+
+    threading.Thread(target=run, name="complaint-rescore", daemon=True).start()
+    return True
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Re-score complaints with the current classifier")
+    parser.add_argument("--model", help="trained model file to load before re-scoring")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE)
+    args = parser.parse_args(argv)
+
+    if args.model:
+        classifier.load_model(args.model)
+
+    db = SessionLocal()
+    try:
+        result = rescore_complaints(db, args.chunk_size)
+    finally:
+        db.close()
+    print(f"✓ Re-scored {result['rescored']} complaints with model {result['model_version']}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,273 @@
+"""
+Out-of-core retraining of the complaint classifier from the database
+Streams labelled complaints (complaint_text with the stored fault type and
+severity) in complaint_id order, one chunk at a time, into the hashing model's
+partial_fit, so memory stays flat however large the table is. An incremental
+run continues the live model from the last complaint it was trained on.
+
+The new model is written next to the old one with an atomic rename and then
+swapped into the running classifier; worker processes are replaced by
+InferenceService.reload (see main.py).
+
+Usage:
+    python retrain.py                   # full retrain from every labelled complaint
+    python retrain.py --incremental     # update the current model with newer complaints
+"""
+import argparse
+import os
+import sys
+import threading
+import time
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from database import Complaint, ReadSessionLocal
+from ai_classifier import CLASSIFIER_MODEL_PATH, RETRAINED_MODEL_PATH, ComplaintClassifier, classifier
+
+DEFAULT_CHUNK_SIZE = int(os.getenv("RETRAIN_CHUNK_SIZE", "5000"))
+DEFAULT_MODEL_PATH = CLASSIFIER_MODEL_PATH or RETRAINED_MODEL_PATH
+MAX_ATTEMPTS = 3  # restarts when labels change under a run (see _train)
+
+
+def labelled_complaints(db: Session, after_id: int = 0, chunk_size: int = DEFAULT_CHUNK_SIZE):
+    """
+    Yield chunks of (complaint_id, complaint_text, fault_type, severity) rows
+    with complaint_id > after_id, using keyset pagination so each chunk is a
+    short query and no cursor or transaction stays open across training steps
+    """
+    last_id = after_id
+    while True:
+        rows = db.execute(
+            select(
+                Complaint.complaint_id,
+                Complaint.complaint_text,
+                Complaint.predicted_fault_type,
+                Complaint.severity
+            ).where(
+                Complaint.complaint_id > last_id,
+                Complaint.predicted_fault_type.is_not(None),
+                Complaint.severity.is_not(None)
+            ).order_by(Complaint.complaint_id).limit(chunk_size)
+        ).all()
+        # On a writer session (BEGIN IMMEDIATE on SQLite) an open transaction
+        # would hold the write lock while the chunk trains
+        db.rollback()
+        if not rows:
+            return
+        yield rows
+        last_id = rows[-1].complaint_id
+
+
+def label_classes(db: Session, after_id: int = 0) -> tuple:
+    """Distinct (fault types, severities) among labelled complaints after after_id"""
+    labelled = (
+        Complaint.complaint_id > after_id,
+        Complaint.predicted_fault_type.is_not(None),
+        Complaint.severity.is_not(None)
+    )
+    faults = db.scalars(select(Complaint.predicted_fault_type).where(*labelled).distinct()).all()
+    severities = db.scalars(select(Complaint.severity).where(*labelled).distinct()).all()
+    db.rollback()
+    return set(faults), set(severities)
+
+
+class Retrainer:
+    """
+    Runs retraining jobs (one at a time) and keeps throughput statistics
+
+    A full run trains a new hashing model from every labelled complaint. An
+    incremental run loads the live model's file and feeds it only complaints
+    newer than the ones it was trained on; it falls back to a full run when
+    there is no hashing model yet or the new rows carry a label the model's
+    classes don't include.
+    """
+
+    def __init__(self):
+        self.runs = 0
+        self.rows_total = 0
+        self.seconds_total = 0.0
+        self.last_run = None
+        self._running = threading.Lock()
+        self._stats_lock = threading.Lock()
+
+    @property
+    def running(self) -> bool:
+        return self._running.locked()
+
+    def retrain(self, db: Session, incremental: bool = False, chunk_size: int = DEFAULT_CHUNK_SIZE,
+                model_path: Optional[str] = None, install: bool = True) -> dict:
+        """
+        Train, save the model to model_path (atomically) and, with install,
+        swap it into the global classifier
+
+        Returns the run summary (also kept as last_run); raises RuntimeError
+        if another run is in progress.
+        """
+        if not self._running.acquire(blocking=False):
+            raise RuntimeError("A retraining run is already in progress")
+        try:
+            return self._retrain(db, incremental, chunk_size, model_path or DEFAULT_MODEL_PATH, install)
+        finally:
+            self._running.release()
+
+    def _starting_model(self, db: Session, incremental: bool) -> tuple:
+        """(model to update, complaint_id to continue after, classes, mode)"""
+        if incremental:
+            classifier.ensure_loaded()
+            live_path = classifier.source_path
+            if classifier.incremental and live_path is not None and classifier.trained_through_id is not None:
+                model = ComplaintClassifier()
+                model.load_model(live_path)
+                after_id = model.trained_through_id
+                classes = (set(model.fault_model.classes_), set(model.severity_model.classes_))
+                faults, severities = label_classes(db, after_id)
+                if faults <= classes[0] and severities <= classes[1]:
+                    return model, after_id, classes, "incremental"
+        return ComplaintClassifier(), 0, label_classes(db), "full"
+
+    @staticmethod
+    def _train(db: Session, model: ComplaintClassifier, after_id: int, classes: tuple,
+               chunk_size: int) -> Optional[int]:
+        """
+        Stream complaints after after_id into model; returns the row count, or
+        None if a chunk carries a label outside classes
+
+        Classes are read before the stream, in separate queries, so a label
+        written in between (a new fault type, a rescore) can show up here;
+        partial_fit would reject it, so the caller restarts instead.
+        """
+        fault_classes, severity_classes = classes
+        rows = 0
+        for chunk in labelled_complaints(db, after_id, chunk_size):
+            faults = [row.predicted_fault_type for row in chunk]
+            severities = [row.severity for row in chunk]
+            if not (set(faults) <= fault_classes and set(severities) <= severity_classes):
+                return None
+            model.partial_fit(
+                [row.complaint_text for row in chunk], faults, severities,
+                fault_classes, severity_classes,
+                last_id=chunk[-1].complaint_id
+            )
+            rows += len(chunk)
+        return rows
+
+    def _retrain(self, db: Session, incremental: bool, chunk_size: int, model_path: str, install: bool) -> dict:
+        started = time.perf_counter()
+        model, after_id, classes, mode = self._starting_model(db, incremental)
+        previous_version = classifier.model_version
+
+        for _ in range(MAX_ATTEMPTS):
+            rows = self._train(db, model, after_id, classes, chunk_size)
+            if rows is not None:
+                break
+            # A label appeared after the classes were read: start over as a full
+            # run whose classes include it
+            model, after_id, mode = ComplaintClassifier(), 0, "full"
+            classes = label_classes(db)
+        else:
+            raise RuntimeError("Complaint labels kept changing during retraining; try again later")
+        training_seconds = time.perf_counter() - started
+
+        swapped = False
+        if rows:
+            model.finish_partial_fit()
+            model.save_model(model_path)
+            if install:
+                live = ComplaintClassifier()
+                live.load_model(model_path)
+                classifier.adopt(live)
+                swapped = True
+
+        result = {
+            "mode": mode,
+            "rows": rows,
+            "total_rows": model.trained_rows,
+            "trained_through_id": model.trained_through_id,
+            "seconds": round(training_seconds, 3),
+            "rows_per_second": round(rows / training_seconds, 1) if training_seconds > 0 else 0.0,
+            "model_version": model.model_version if rows else previous_version,
+            "previous_model_version": previous_version,
+            "model_path": model_path if rows else None,
+            "swapped": swapped,
+            "finished_at": datetime.utcnow().isoformat()
+        }
+        with self._stats_lock:
+            self.runs += 1
+            self.rows_total += rows
+            self.seconds_total += training_seconds
+            self.last_run = result
+        return result
+
+    def start_background(self, incremental: bool = False, chunk_size: int = DEFAULT_CHUNK_SIZE,
+                         on_done=None) -> bool:
+        """
+        Run retrain in a daemon thread with its own (read) session
+
+        Returns False (and does nothing) if a run is already in progress.
+        on_done, if given, is called with the result dict when a model was swapped in.
+        """
+        if not self._running.acquire(blocking=False):
+            return False
+
+        def run():
+            db = ReadSessionLocal()
+            try:
+                result = self._retrain(db, incremental, chunk_size, DEFAULT_MODEL_PATH, True)
+            finally:
+                db.close()
+                self._running.release()
+            if on_done and result["swapped"]:
+                on_done(result)
+
+        threading.Thread(target=run, name="classifier-retrain", daemon=True).start()
+        return True
+
+    def stats(self) -> dict:
+        with self._stats_lock:
+            return {
+                "running": self.running,
+                "runs": self.runs,
+                "rows_total": self.rows_total,
+                "seconds_total": round(self.seconds_total, 3),
+                "rows_per_second": round(self.rows_total / self.seconds_total, 1) if self.seconds_total else 0.0,
+                "model_version": classifier.model_version,
+                "trained_through_id": classifier.trained_through_id,
+                "last_run": self.last_run
+            }
+
+
+# Global retrainer, shared by the admin endpoints and the CLI
+retrainer = Retrainer()
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Retrain the complaint classifier from stored complaints")
+    parser.add_argument("--incremental", action="store_true",
+                        help="update the current model with complaints it has not seen")
+    parser.add_argument("--model", default=DEFAULT_MODEL_PATH,
+                        help="model file to update and write (default: CLASSIFIER_MODEL_PATH)")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE)
+    args = parser.parse_args(argv)
+
+    if args.incremental:
+        classifier.load_model(args.model)
+
+    db = ReadSessionLocal()
+    try:
+        result = retrainer.retrain(db, args.incremental, args.chunk_size, args.model, install=False)
+    finally:
+        db.close()
+    if not result["rows"]:
+        print(f"✓ No new labelled complaints; model {result['model_version']} is current")
+        return 0
+    print(f"✓ {result['mode'].capitalize()} retrain on {result['rows']} complaints in {result['seconds']}s "
+          f"({result['rows_per_second']:.0f} rows/s)")
+    print(f"✓ Saved model {result['model_version']} to {result['model_path']}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
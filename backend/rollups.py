@@ -0,0 +1,305 @@
+"""
+Incrementally maintained complaint rollups
+Keeps complaint_rollups in step with the complaints table so dashboard
+analytics read O(groups) rows instead of rescanning every complaint
+"""
+import argparse
+import sys
+from collections import defaultdict
+from typing import Iterable, Optional
+
+from sqlalchemy import func, case, delete, select
+from sqlalchemy.orm import Session
+
+from database import Complaint, ComplaintRollup, SessionLocal
+
+# Complaint fields that feed the rollups
+TRACKED_FIELDS = (
+    "product_id",
+    "predicted_fault_type",
+    "severity",
+    "department",
+    "status",
+    "created_date",
+    "resolution_time",
+)
+
+COUNTERS = (
+    "complaint_count",
+    "critical_count",
+    "high_count",
+    "resolved_count",
+    "resolution_time_sum",
+    "resolution_time_count",
+    "resolution_time_nonzero_count",
+)
+
+# dimension -> complaint field it groups on
+DIMENSIONS = {
+    "product": "product_id",
+    "fault_type": "predicted_fault_type",
+    "severity": "severity",
+    "department": "department",
+    "status": "status",
+    "day": "created_date",
+}
+
+# dimension -> complaint fields it groups on; buckets join the values with
+# BUCKET_SEPARATOR, day first, so a day range is a bucket prefix range
+COMPOUND_DIMENSIONS = {
+    "day_product": ("created_date", "product_id"),
+    "day_fault_type": ("created_date", "predicted_fault_type"),
+    "day_severity": ("created_date", "severity"),
+    "day_product_fault": ("created_date", "product_id", "predicted_fault_type"),
+}
+BUCKET_SEPARATOR = "|"
+
+# Histogram of resolution times for resolved complaints (used for median/min/max)
+RESOLUTION_DAYS = "resolution_days"
+
+# Stored bucket for NULL group values
+NULL_BUCKET = ""
+
+
+def to_bucket(value) -> str:
+    """Encode a group value as a rollup bucket key"""
+    if value is None:
+        return NULL_BUCKET
+    if hasattr(value, "isoformat"):
+        return value.isoformat()
+    return str(value)
+
+
+def from_bucket(bucket: str) -> Optional[str]:
+    """Decode a rollup bucket key back to its group value (as a string)"""
+    return None if bucket == NULL_BUCKET else bucket
+
+
+def to_compound_bucket(values) -> str:
+    """Encode a tuple of group values as a compound rollup bucket key"""
+    return BUCKET_SEPARATOR.join(to_bucket(value) for value in values)
+
+
+def split_bucket(bucket: str, parts: int = 2) -> list:
+    """Decode a compound bucket key into its group values (as strings or None)"""
+    return [from_bucket(value) for value in bucket.split(BUCKET_SEPARATOR, parts - 1)]
+
+
+def snapshot(complaint) -> dict:
+    """Capture the rollup-relevant fields of a complaint (ORM object or dict)"""
+    if isinstance(complaint, dict):
+        return {field: complaint.get(field) for field in TRACKED_FIELDS}
+    return {field: getattr(complaint, field) for field in TRACKED_FIELDS}
+
+
+def _contribution(values: dict) -> tuple:
+    """Counter deltas contributed by one complaint, in COUNTERS order"""
+    resolution_time = values["resolution_time"]
+    return (
+        1,
+        1 if values["severity"] == "critical" else 0,
+        1 if values["severity"] == "high" else 0,
+        1 if values["status"] == "resolved" else 0,
+        resolution_time or 0,
+        1 if resolution_time is not None else 0,
+        1 if resolution_time else 0,
+    )
+
+
+def _accumulate(deltas: dict, values: dict, sign: int):
+    contribution = _contribution(values)
+    keys = [(dimension, to_bucket(values[field])) for dimension, field in DIMENSIONS.items()]
+    keys.extend(
+        (dimension, to_compound_bucket(values[field] for field in fields))
+        for dimension, fields in COMPOUND_DIMENSIONS.items()
+    )
+    if values["status"] == "resolved" and values["resolution_time"]:
+        keys.append((RESOLUTION_DAYS, to_bucket(values["resolution_time"])))
+
+    for key in keys:
+        totals = deltas[key]
+        for i, amount in enumerate(contribution):
+            totals[i] += sign * amount
+
+
+def _upsert(db: Session, deltas: dict):
+    """Add counter deltas to the rollup rows, creating missing rows atomically"""
+    rows = [
+        {"dimension": dimension, "bucket": bucket, **dict(zip(COUNTERS, totals))}
+        for (dimension, bucket), totals in deltas.items()
+        if any(totals)
+    ]
+    if not rows:
+        return
+
+    if db.get_bind().dialect.name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert
+
+    stmt = insert(ComplaintRollup)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[ComplaintRollup.dimension, ComplaintRollup.bucket],
+        set_={name: getattr(ComplaintRollup, name) + stmt.excluded[name] for name in COUNTERS}
+    )
+    db.execute(stmt, rows)
+
+
+def apply_complaints(db: Session, complaints: Iterable, sign: int = 1):
+    """
+    Add (sign=1) or remove (sign=-1) complaints from the rollups
+
+    Runs inside the caller's transaction; deltas are aggregated per bucket
+    first so a batch costs one upsert per touched bucket.
+    """
+    deltas = defaultdict(lambda: [0] * len(COUNTERS))
+    for complaint in complaints:
+        _accumulate(deltas, snapshot(complaint), sign)
+    _upsert(db, deltas)
+
+
+def record_change(db: Session, before: dict, complaint):
+    """Move a complaint's contribution from its old values (snapshot) to its current ones"""
+    after = snapshot(complaint)
+    if before == after:
+        return
+    deltas = defaultdict(lambda: [0] * len(COUNTERS))
+    _accumulate(deltas, before, -1)
+    _accumulate(deltas, after, 1)
+    _upsert(db, deltas)
+
+
+def _aggregate_counters():
+    """SELECT-list expressions computing COUNTERS over raw complaints"""
+    return (
+        func.count(Complaint.complaint_id),
+        func.sum(case((Complaint.severity == "critical", 1), else_=0)),
+        func.sum(case((Complaint.severity == "high", 1), else_=0)),
+        func.sum(case((Complaint.status == "resolved", 1), else_=0)),
+        func.coalesce(func.sum(Complaint.resolution_time), 0),
+        func.count(Complaint.resolution_time),
+        func.count(func.nullif(Complaint.resolution_time, 0)),
+    )
+
+
+def compute_rollups(db: Session) -> dict:
+    """Compute every rollup row from the raw complaints table"""
+    expected = {}
+
+    for dimension, field in DIMENSIONS.items():
+        column = getattr(Complaint, field)
+        for group, *totals in db.execute(
+            select(column, *_aggregate_counters()).group_by(column)
+        ):
+            expected[(dimension, to_bucket(group))] = tuple(int(t or 0) for t in totals)
+
+    for dimension, fields in COMPOUND_DIMENSIONS.items():
+        columns = [getattr(Complaint, field) for field in fields]
+        for row in db.execute(select(*columns, *_aggregate_counters()).group_by(*columns)):
+            groups, totals = row[:len(columns)], row[len(columns):]
+            expected[(dimension, to_compound_bucket(groups))] = tuple(int(t or 0) for t in totals)
+
+    resolved_histogram = select(
+        Complaint.resolution_time, *_aggregate_counters()
+    ).where(
+        Complaint.status == "resolved",
+        Complaint.resolution_time.isnot(None),
+        Complaint.resolution_time != 0
+    ).group_by(Complaint.resolution_time)
+    for group, *totals in db.execute(resolved_histogram):
+        expected[(RESOLUTION_DAYS, to_bucket(group))] = tuple(int(t or 0) for t in totals)
+
+    return expected
+
+
+def load_rollups(db: Session) -> dict:
+    """Read the stored rollup rows, ignoring buckets that have drained to zero"""
+    stored = {}
+    for row in db.query(ComplaintRollup).all():
+        totals = tuple(getattr(row, name) for name in COUNTERS)
+        if any(totals):
+            stored[(row.dimension, row.bucket)] = totals
+    return stored
+
+
+def rebuild_rollups(db: Session) -> int:
+    """Recompute all rollups from raw data; returns the number of rows written"""
+    expected = compute_rollups(db)
+    db.execute(delete(ComplaintRollup))
+    if expected:
+        db.execute(
+            ComplaintRollup.__table__.insert(),
+            [
+                {"dimension": dimension, "bucket": bucket, **dict(zip(COUNTERS, totals))}
+                for (dimension, bucket), totals in expected.items()
+            ]
+        )
+    db.commit()
+    return len(expected)
+
+
+def reconcile_rollups(db: Session) -> list:
+    """
+    Compare stored rollups against the raw complaints table
+
+    Returns a list of mismatches: {"dimension", "bucket", "expected", "stored"}
+    """
+    expected = compute_rollups(db)
+    stored = load_rollups(db)
+    zero = (0,) * len(COUNTERS)
+
+    mismatches = []
+    for key in sorted(set(expected) | set(stored)):
+        if expected.get(key, zero) != stored.get(key, zero):
+            mismatches.append({
+                "dimension": key[0],
+                "bucket": key[1],
+                "expected": dict(zip(COUNTERS, expected.get(key, zero))),
+                "stored": dict(zip(COUNTERS, stored.get(key, zero)))
+            })
+    return mismatches
+
+
+def rollups_missing(db: Session) -> bool:
+    """
+    True when there are complaints but some dimension has no rollup rows
+    (a pre-rollup database, or one created before a dimension was added)
+    """
+    if db.query(Complaint.complaint_id).limit(1).first() is None:
+        return False
+    return any(
+        db.query(ComplaintRollup.dimension).filter(ComplaintRollup.dimension == dimension).limit(1).first() is None
+        for dimension in (*DIMENSIONS, *COMPOUND_DIMENSIONS)
+    )
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Maintain complaint analytics rollups")
+    parser.add_argument("command", choices=["rebuild", "reconcile"])
+    parser.add_argument("--fix", action="store_true", help="rebuild when reconcile finds drift")
+    args = parser.parse_args(argv)
+
+    db = SessionLocal()
+    try:
+        if args.command == "rebuild":
+            print(f"✓ Rebuilt {rebuild_rollups(db)} rollup rows")
+            return 0
+
+        mismatches = reconcile_rollups(db)
+        if not mismatches:
+            print("✓ Rollups match raw complaint data")
+            return 0
+
+        print(f"✗ {len(mismatches)} rollup rows differ from raw data")
+        for m in mismatches[:20]:
+            print(f"  {m['dimension']}={m['bucket'] or 'NULL'}: stored {m['stored']} expected {m['expected']}")
+        if args.fix:
+            print(f"✓ Rebuilt {rebuild_rollups(db)} rollup rows")
+            return 0
+        return 1
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,249 @@
+"""
+Full-text search over complaint_text
+An SQLite FTS5 external-content table (complaints_fts) indexes the complaints
+table; triggers keep it in sync with inserts, text updates and deletes, and
+queries rank matches with BM25
+
+Usage:
+    python search.py rebuild            # backfill / rebuild the index from complaints
+    python search.py check              # FTS5 integrity check against complaints
+    python search.py query "left earbud" [--limit 10]
+"""
+import argparse
+import re
+import sys
+import time
+from contextlib import contextmanager
+
+from sqlalchemy import column, func, literal_column, table, text
+from sqlalchemy.exc import DatabaseError
+from sqlalchemy.orm import Session
+
+from database import Complaint, SessionLocal, engine
+
+FTS_TABLE = "complaints_fts"
+
+# Index 2- and 3-character prefixes so "batt*" style queries avoid a full term scan
+CREATE_TABLE = f"""
+CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5(
+    complaint_text,
+    content='complaints',
+    content_rowid='complaint_id',
+    tokenize='unicode61 remove_diacritics 2',
+    prefix='2 3'
+)
+"""
+
+TRIGGERS = {
+    f"{FTS_TABLE}_ai": f"""
+        CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ai AFTER INSERT ON complaints BEGIN
+            INSERT INTO {FTS_TABLE}(rowid, complaint_text) VALUES (new.complaint_id, new.complaint_text);
+        END
+    """,
+    f"{FTS_TABLE}_ad": f"""
+        CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ad AFTER DELETE ON complaints BEGIN
+            INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, complaint_text)
+            VALUES ('delete', old.complaint_id, old.complaint_text);
+        END
+    """,
+    f"{FTS_TABLE}_au": f"""
+        CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_au AFTER UPDATE OF complaint_text ON complaints BEGIN
+            INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, complaint_text)
+            VALUES ('delete', old.complaint_id, old.complaint_text);
+            INSERT INTO {FTS_TABLE}(rowid, complaint_text) VALUES (new.complaint_id, new.complaint_text);
+        END
+    """,
+}
+
+# Lightweight handle on the virtual table for building queries
+complaints_fts = table(FTS_TABLE, column("rowid"), column("complaint_text"))
+
+SNIPPET_TOKENS = 12
+OPERATORS = {"AND", "OR", "NOT"}
+
+
+class SearchUnavailable(Exception):
+    """Full-text search is not supported by the configured database"""
+
+
+class InvalidSearchQuery(ValueError):
+    """The search string does not form a valid query"""
+
+
+def supported(bind=engine) -> bool:
+    return bind.dialect.name == "sqlite"
+
+
+def index_exists(bind=engine) -> bool:
+    if not supported(bind):
+        return False
+    with bind.connect() as conn:
+        return conn.execute(
+            text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :name"), {"name": FTS_TABLE}
+        ).first() is not None
+
+
+def create_search_index(bind=engine) -> bool:
+    """
+    Create the FTS table and sync triggers if missing, backfilling a new
+    index from existing complaints; returns True when the index was created
+    """
+    if not supported(bind):
+        return False
+    created = not index_exists(bind)
+    with bind.begin() as conn:
+        conn.exec_driver_sql(CREATE_TABLE)
+        for ddl in TRIGGERS.values():
+            conn.exec_driver_sql(ddl)
+        if created:
+            conn.exec_driver_sql(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')")
+    return created
+
+
+def rebuild_search_index(bind=engine) -> int:
+    """Rebuild the index from the complaints table; returns the number of rows indexed"""
+    if not supported(bind):
+        raise SearchUnavailable(f"full-text search requires SQLite, not {bind.dialect.name}")
+    create_search_index(bind)
+    with bind.begin() as conn:
+        conn.exec_driver_sql(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')")
+        return conn.execute(text("SELECT count(*) FROM complaints")).scalar()
+
+
+def check_search_index(bind=engine) -> bool:
+    """FTS5 integrity check: True when the index matches the complaints table"""
+    try:
+        with bind.begin() as conn:
+            conn.exec_driver_sql(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}, rank) VALUES ('integrity-check', 1)")
+        return True
+    except DatabaseError:
+        return False
+
+
+@contextmanager
+def deferred_sync(bind=engine):
+    """
+    Drop the sync triggers for a bulk load and rebuild the index once
+    afterwards, instead of updating it row by row
+    """
+    if not index_exists(bind):
+        yield
+        return
+    with bind.begin() as conn:
+        for name in TRIGGERS:
+            conn.exec_driver_sql(f"DROP TRIGGER IF EXISTS {name}")
+    try:
+        yield
+    finally:
+        rebuild_search_index(bind)
+
+
+def to_match_expression(query: str) -> str:
+    """
+    Translate a user search string into an FTS5 MATCH expression
+
+    - words are ANDed: left earbud
+    - "double quotes" match a phrase: "left earbud"
+    - a trailing * matches a prefix: firmw* or "firmware 2."*
+    - OR / NOT (upper case) combine terms: battery OR charging
+    Everything else is quoted, so user input can't produce FTS5 syntax errors.
+    """
+    parts = []
+    for token in re.findall(r'"[^"]*"\*?|\S+', query):
+        if token in OPERATORS:
+            if parts and parts[-1] not in OPERATORS:
+                parts.append(token)
+            continue
+        prefix = token.endswith("*")
+        phrase = token.rstrip("*").strip('"').strip()
+        if not phrase:
+            continue
+        parts.append('"' + phrase.replace('"', '""') + '"' + ("*" if prefix else ""))
+    while parts and parts[-1] in OPERATORS:
+        parts.pop()
+    if parts and parts[0] == "NOT":
+        parts.pop(0)
+    if not parts:
+        raise InvalidSearchQuery("search query has no terms")
+    return " ".join(parts)
+
+
+def search_query(db: Session, query: str, sort: str = "relevance"):
+    """
+    ORM query of (Complaint, score) matching query, best first or newest first
+    Lower BM25 is better; score is negated so larger means more relevant.
+    Further filters can be chained onto the returned query.
+
+    Relevance order scores every match before the sort, so its cost grows
+    with the number of matches; newest-first walks the index in rowid order
+    and stops at the page, which stays fast for very common terms.
+    """
+    if not supported(db.get_bind()):
+        raise SearchUnavailable(f"full-text search requires SQLite, not {db.get_bind().dialect.name}")
+    rank = func.bm25(literal_column(FTS_TABLE))
+    return db.query(
+        Complaint, (-rank).label("score")
+    ).join(
+        complaints_fts, complaints_fts.c.rowid == Complaint.complaint_id
+    ).filter(
+        literal_column(FTS_TABLE).op("MATCH")(to_match_expression(query))
+    ).order_by(rank if sort == "relevance" else complaints_fts.c.rowid.desc())
+
+
+def snippets(db: Session, query: str, complaint_ids: list) -> dict:
+    """
+    Highlighted passages ([match]) for a page of results, by complaint_id
+    Computed separately because snippet() in the ranked query would run for
+    every match before the sort, not just the returned page.
+    """
+    if not complaint_ids:
+        return {}
+    fts = literal_column(FTS_TABLE)
+    rows = db.query(
+        complaints_fts.c.rowid, func.snippet(fts, 0, "[", "]", "…", SNIPPET_TOKENS)
+    ).filter(
+        fts.op("MATCH")(to_match_expression(query)),
+        complaints_fts.c.rowid.in_(complaint_ids)
+    )
+    return dict(rows.all())
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Maintain and query the complaint full-text index")
+    parser.add_argument("command", choices=["rebuild", "check", "query"])
+    parser.add_argument("text", nargs="?", help="search string for the query command")
+    parser.add_argument("--limit", type=int, default=10)
+    args = parser.parse_args(argv)
+
+    if not supported():
+        print(f"✗ Full-text search requires SQLite (configured: {engine.dialect.name})")
+        return 1
+
+    if args.command == "rebuild":
+        start = time.perf_counter()
+        rows = rebuild_search_index()
+        print(f"✓ Indexed {rows} complaints in {time.perf_counter() - start:.1f}s")
+        return 0
+
+    if args.command == "check":
+        if index_exists() and check_search_index():
+            print("✓ Search index matches complaint data")
+            return 0
+        print("✗ Search index missing or out of sync (run: python search.py rebuild)")
+        return 1
+
+    if not args.text:
+        parser.error("query needs a search string")
+    db = SessionLocal()
+    try:
+        results = search_query(db, args.text).limit(args.limit).all()
+        highlighted = snippets(db, args.text, [complaint.complaint_id for complaint, _ in results])
+        for complaint, score in results:
+            print(f"{complaint.complaint_id:>8}  {score:6.2f}  {highlighted[complaint.complaint_id]}")
+        return 0
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,315 @@
+"""
+Synthetic complaint generator
+Produces realistic, reproducible complaint datasets of any size (sample data,
+load tests, benchmarks) and bulk-loads them with chunked Core inserts
+"""
+import random
+import time
+from contextlib import nullcontext
+from datetime import date, timedelta
+from typing import Iterator, List, Optional
+
+from sqlalchemy import func, insert, select
+from sqlalchemy.orm import Session
+
+from database import Complaint, FaultCategory, Product
+from rollups import rebuild_rollups
+import search
+
+DEFAULT_CHUNK_SIZE = 50_000
+
+PRODUCTS = [
+    ("EarBud Pro X", "earbuds"),
+    ("EarBud Lite", "earbuds"),
+    ("Headphone Max", "headphones"),
+    ("Headphone Studio", "headphones"),
+    ("Speaker Boom", "speakers"),
+    ("Speaker Mini", "speakers"),
+    ("Watch Ultra", "smartwatches"),
+    ("Watch Fit", "smartwatches"),
+]
+
+FAULT_CATEGORIES = [
+    ("Battery Issue", "Battery drains quickly or won't charge"),
+    ("Audio Quality", "Poor sound output, distortion, or imbalance"),
+    ("Connectivity", "Bluetooth pairing or connection issues"),
+    ("Physical Damage", "Cracked casing, water damage, or breakage"),
+    ("Software Bug", "App crashes, freezing, or unresponsive"),
+    ("Firmware Update", "Issues after firmware update"),
+    ("Warranty/Return", "Warranty claims and return requests"),
+    ("Performance", "Reduced performance or speed"),
+]
+
+# Core sentence templates per fault type; {n} is replaced by a small number
+FAULT_TEMPLATES = {
+    "Battery Issue": [
+        "Battery dies after {n} hours of use.",
+        "Device won't charge even when plugged in for hours.",
+        "The battery drains overnight while switched off.",
+        "Charging case stops holding power after {n} days.",
+    ],
+    "Audio Quality": [
+        "Audio is distorted and crackles at high volume.",
+        "One side sounds noticeably quieter than the other.",
+        "Sound cuts out for a second every few minutes.",
+        "Bass is muffled and the audio hisses constantly.",
+    ],
+    "Connectivity": [
+        "Bluetooth keeps disconnecting every {n} minutes.",
+        "Cannot pair with my phone after a reset.",
+        "The connection drops when I walk {n} meters away.",
+        "It keeps reconnecting to my old laptop instead of my phone.",
+    ],
+    "Physical Damage": [
+        "Water damage after an accidental splash.",
+        "The casing cracked after a small drop.",
+        "The hinge is broken after {n} weeks.",
+        "Charging port is damaged and loose.",
+    ],
+    "Software Bug": [
+        "The app crashes whenever I adjust settings.",
+        "The companion app freezes on the pairing screen.",
+        "Touch controls trigger the wrong action, looks like a bug.",
+        "The app logs me out every {n} minutes.",
+    ],
+    "Firmware Update": [
+        "After the latest firmware update the device restarts constantly.",
+        "Firmware upgrade failed at {n} percent.",
+        "Since the update the noise cancelling is gone.",
+        "The update bricked one earbud.",
+    ],
+    "Warranty/Return": [
+        "I want a refund under warranty.",
+        "Requesting a return, this is my {n}th replacement.",
+        "Warranty claim was rejected without explanation.",
+        "Return label never arrived after {n} days.",
+    ],
+    "Performance": [
+        "Device randomly restarts without warning.",
+        "Everything is slow and laggy after {n} weeks.",
+        "Heart rate readings lag by {n} seconds.",
+        "The device gets hot and sluggish during calls.",
+    ],
+}
+
+# Phrases that express severity (matching the rule-based classifier keywords)
+SEVERITY_PHRASES = {
+    "critical": ["It doesn't work at all.", "The device is completely broken.", "It is dead."],
+    "high": ["This is a major problem.", "The issue is severe.", "Extremely frustrating."],
+    "medium": ["This is a recurring issue.", "Poor quality for the price.", "Bad experience so far."],
+    "low": ["Minor annoyance.", "Otherwise happy with it.", "Not urgent."],
+}
+
+# Optional context sentences; more are added as text_variety grows
+CONTEXT_PHRASES = [
+    "Bought it {n} months ago.", "Already tried a factory reset.", "Happens on two phones.",
+    "Support told me to wait.", "Second unit with the same fault.", "Using it daily for work.",
+    "Firmware is the latest version.", "Gift for my partner.", "Only happens outdoors.",
+    "Started after a trip.", "Tried different chargers.", "Order number available on request.",
+]
+
+SEVERITIES = ["low", "medium", "high", "critical"]
+SEVERITY_WEIGHTS = [0.30, 0.35, 0.22, 0.13]
+# Mean days to resolution by severity
+RESOLUTION_MEAN_DAYS = {"low": 10, "medium": 7, "high": 4, "critical": 2}
+
+# Departments that typically handle each fault type (first is most likely)
+FAULT_DEPARTMENTS = {
+    "Battery Issue": ["technical", "support", "quality"],
+    "Audio Quality": ["quality", "technical", "support"],
+    "Connectivity": ["technical", "support"],
+    "Physical Damage": ["returns", "quality", "support"],
+    "Software Bug": ["technical", "support"],
+    "Firmware Update": ["technical", "quality"],
+    "Warranty/Return": ["returns", "sales", "support"],
+    "Performance": ["technical", "quality", "support"],
+}
+DEPARTMENT_WEIGHTS = [0.6, 0.3, 0.1]
+
+
+def _cumulative(weights: List[float]) -> List[float]:
+    total, cumulative = 0.0, []
+    for weight in weights:
+        total += weight
+        cumulative.append(total)
+    return cumulative
+
+
+class ComplaintGenerator:
+    """
+    Reproducible stream of synthetic complaint rows
+
+    Args:
+        product_ids: products complaints are filed against
+        days: created_date span, ending at end_date
+        product_skew: Zipf exponent of product popularity (0 = uniform)
+        text_variety: 0-1, how much optional context and detail texts carry
+            (0 yields a few dozen distinct texts, 1 hundreds of thousands)
+        seed: random seed; the same arguments always give the same rows
+        end_date: last created_date (default: today)
+    """
+
+    def __init__(
+        self,
+        product_ids: List[int],
+        days: int = 90,
+        product_skew: float = 1.0,
+        text_variety: float = 0.5,
+        seed: int = 42,
+        end_date: Optional[date] = None
+    ):
+        self.rng = random.Random(seed)
+        self.product_ids = list(product_ids)
+        self.days = max(days, 1)
+        self.text_variety = min(max(text_variety, 0.0), 1.0)
+        self.end_date = end_date or date.today()
+        self.faults = [name for name, _ in FAULT_CATEGORIES]
+
+        rng = self.rng
+        self.product_cum = _cumulative([1 / (rank ** product_skew) for rank in range(1, len(self.product_ids) + 1)])
+        # Each product has its own fault profile, so product x fault counts vary
+        self.fault_cum = {
+            product_id: _cumulative([rng.gammavariate(1.5, 1.0) for _ in self.faults])
+            for product_id in self.product_ids
+        }
+        # Volume grows over the span and dips at weekends; index 0 = oldest day
+        start = self.end_date - timedelta(days=self.days - 1)
+        self.dates = [start + timedelta(days=i) for i in range(self.days)]
+        self.date_cum = _cumulative([
+            (1 + i / self.days) * (0.6 if day.weekday() >= 5 else 1.0)
+            for i, day in enumerate(self.dates)
+        ])
+        self.severity_cum = _cumulative(SEVERITY_WEIGHTS)
+        self.department_cum = _cumulative(DEPARTMENT_WEIGHTS)
+
+    def _text(self, fault_type: str, severity: str) -> str:
+        rng = self.rng
+        variety = self.text_variety
+        parts = [rng.choice(FAULT_TEMPLATES[fault_type]).format(n=rng.randint(2, 12))]
+        if rng.random() < 0.7:
+            parts.append(rng.choice(SEVERITY_PHRASES[severity]))
+        extra = int(variety * 3 * rng.random() + 0.5)
+        for _ in range(extra):
+            parts.insert(rng.randint(0, len(parts)), rng.choice(CONTEXT_PHRASES).format(n=rng.randint(1, 24)))
+        if variety and rng.random() < variety:
+            parts.append(f"Ticket #{rng.randint(1000, 9999)}.")
+        return " ".join(parts)
+
+    def rows(self, n: int) -> Iterator[dict]:
+        """Yield n complaint dicts ready for insert(Complaint)"""
+        rng = self.rng
+        product_ids = rng.choices(self.product_ids, cum_weights=self.product_cum, k=n)
+        created_dates = rng.choices(self.dates, cum_weights=self.date_cum, k=n)
+        severities = rng.choices(SEVERITIES, cum_weights=self.severity_cum, k=n)
+
+        for product_id, created_date, severity in zip(product_ids, created_dates, severities):
+            fault_type = rng.choices(self.faults, cum_weights=self.fault_cum[product_id])[0]
+            departments = FAULT_DEPARTMENTS[fault_type]
+            department = rng.choices(departments, cum_weights=self.department_cum[:len(departments)])[0]
+
+            resolution_time = int(rng.expovariate(1 / RESOLUTION_MEAN_DAYS[severity]))
+            resolved_date = created_date + timedelta(days=resolution_time)
+            if resolved_date <= self.end_date and rng.random() < 0.85:
+                status = "resolved"
+                satisfaction = (
+                    min(5, max(1, 5 - resolution_time // 4 + rng.randint(-1, 1)))
+                    if rng.random() < 0.6 else None
+                )
+            else:
+                status = "escalated" if severity == "critical" and rng.random() < 0.5 else rng.choice(["open", "in_progress"])
+                resolution_time = None
+                resolved_date = None
+                satisfaction = rng.randint(1, 2) if rng.random() < 0.1 else None
+
+            yield {
+                "product_id": product_id,
+                "department": department,
+                "complaint_text": self._text(fault_type, severity),
+                "created_date": created_date,
+                "resolved_date": resolved_date,
+                "status": status,
+                "predicted_fault_type": fault_type,
+                "resolution_time": resolution_time,
+                "severity": severity,
+                "customer_satisfaction": satisfaction,
+            }
+
+
+def _ensure_catalog(db: Session, n_products: int) -> List[int]:
+    """Create fault categories and up to n_products products if missing; returns product ids"""
+    if not db.scalar(select(func.count()).select_from(FaultCategory)):
+        db.execute(insert(FaultCategory), [
+            {"fault_name": name, "description": description} for name, description in FAULT_CATEGORIES
+        ])
+    existing = db.scalar(select(func.count()).select_from(Product))
+    if existing < n_products:
+        db.execute(insert(Product), [
+            {
+                "product_name": PRODUCTS[i % len(PRODUCTS)][0] + (f" {i // len(PRODUCTS) + 1}" if i >= len(PRODUCTS) else ""),
+                "category": PRODUCTS[i % len(PRODUCTS)][1]
+            }
+            for i in range(existing, n_products)
+        ])
+    db.commit()
+    return list(db.scalars(select(Product.product_id).order_by(Product.product_id).limit(n_products)))
+
+
+def seed_complaints(
+    db: Session,
+    n_complaints: int,
+    n_products: int = len(PRODUCTS),
+    days: int = 90,
+    product_skew: float = 1.0,
+    text_variety: float = 0.5,
+    seed: int = 42,
+    end_date: Optional[date] = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    progress=None
+) -> dict:
+    """
+    Generate and bulk-insert n_complaints synthetic complaints, then rebuild rollups
+
+    Rows go in as chunked executemany Core inserts, one transaction per
+    chunk. When the complaints table starts empty, its secondary indexes
+    are dropped for the load and recreated afterwards, and the full-text
+    index is rebuilt once at the end (much faster than maintaining them
+    row by row). progress, if given, is called with the
+    number of rows inserted so far after each chunk.
+
+    Returns {"complaints": int, "products": int, "rollup_rows": int, "seconds": float}
+    """
+    start = time.perf_counter()
+    product_ids = _ensure_catalog(db, n_products)
+    generator = ComplaintGenerator(product_ids, days, product_skew, text_variety, seed, end_date)
+
+    bind = db.get_bind()
+    table = Complaint.__table__
+    deferred = []
+    if not db.scalar(select(func.count()).select_from(table)) and n_complaints > chunk_size:
+        db.commit()
+        deferred = [index for index in table.indexes]
+        for index in deferred:
+            index.drop(bind, checkfirst=True)
+
+    rows = generator.rows(n_complaints)
+    inserted = 0
+    try:
+        with search.deferred_sync(bind) if deferred else nullcontext():
+            while inserted < n_complaints:
+                chunk = [next(rows) for _ in range(min(chunk_size, n_complaints - inserted))]
+                db.execute(insert(table), chunk)
+                db.commit()
+                inserted += len(chunk)
+                if progress:
+                    progress(inserted)
+    finally:
+        for index in deferred:
+            index.create(bind, checkfirst=True)
+
+    rollup_rows = rebuild_rollups(db)
+    return {
+        "complaints": inserted,
+        "products": len(product_ids),
+        "rollup_rows": rollup_rows,
+        "seconds": round(time.perf_counter() - start, 2)
+    }
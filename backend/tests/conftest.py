@@ -0,0 +1,102 @@
+"""
+Shared fixtures: one scratch database per test on every supported backend
+
+Backends:
+    sqlite          production profile (WAL, BEGIN IMMEDIATE writes)
+    sqlite-legacy   the original bare pysqlite engine
+    postgresql      TEST_POSTGRES_URL if set (its tables are dropped!), otherwise
+                    a temporary server started with initdb/pg_ctl from PG_BIN,
+                    `pg_config --bindir` or PATH; skipped when neither exists
+"""
+import os
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+
+import pytest
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+# Modules create their global engine on import; keep it off the working tree
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{os.path.join(tempfile.mkdtemp(prefix='resolve_test_'), 'global.db')}")
+
+from sqlalchemy.orm import sessionmaker  # noqa: E402
+
+from database import Base, create_db_engine, create_sqlite_engine, migrate_schema  # noqa: E402
+
+BACKENDS = ("sqlite", "sqlite-legacy", "postgresql")
+
+
+def _postgres_binaries():
+    """(initdb, pg_ctl) paths, or None when no PostgreSQL server is installed"""
+    bindir = os.getenv("PG_BIN")
+    if not bindir and shutil.which("pg_config"):
+        bindir = subprocess.run(["pg_config", "--bindir"], capture_output=True, text=True).stdout.strip()
+    if bindir:
+        found = [os.path.join(bindir, name) for name in ("initdb", "pg_ctl")]
+        found = [path if os.access(path, os.X_OK) else None for path in found]
+    else:
+        found = [shutil.which("initdb"), shutil.which("pg_ctl")]
+    return tuple(found) if all(found) else None
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+@pytest.fixture(scope="session")
+def postgres_url():
+    """URL of a PostgreSQL database the tests may drop and recreate tables in"""
+    pytest.importorskip("psycopg2")
+    if os.getenv("TEST_POSTGRES_URL"):
+        yield os.environ["TEST_POSTGRES_URL"]
+        return
+
+    binaries = _postgres_binaries()
+    if binaries is None:
+        pytest.skip("PostgreSQL not installed (set PG_BIN or TEST_POSTGRES_URL)")
+    initdb, pg_ctl = binaries
+    root = tempfile.mkdtemp(prefix="resolve_pg_")  # short: unix socket paths are limited
+    data = os.path.join(root, "data")
+    init = subprocess.run(
+        [initdb, "-D", data, "-U", "postgres", "-A", "trust", "-E", "UTF8", "--no-sync"],
+        capture_output=True, text=True
+    )
+    if init.returncode:
+        shutil.rmtree(root, ignore_errors=True)
+        pytest.skip(f"initdb failed: {init.stderr.strip().splitlines()[-1] if init.stderr.strip() else init.returncode}")
+    port = _free_port()
+    subprocess.run(
+        [pg_ctl, "-D", data, "-l", os.path.join(root, "server.log"), "-w",
+         "-o", f"-k {root} -p {port} -c listen_addresses='' -c fsync=off", "start"],
+        check=True, capture_output=True
+    )
+    try:
+        yield f"postgresql+psycopg2://postgres@/postgres?host={root}&port={port}"
+    finally:
+        subprocess.run([pg_ctl, "-D", data, "-m", "immediate", "stop"], capture_output=True)
+        shutil.rmtree(root, ignore_errors=True)
+
+
+@pytest.fixture(params=BACKENDS)
+def backend_engine(request, tmp_path):
+    """Engine for an empty schema on each backend"""
+    if request.param == "postgresql":
+        engine = create_db_engine(request.getfixturevalue("postgres_url"))
+        Base.metadata.drop_all(engine)
+    else:
+        profile = "legacy" if request.param == "sqlite-legacy" else "production"
+        engine = create_sqlite_engine(f"sqlite:///{tmp_path / 'resolve.db'}", profile=profile)
+    Base.metadata.create_all(engine)
+    migrate_schema(engine)
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture
+def session_factory(backend_engine):
+    return sessionmaker(autocommit=False, autoflush=False, bind=backend_engine)
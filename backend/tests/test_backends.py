@@ -0,0 +1,143 @@
+"""
+Backend-specific SQL paths, run against every backend in conftest.BACKENDS:
+rollup upserts, date bucketing and row locking for read-then-write updates
+"""
+import threading
+from datetime import date, timedelta
+
+from sqlalchemy import select, update
+
+from database import Complaint, Product, date_bucket, for_update
+from ingest import ingest_complaints
+from predictive_insights import InsightsEngine
+from rescore import rescore_complaints
+from seed_data import seed_complaints
+import rollups
+
+STALE_VERSION = "test-stale"
+
+
+def _add_complaints(db, created_dates):
+    product = Product(product_name="Test Buds", category="earbuds")
+    db.add(product)
+    db.flush()
+    db.add_all(
+        Complaint(product_id=product.product_id, department="Support", complaint_text="Battery drains",
+                  created_date=created, predicted_fault_type="Battery Issue", severity="high")
+        for created in created_dates
+    )
+    db.commit()
+
+
+def test_rollup_upserts_match_a_full_recount(session_factory):
+    with session_factory() as db:
+        seed_complaints(db, 200, n_products=4, days=30, seed=7)
+        # New rows land in existing rollup buckets (ON CONFLICT update) and new ones (insert)
+        rows = [{"product_id": 1 + i % 4, "department": f"Dept {i % 3}", "complaint_text": f"Screen cracked {i}"}
+                for i in range(50)]
+        assert ingest_complaints(db, rows, chunk_size=20)["created"] == 50
+
+        # Moving a complaint between buckets subtracts from the old ones
+        complaint = db.scalars(select(Complaint).where(Complaint.status != "resolved").limit(1)).one()
+        before = rollups.snapshot(complaint)
+        complaint.status = "resolved"
+        complaint.resolution_time = 3
+        rollups.record_change(db, before, complaint)
+        db.commit()
+
+        assert rollups.reconcile_rollups(db) == []
+
+
+def test_date_bucket_truncates_to_day_week_and_month(session_factory):
+    created = [
+        date(2026, 10, 18),  # Sunday: week of Monday 10-12
+        date(2026, 10, 19),  # Monday
+        date(2026, 1, 1),  # Thursday: week starts in the previous year
+        date(2024, 2, 29),
+    ]
+    with session_factory() as db:
+        _add_complaints(db, created)
+        dialect = db.get_bind().dialect.name
+        for granularity, expected in (
+            ("day", created),
+            ("week", [day - timedelta(days=day.weekday()) for day in created]),
+            ("month", [day.replace(day=1) for day in created]),
+        ):
+            buckets = db.scalars(
+                select(date_bucket(Complaint.created_date, granularity, dialect)).order_by(Complaint.complaint_id)
+            ).all()
+            assert [date.fromisoformat(str(bucket)) for bucket in buckets] == expected, granularity
+
+
+def test_weekly_trend_counts_every_complaint_once(session_factory):
+    start, end = date(2026, 9, 1), date(2026, 10, 31)
+    with session_factory() as db:
+        seed_complaints(db, 300, n_products=4, days=60, seed=11, end_date=end)
+        trend = InsightsEngine.get_complaint_trend.__wrapped__(db, 0, "week", None, start, end)
+        in_range = db.query(Complaint).filter(Complaint.created_date.between(start, end)).count()
+
+    weeks = [date.fromisoformat(point["date"]) for point in trend["data"]]
+    assert all(week.weekday() == 0 for week in weeks)
+    assert sum(point["complaints"] for point in trend["data"]) == in_range
+
+
+def test_for_update_blocks_a_concurrent_writer(session_factory):
+    with session_factory() as db:
+        _add_complaints(db, [date(2026, 10, 1)])
+        complaint_id = db.scalar(select(Complaint.complaint_id))
+
+    locked = session_factory()
+    locked.execute(for_update(locked, select(Complaint.status).where(Complaint.complaint_id == complaint_id))).one()
+
+    finished = threading.Event()
+    seen = []
+
+    def writer():
+        with session_factory() as db:
+            seen.append(db.execute(
+                for_update(db, select(Complaint.status).where(Complaint.complaint_id == complaint_id))
+            ).scalar_one())
+            db.execute(update(Complaint).where(Complaint.complaint_id == complaint_id).values(status="escalated"))
+            db.commit()
+        finished.set()
+
+    thread = threading.Thread(target=writer)
+    thread.start()
+    try:
+        assert not finished.wait(0.5), "second writer did not wait for the row lock"
+        locked.execute(update(Complaint).where(Complaint.complaint_id == complaint_id).values(status="resolved"))
+        locked.commit()
+    finally:
+        locked.close()
+        thread.join(10)
+
+    # The waiting writer read the committed value, not the one from before the lock
+    assert seen == ["resolved"]
+    with session_factory() as db:
+        assert db.scalar(select(Complaint.status).where(Complaint.complaint_id == complaint_id)) == "escalated"
+
+
+def test_updates_racing_a_rescore_keep_rollups_exact(session_factory):
+    from main import ComplaintUpdate, update_complaint
+
+    with session_factory() as db:
+        seed_complaints(db, 120, n_products=4, days=30, seed=3)
+        ids = db.scalars(select(Complaint.complaint_id).where(Complaint.status != "resolved")).all()
+        db.execute(update(Complaint).values(model_version=STALE_VERSION))
+        db.commit()
+
+    def rescore():
+        with session_factory() as db:
+            rescore_complaints(db, chunk_size=10)
+
+    thread = threading.Thread(target=rescore)
+    thread.start()
+    for complaint_id in ids:
+        with session_factory() as db:
+            update_complaint(complaint_id, ComplaintUpdate(status="resolved", resolved_date=date.today(),
+                                                           customer_satisfaction=4), db)
+    thread.join()
+
+    with session_factory() as db:
+        assert db.scalar(select(Complaint.complaint_id).where(Complaint.model_version == STALE_VERSION)) is None
+        assert rollups.reconcile_rollups(db) == []
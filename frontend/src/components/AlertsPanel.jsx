@@ -1,12 +1,14 @@
 import './AlertsPanel.css'
 
-function AlertsPanel({ data }) {
+function AlertsPanel({ data, anomalies }) {
   if (!data) {
     return <div className="card">No alerts data available</div>
   }
 
+  const spikes = (anomalies && anomalies.anomalies) || []
   const hasAlerts = (data.critical_products && data.critical_products.length > 0) ||
-                    (data.unresolved_fault_types && data.unresolved_fault_types.length > 0)
+                    (data.unresolved_fault_types && data.unresolved_fault_types.length > 0) ||
+                    spikes.length > 0
 
   if (!hasAlerts) {
     return (
@@ -24,6 +26,25 @@ function AlertsPanel({ data }) {
       <h2>🚨 Critical Alerts</h2>
       
       <div className="alerts-grid">
+        {spikes.length > 0 && (
+          <div className="alert-section">
+            <h3>📈 Complaint Spikes Today</h3>
+            <div className="alert-items">
+              {spikes.map((item, idx) => (
+                <div key={idx} className="alert-item alert-item-critical">
+                  <div className="alert-icon">{item.new ? '🆕' : '📈'}</div>
+                  <div className="alert-content">
+                    <span className="alert-title">{item.product} · {item.fault_type || 'Unclassified'}</span>
+                    <span className="alert-details">
+                      {item.observed} complaints (expected {item.expected}, z = {item.z_score})
+                    </span>
+                  </div>
+                </div>
+              ))}
+            </div>
+          </div>
+        )}
+
         {data.critical_products && data.critical_products.length > 0 && (
           <div className="alert-section">
             <h3>⚠️ Critical Product Issues</h3>
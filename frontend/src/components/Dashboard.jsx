@@ -8,23 +8,30 @@ import TrendChart from './TrendChart'
 import AlertsPanel from './AlertsPanel'
 import './Dashboard.css'
 
+const STREAM_URL = '/api/analytics/stream'
+const FALLBACK_POLL_MS = 30000 // only used when the event stream is unavailable
+
 function Dashboard() {
   const [loading, setLoading] = useState(true)
   const [data, setData] = useState(null)
   const [summaryStats, setSummaryStats] = useState(null)
+  const [trends, setTrends] = useState(null)
   const [error, setError] = useState(null)
   const [refreshing, setRefreshing] = useState(false)
 
   const fetchData = async () => {
     try {
       setRefreshing(true)
-      const [dashboardRes, statsRes] = await Promise.all([
+      // Responses carry ETags, so unchanged data comes back as a cheap 304
+      const [dashboardRes, statsRes, trendsRes] = await Promise.all([
         axios.get('/api/analytics/dashboard'),
         axios.get('/api/stats/summary'),
+        axios.get('/api/analytics/trends?days=30'),
       ])
       
       setData(dashboardRes.data)
       setSummaryStats(statsRes.data)
+      setTrends(trendsRes.data)
       setError(null)
     } catch (err) {
       setError('Failed to load dashboard data')
@@ -36,9 +43,43 @@ function Dashboard() {
   }
 
   useEffect(() => {
-    fetchData()
-    const interval = setInterval(fetchData, 30000) // Refresh every 30 seconds
-    return () => clearInterval(interval)
+    let interval = null
+    const startPolling = () => {
+      if (interval) return
+      fetchData()
+      interval = setInterval(fetchData, FALLBACK_POLL_MS)
+    }
+
+    if (typeof EventSource === 'undefined') {
+      startPolling()
+      return () => clearInterval(interval)
+    }
+
+    // Server pushes a full snapshot on connect, then only the changed sections
+    const source = new EventSource(STREAM_URL)
+    source.addEventListener('snapshot', (event) => {
+      const { state } = JSON.parse(event.data)
+      setData(state.dashboard)
+      setSummaryStats(state.summary)
+      setTrends(state.trends)
+      setError(null)
+      setLoading(false)
+    })
+    source.addEventListener('delta', (event) => {
+      const { changes } = JSON.parse(event.data)
+      if (changes.dashboard) setData((prev) => ({ ...prev, ...changes.dashboard }))
+      if (changes.summary) setSummaryStats((prev) => ({ ...prev, ...changes.summary }))
+      if (changes.trends) setTrends((prev) => ({ ...prev, ...changes.trends }))
+    })
+    source.onerror = () => {
+      // EventSource reconnects on its own; poll only if the stream is gone for good
+      if (source.readyState === EventSource.CLOSED) startPolling()
+    }
+
+    return () => {
+      source.close()
+      clearInterval(interval)
+    }
   }, [])
 
   if (loading) {
@@ -49,8 +90,8 @@ function Dashboard() {
     return <div className="dashboard-error">{error}</div>
   }
 
-  const avgSatisfaction = summaryStats?.average_satisfaction && summaryStats.average_satisfaction.length > 0
-    ? (summaryStats.average_satisfaction.reduce((acc, c) => acc + c.customer_satisfaction, 0) / summaryStats.average_satisfaction.length).toFixed(1)
+  const avgSatisfaction = summaryStats?.average_satisfaction != null
+    ? summaryStats.average_satisfaction.toFixed(1)
     : 'N/A'
 
   return (
@@ -99,7 +140,7 @@ function Dashboard() {
         {/* Left Column */}
         <div className="dashboard-col-left">
           {data && <FaultDistribution data={data.fault_distribution} />}
-          {data && <TrendChart />}
+          {trends && <TrendChart data={trends} />}
         </div>
 
         {/* Right Column */}
@@ -111,7 +152,7 @@ function Dashboard() {
 
       {/* Alerts Section */}
       <div className="dashboard-full-width">
-        {data && <AlertsPanel data={data.critical_alerts} />}
+        {data && <AlertsPanel data={data.critical_alerts} anomalies={data.anomalies} />}
       </div>
     </div>
   )
@@ -1,32 +1,16 @@
-import { useState, useEffect } from 'react'
+import { useMemo } from 'react'
 import { LineChart, Line, XAxis, YAxis, CartesianGrid, Tooltip, Legend, ResponsiveContainer } from 'recharts'
-import axios from 'axios'
 import './TrendChart.css'
 
-function TrendChart() {
-  const [data, setData] = useState([])
-  const [loading, setLoading] = useState(true)
-
-  useEffect(() => {
-    axios
-      .get('/api/analytics/trends?days=30')
-      .then((res) => {
-        const trendData = res.data.data.map(item => ({
-          date: new Date(item.date).toLocaleDateString('en-US', { month: 'short', day: 'numeric' }),
-          complaints: item.complaints
-        }))
-        setData(trendData)
-        setLoading(false)
-      })
-      .catch((err) => {
-        console.error(err)
-        setLoading(false)
-      })
-  }, [])
-
-  if (loading) {
-    return <div className="card">Loading trend data...</div>
-  }
+// Trend payload (/api/analytics/trends?days=30) is supplied by the dashboard's live stream
+function TrendChart({ data: trends }) {
+  const data = useMemo(
+    () => (trends?.data || []).map(item => ({
+      date: new Date(item.date).toLocaleDateString('en-US', { month: 'short', day: 'numeric' }),
+      complaints: item.complaints
+    })),
+    [trends]
+  )
 
   return (
     <div className="card trend-chart">